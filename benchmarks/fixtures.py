@@ -0,0 +1,40 @@
+import os
+from services.ffmpeg import FFmpegService
+
+
+# ------------------------------------------------------------
+# Method: make_video
+# Description:
+#   Generates a synthetic H.264/AAC MP4 (test pattern + tone)
+#   with ffmpeg's lavfi sources. `seed` changes the pattern and
+#   tone so every fixture has distinct content (and hash).
+#   Keyframes every `gop` frames, like typical camera output.
+# ------------------------------------------------------------
+def make_video(path: str, duration: float = 12, seed: int = 0, size: str = "640x360",
+               rate: int = 25, gop: int = 50) -> str:
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    patterns = ["testsrc", "testsrc2", "smptebars", "rgbtestsrc"]
+    FFmpegService().run([
+        "-y",
+        "-f", "lavfi", "-i", f"{patterns[seed % len(patterns)]}=duration={duration}:size={size}:rate={rate}",
+        "-f", "lavfi", "-i", f"sine=frequency={220 + 40 * seed}:duration={duration}",
+        "-vf", f"hue=h={(seed * 37) % 360}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-g", str(gop), "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest", "-movflags", "+faststart",
+        path,
+    ])
+    return path
+
+
+# ------------------------------------------------------------
+# Method: make_videos
+# Description:
+#   Generates `count` distinct fixtures in `directory`.
+# ------------------------------------------------------------
+def make_videos(directory: str, count: int, duration: float = 12) -> list:
+    return [
+        make_video(os.path.join(directory, f"synthetic_{seed:03d}.mp4"), duration, seed)
+        for seed in range(count)
+    ]
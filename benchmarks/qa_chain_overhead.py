@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import statistics
+
+# ------------------------------------------------------------
+# Micro-benchmark: per-question overhead of the Q&A chain
+# Description:
+#   Compares building the retrieval chain on every question
+#   (previous ask_question behaviour) with the per-video chain
+#   cached by QAChainService. Runs fully offline: a fake chat
+#   model, deterministic embeddings and an in-memory Chroma
+#   collection are registered in RESOURCES before use.
+#
+#   Usage: python benchmarks/qa_chain_overhead.py [iterations]
+# ------------------------------------------------------------
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROVIDER", "gemini")
+os.environ.setdefault("CHAT_MODEL", "gemini-2.5-flash")
+os.environ.setdefault("EMBEDDING_MODEL", "models/embedding-001")
+
+from itertools import cycle
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_classic.chains.combine_documents import create_stuff_documents_chain
+from langchain_classic.chains.retrieval import create_retrieval_chain
+from services.llm import LLMService
+from services.qa_chain import QAChainService
+from services.registry import RESOURCES
+
+VIDEO_NAME = "benchmark.mp4"
+QUESTION = "What happens at the start of the video?"
+HISTORY = [HumanMessage(content="Who is speaking?"), AIMessage(content="A narrator.")]
+
+
+def setup():
+    llm_service = LLMService()
+    embedding = DeterministicFakeEmbedding(size=256)
+    chat_model = GenericFakeChatModel(messages=cycle([AIMessage(content="An answer.")]))
+    RESOURCES.get(f"chat_model:{llm_service.get_model_name()}", lambda: chat_model)
+    provider, _ = llm_service.get_model_name().split(":", 1)
+    RESOURCES.get(f"embedding_model:{provider}:{os.environ['EMBEDDING_MODEL']}", lambda: embedding)
+    vector_db = RESOURCES.get(
+        "vector_db:video_summaries",
+        lambda: Chroma(collection_name="qa_chain_benchmark", embedding_function=embedding)
+    )
+    vector_db.add_documents([
+        Document(page_content=f"Scene {i}: something happens.", metadata={"source": VIDEO_NAME})
+        for i in range(20)
+    ])
+    return chat_model, vector_db, embedding
+
+
+def per_question_chain(chat_model, vector_db):
+    retriever = vector_db.as_retriever(search_kwargs={"filter": {"source": VIDEO_NAME}})
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are a helpful assistant.\n\nVideo Context:\n{context}"),
+        *HISTORY,
+        ("human", "{input}")
+    ])
+    combine_docs_chain = create_stuff_documents_chain(chat_model, prompt)
+    return create_retrieval_chain(retriever, combine_docs_chain)
+
+
+def measure(fn, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": statistics.mean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p95_us": samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    chat_model, vector_db, embedding = setup()
+    service = QAChainService()
+    question_embedding = embedding.embed_query(QUESTION)
+    inputs = {"input": QUESTION, "history": HISTORY, "embedding": question_embedding}
+
+    results = {
+        "build (before)": measure(lambda: per_question_chain(chat_model, vector_db), iterations),
+        "build (after)": measure(lambda: service.chain(VIDEO_NAME), iterations),
+        "question (before)": measure(
+            lambda: per_question_chain(chat_model, vector_db).invoke({"input": QUESTION}), iterations
+        ),
+        "question (after)": measure(lambda: service.chain(VIDEO_NAME).invoke(inputs), iterations),
+    }
+
+    print(f"{'':<20}{'mean us':>12}{'p50 us':>12}{'p95 us':>12}")
+    for name, stats in results.items():
+        print(f"{name:<20}{stats['mean_us']:>12.1f}{stats['p50_us']:>12.1f}{stats['p95_us']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+from typing import Optional
+from database.video_table import METADATA_COLUMNS, ANALYSIS_COLUMNS, PAGE_SIZE
+
+# ------------------------------------------------------------
+# SQLite stand-ins for the MySQL table services
+# Description:
+#   Same public methods and return shapes as VideoTableService
+#   and SegmentTableService, backed by one in-memory SQLite
+#   database, so benchmarks run without a MySQL server.
+#   Text search uses a name/category/topics LIKE instead of
+#   FULLTEXT.
+# ------------------------------------------------------------
+_DB = sqlite3.connect(":memory:", check_same_thread=False)
+_DB.row_factory = sqlite3.Row
+_LOCK = threading.Lock()
+_DB.executescript(
+    "CREATE TABLE videos ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, video_name TEXT UNIQUE, category TEXT,"
+    " suitability TEXT, language TEXT, topics TEXT, key_moments TEXT, video_type INTEGER,"
+    " duration REAL, width INTEGER, height INTEGER, bitrate INTEGER, codec TEXT,"
+    " file_size INTEGER, content_hash TEXT);"
+    "CREATE TABLE video_segments ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, video_name TEXT, start_time REAL,"
+    " end_time REAL, summary TEXT);"
+    "CREATE INDEX idx_segments ON video_segments (video_name, start_time);"
+)
+
+
+def _execute(query: str, values: tuple = ()) -> list:
+    with _LOCK, _DB:
+        return [dict(row) for row in _DB.execute(query, values).fetchall()]
+
+
+# ------------------------------------------------------------
+# Class: SqliteVideoTable
+# Description:
+#   Stand-in for database.video_table.VideoTableService.
+# ------------------------------------------------------------
+class SqliteVideoTable:
+    def add_video(self, video_name: str, video_type: int, metadata: Optional[dict] = None) -> bool:
+        if _execute("SELECT id FROM videos WHERE video_name = ?", (video_name,)):
+            if metadata:
+                assignments = ", ".join(f"{c} = ?" for c in METADATA_COLUMNS)
+                _execute(
+                    f"UPDATE videos SET {assignments} WHERE video_name = ?",
+                    (*(metadata.get(c) for c in METADATA_COLUMNS), video_name)
+                )
+            return False
+        columns = ["video_name", "video_type", *(METADATA_COLUMNS if metadata else ())]
+        values = [video_name, video_type, *(metadata.get(c) for c in METADATA_COLUMNS)] if metadata \
+            else [video_name, video_type]
+        _execute(
+            f"INSERT INTO videos ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            tuple(values)
+        )
+        return True
+
+    def update_analysis(self, video_name: str, analysis: dict):
+        assignments = ", ".join(f"{c} = COALESCE(?, {c})" for c in ANALYSIS_COLUMNS)
+        _execute(
+            f"UPDATE videos SET {assignments} WHERE video_name = ?",
+            (*(analysis.get(c) for c in ANALYSIS_COLUMNS), video_name)
+        )
+
+    def get_video_by_name(self, name: str):
+        rows = _execute("SELECT * FROM videos WHERE video_name = ?", (name,))
+        return rows[0] if rows else None
+
+    def get_video_by_hash(self, content_hash: str):
+        rows = _execute("SELECT * FROM videos WHERE content_hash = ? ORDER BY id LIMIT 1", (content_hash,))
+        return rows[0] if rows else None
+
+    def video_list(self, filter: str = "", after_id: Optional[int] = None, limit: Optional[int] = None):
+        filter = filter.strip()
+        if filter.isdigit():
+            rows = _execute("SELECT * FROM videos WHERE id = ?", (int(filter),))
+            if rows:
+                return [] if after_id is not None else rows
+
+        conditions, values = [], []
+        if filter:
+            conditions.append("(video_name LIKE ? OR category LIKE ? OR topics LIKE ?)")
+            values.extend([f"%{filter}%"] * 3)
+        if after_id is not None:
+            conditions.append("id < ?")
+            values.append(after_id)
+        query = "SELECT * FROM videos"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC"
+        if limit:
+            query += " LIMIT ?"
+            values.append(limit)
+        return _execute(query, tuple(values))
+
+    def video_page(self, filter: str = "", after_id: Optional[int] = None,
+                   page_size: Optional[int] = None):
+        page_size = page_size or PAGE_SIZE
+        rows = self.video_list(filter, after_id, page_size + 1)
+        if len(rows) > page_size:
+            return rows[:page_size], rows[page_size - 1]["id"]
+        return rows, None
+
+
+# ------------------------------------------------------------
+# Class: SqliteSegmentTable
+# Description:
+#   Stand-in for database.segment_table.SegmentTableService.
+# ------------------------------------------------------------
+class SqliteSegmentTable:
+    def replace_segments(self, video_name: str, segments: list):
+        with _LOCK, _DB:
+            _DB.execute("DELETE FROM video_segments WHERE video_name = ?", (video_name,))
+            _DB.executemany(
+                "INSERT INTO video_segments (video_name, start_time, end_time, summary) VALUES (?, ?, ?, ?)",
+                [(video_name, s["start"], s["end"], s["summary"]) for s in segments]
+            )
+
+    def segments_in_range(self, video_name: str, start: float, end: float) -> list:
+        rows = _execute(
+            "SELECT start_time, end_time, summary FROM video_segments"
+            " WHERE video_name = ? AND start_time < ? AND end_time > ? ORDER BY start_time",
+            (video_name, end, start)
+        )
+        return [{"start": r["start_time"], "end": r["end_time"], "summary": r["summary"]} for r in rows]
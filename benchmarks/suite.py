@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from contextlib import contextmanager
+
+# ------------------------------------------------------------
+# Offline benchmark suite
+# Description:
+#   Times every pipeline stage without network or MySQL:
+#     - PROVIDER=fake: deterministic fake chat / embedding models
+#       behind LLMService (latency configurable);
+#     - SQLite stand-ins for the video and segment tables;
+#     - synthetic MP4 fixtures generated with ffmpeg;
+#     - every cache, queue and Chroma file in a scratch directory.
+#   Stages: probe, ingest, range_cut (fast / exact), chunk_embed
+#   (cold / re-index), retrieval, qa and video_list. Reports
+#   throughput, p50 / p95 latency and peak RSS per stage as JSON
+#   so results can be compared between commits.
+#
+#   Usage: python benchmarks/suite.py [--videos 3] [--iterations 20]
+#          [--duration 12] [--llm-latency 0] [--output result.json]
+# ------------------------------------------------------------
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# ------------------------------------------------------------
+# Method: configure_environment
+# Description:
+#   Points every setting at the fake provider and the scratch
+#   directory. Must run before any service module is imported.
+# ------------------------------------------------------------
+def configure_environment(workdir: str, args):
+    os.environ.update({
+        "PROVIDER": "fake",
+        "CHAT_MODEL": "fake-chat",
+        "EMBEDDING_MODEL": "fake-embedding",
+        "MEDIA_UPLOADER": "local",
+        "FAKE_LLM_LATENCY": str(args.llm_latency),
+        "FAKE_LLM_ERROR_RATE": "0",
+        "CHECKPOINT_BACKEND": "memory",
+        "TEMP_DIR": os.path.join(workdir, "temp"),
+        "PREVIEW_DIR": os.path.join(workdir, "previews"),
+        "PROXY_DIR": os.path.join(workdir, "proxies"),
+        "SUMMARY_CACHE_PATH": os.path.join(workdir, "cache", "summary_cache.sqlite3"),
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, "cache", "embedding_cache.sqlite3"),
+        "FINGERPRINT_INDEX_PATH": os.path.join(workdir, "cache", "fingerprints.sqlite3"),
+        "SCENE_CACHE_PATH": os.path.join(workdir, "cache", "scenes.sqlite3"),
+        "JOB_QUEUE_PATH": os.path.join(workdir, "jobs", "jobs.sqlite3"),
+        "TIMELINE_WINDOW": str(args.timeline_window),
+    })
+    os.makedirs(os.environ["TEMP_DIR"], exist_ok=True)
+
+
+# ------------------------------------------------------------
+# Class: Recorder
+# Description:
+#   Collects per-stage latency samples and the peak RSS seen
+#   when each stage finished.
+# ------------------------------------------------------------
+class Recorder:
+    def __init__(self):
+        self.samples: dict = {}
+        self.rss: dict = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        yield
+        self.samples.setdefault(name, []).append(time.perf_counter() - started)
+        self.rss[name] = peak_rss_mb()
+
+    def report(self) -> dict:
+        report = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            total = sum(ordered)
+            report[name] = {
+                "count": len(ordered),
+                "total_s": round(total, 4),
+                "throughput_per_s": round(len(ordered) / total, 2) if total else None,
+                "mean_ms": round(total / len(ordered) * 1000, 3),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+                "peak_rss_mb": self.rss[name],
+            }
+        return report
+
+
+def percentile(ordered: list, q: float) -> float:
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    vocabulary = ["scene", "person", "walks", "city", "music", "car", "talks", "bright", "night",
+                  "crowd", "river", "smiles", "camera", "slowly", "pans", "street", "light", "door"]
+    sentences = []
+    for _ in range(max(1, words // 12)):
+        sentences.append(" ".join(rng.choice(vocabulary) for _ in range(12)).capitalize() + ".")
+    return " ".join(sentences)
+
+
+# ------------------------------------------------------------
+# Method: run
+# Description:
+#   Runs every stage and returns the JSON-ready report.
+# ------------------------------------------------------------
+def run(args, workdir: str) -> dict:
+    from benchmarks.fixtures import make_videos
+    from benchmarks.stand_ins import SqliteVideoTable, SqliteSegmentTable
+    import services.lang_graph as lang_graph
+    lang_graph.SegmentTableService = SqliteSegmentTable
+    lang_graph.VideoTableService = SqliteVideoTable
+
+    from services.registry import RESOURCES
+    from services.video_metadata import VideoMetadataService
+    from services.range_extractor import RangeExtractorService
+    from services.vector_store import VectorStoreService
+
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+
+    started = time.perf_counter()
+    videos = make_videos(os.path.join(workdir, "fixtures"), args.videos, args.duration)
+    fixture_seconds = time.perf_counter() - started
+
+    service = lang_graph.LanggraphService()
+    graph = RESOURCES.get("graph", service.build_pipeline)
+    video_table = SqliteVideoTable()
+    metadata_service = VideoMetadataService()
+    range_extractor = RangeExtractorService()
+    vector_db = VectorStoreService().vector_db()
+    names = [os.path.basename(path) for path in videos]
+
+    for _ in range(args.iterations):
+        for path in videos:
+            with recorder.stage("probe"):
+                metadata_service.probe(path)
+
+    for path, name in zip(videos, names):
+        with recorder.stage("ingest"):
+            metadata = metadata_service.extract(path)
+            video_table.add_video(name, 1, metadata)
+            graph.invoke(
+                {"video_path": path, "video_name": name, "is_new_video": True, "prompt": "",
+                 "segmented": False, "question": "", "start_time": None, "end_time": None},
+                {"configurable": {"thread_id": f"bench-ingest-{name}"}}
+            )
+
+    for exact, stage in ((False, "range_cut"), (True, "range_cut_exact")):
+        for _ in range(args.iterations):
+            path = rng.choice(videos)
+            start = rng.uniform(0, max(0.0, args.duration - 4))
+            end = start + rng.uniform(1, 3)
+            with recorder.stage(stage):
+                clip = range_extractor.extract(path, start, end, exact=exact)
+            os.remove(clip)
+
+    for index in range(args.iterations):
+        state = {"is_new_video": True, "video_name": f"bench-chunks-{index}",
+                 "video_hash": f"bench-{index}", "summary": synthetic_text(rng, args.summary_words)}
+        with recorder.stage("chunk_embed"):
+            service.store_summary_in_db(state)
+        with recorder.stage("chunk_embed_reindex"):
+            service.store_summary_in_db(state)
+
+    for index in range(args.iterations):
+        name = names[index % len(names)]
+        question = f"What does the {rng.choice(['person', 'camera', 'crowd'])} do in part {index}?"
+        with recorder.stage("retrieval"):
+            vector_db.similarity_search(question, k=4, filter={"source": name})
+        with recorder.stage("qa"):
+            graph.invoke(
+                {"video_path": videos[index % len(videos)], "video_name": name, "question": question,
+                 "messages": [], "start_time": None, "end_time": None},
+                {"configurable": {"thread_id": f"bench-qa-{name}"}}
+            )
+
+    for _ in range(args.iterations):
+        with recorder.stage("video_list"):
+            video_table.video_page("synthetic")
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "videos": args.videos,
+            "video_duration_s": args.duration,
+            "iterations": args.iterations,
+            "llm_latency_s": args.llm_latency,
+            "fixture_generation_s": round(fixture_seconds, 3),
+        },
+        "stages": recorder.report(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the video summary pipeline")
+    parser.add_argument("--videos", type=int, default=3, help="number of synthetic videos")
+    parser.add_argument("--duration", type=float, default=12, help="length of each video in seconds")
+    parser.add_argument("--iterations", type=int, default=20, help="samples per stage")
+    parser.add_argument("--summary-words", type=int, default=600, help="words per chunk_embed summary")
+    parser.add_argument("--timeline-window", type=float, default=6, help="TIMELINE_WINDOW for ingest")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="fake model latency in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workdir", default=None, help="scratch directory (default: new temp dir)")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep application logs")
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="video-summary-bench-"))
+    output_path = os.path.abspath(args.output) if args.output else None
+    configure_environment(workdir, args)
+    # Relative defaults (e.g. the Chroma directory) resolve inside the scratch directory
+    os.chdir(workdir)
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    report = run(args, workdir)
+    output = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,113 @@
+import time
+import threading
+from contextlib import contextmanager
 import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.constants import ClientFlag
 from decouple import config
 from dotenv import load_dotenv
 
 # Load environment variables from the .env file
 load_dotenv()
 
+# ------------------------------------------------------------
+# Globals: _POOL / _POOL_LOCK / _CONNECTION_AGES
+# Description:
+#   One MySQL connection pool per process, created lazily and
+#   shared by every Connection instance. _CONNECTION_AGES keeps
+#   the time each server connection (by connection id) was
+#   opened, for recycling; ids are dropped when replaced.
+# ------------------------------------------------------------
+_POOL = None
+_POOL_LOCK = threading.Lock()
+_CONNECTION_AGES: dict = {}
+
 
 # Class: Connection
 # -----------------
 # Handles all MySQL database connection operations.
-# - Connects to the database using credentials from environment variables.
-# - Reuses an existing connection if one is already open.
-# - Provides a method to safely close the connection.
+# - Borrows connections from a process-wide pool configured from
+#   environment variables (size, checkout timeout, recycle age).
+# - Health-checks every connection on checkout and recycles
+#   connections older than MYSQL_POOL_RECYCLE seconds.
+# - Returns connections to the pool when the caller is done.
 class Connection:
     def __init__(self):
-        # Initialize a private connection attribute (starts as None)
-        self.__connection = None
+        self.__pool_size = int(config("MYSQL_POOL_SIZE", default=5))
+        self.__timeout = float(config("MYSQL_POOL_TIMEOUT", default=10))
+        self.__recycle = float(config("MYSQL_POOL_RECYCLE", default=1800))
+
+    # Method: _pool
+    # --------------------
+    # Returns the process-wide pool, creating it on first use.
+    # FOUND_ROWS is disabled so that affected-row counts tell
+    # inserted rows apart from unchanged duplicates.
+    def _pool(self):
+        global _POOL
+        if _POOL is None:
+            with _POOL_LOCK:
+                if _POOL is None:
+                    _POOL = pooling.MySQLConnectionPool(
+                        pool_name="video_analyzer",
+                        pool_size=self.__pool_size,
+                        pool_reset_session=True,
+                        host=config("HOST"),
+                        user=config("USER"),
+                        password=config("PASSWORD"),
+                        database=config("DATABASE"),
+                        port=config("PORT"),
+                        autocommit=True,
+                        client_flags=[-ClientFlag.FOUND_ROWS]
+                    )
+        return _POOL
 
     # Method: connect_db
     # --------------------
-    # Establishes a connection to the MySQL database.
-    # - Uses credentials (host, user, password, etc.) from environment variables.
-    # - Creates a new connection if not already connected.
-    # - Returns the active MySQL connection.
-    # - Raises a ConnectionError if the connection fails.
+    # Borrows a healthy connection from the pool.
+    # - Waits up to MYSQL_POOL_TIMEOUT seconds when the pool is exhausted.
+    # - Pings (and reconnects) stale connections, and reconnects
+    #   connections older than MYSQL_POOL_RECYCLE.
+    # - The caller must close() it to return it to the pool.
+    # - Raises a ConnectionError if no connection can be obtained.
     def connect_db(self):
-        if not self.__connection or not self.__connection.is_connected():
+        deadline = time.monotonic() + self.__timeout
+        while True:
             try:
-                self.__connection = mysql.connector.connect(
-                    host=config("HOST"),
-                    user=config("USER"),
-                    password=config("PASSWORD"),
-                    database=config("DATABASE"),
-                    port=config("PORT"),
-                    autocommit=True
-                )
+                cnx = self._pool().get_connection()
+                break
+            except pooling.PoolError as e:
+                if time.monotonic() > deadline:
+                    raise ConnectionError(f"MySQL pool exhausted: {e}")
+                time.sleep(0.05)
             except mysql.connector.Error as e:
                 raise ConnectionError(f"MySQL Connection Failed: {e}")
-        return self.__connection
+
+        connection_id = cnx.connection_id
+        try:
+            opened_at = _CONNECTION_AGES.get(connection_id)
+            if opened_at is not None and time.time() - opened_at > self.__recycle:
+                cnx.reconnect(attempts=2, delay=0)
+            else:
+                cnx.ping(reconnect=True, attempts=2, delay=0)
+        except mysql.connector.Error as e:
+            _CONNECTION_AGES.pop(connection_id, None)
+            cnx.close()
+            raise ConnectionError(f"MySQL Connection Failed: {e}")
+        # A reconnect (recycle or failed ping) opens a new server
+        # connection with a new id; forget the old one
+        if cnx.connection_id != connection_id:
+            _CONNECTION_AGES.pop(connection_id, None)
+        _CONNECTION_AGES.setdefault(cnx.connection_id, time.time())
+        return cnx
+
+    # Method: connection
+    # --------------------
+    # Context manager that borrows a connection and always
+    # returns it to the pool.
+    @contextmanager
+    def connection(self):
+        cnx = self.connect_db()
+        try:
+            yield cnx
+        finally:
+            cnx.close()
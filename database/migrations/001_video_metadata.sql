@@ -0,0 +1,11 @@
+-- Adds technical metadata extracted once at upload time so the
+-- video list no longer probes every file on each render.
+ALTER TABLE `videos`
+  ADD COLUMN `duration` decimal(10,3) DEFAULT NULL,
+  ADD COLUMN `width` int DEFAULT NULL,
+  ADD COLUMN `height` int DEFAULT NULL,
+  ADD COLUMN `bitrate` int DEFAULT NULL,
+  ADD COLUMN `codec` varchar(32) DEFAULT NULL,
+  ADD COLUMN `file_size` bigint DEFAULT NULL,
+  ADD COLUMN `content_hash` char(64) DEFAULT NULL,
+  ADD KEY `idx_videos_content_hash` (`content_hash`);
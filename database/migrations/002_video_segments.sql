@@ -0,0 +1,11 @@
+-- Per-video timeline index: fixed-window summaries used to answer
+-- range summaries without re-calling the model on the video.
+CREATE TABLE `video_segments` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `video_name` varchar(150) NOT NULL,
+  `start_time` decimal(10,3) NOT NULL,
+  `end_time` decimal(10,3) NOT NULL,
+  `summary` text NOT NULL,
+  PRIMARY KEY (`id`),
+  KEY `idx_segments_video_range` (`video_name`, `start_time`, `end_time`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
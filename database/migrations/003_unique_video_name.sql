@@ -0,0 +1,5 @@
+-- Makes video_name unique so VideoTableService.add_video can use a
+-- single INSERT ... ON DUPLICATE KEY UPDATE. Remove duplicate names
+-- before running this migration.
+ALTER TABLE `videos`
+  ADD UNIQUE KEY `uniq_videos_video_name` (`video_name`);
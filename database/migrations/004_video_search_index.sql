@@ -0,0 +1,5 @@
+-- Replaces leading-wildcard LIKE scans in VideoTableService.video_list
+-- with an ngram FULLTEXT index (works for substrings of names and
+-- categories, including CJK text).
+ALTER TABLE `videos`
+  ADD FULLTEXT KEY `ft_videos_name_category` (`video_name`, `category`) WITH PARSER ngram;
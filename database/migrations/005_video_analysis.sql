@@ -0,0 +1,12 @@
+-- Searchable analysis fields returned by the summary call itself
+-- (category and suitability already exist), and topics added to
+-- the ngram FULLTEXT index used by VideoTableService.video_list.
+ALTER TABLE `videos`
+  ADD COLUMN `language` varchar(32) DEFAULT NULL AFTER `suitability`,
+  ADD COLUMN `topics` varchar(512) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci DEFAULT NULL AFTER `language`,
+  ADD COLUMN `key_moments` json DEFAULT NULL AFTER `topics`,
+  ADD KEY `idx_videos_suitability` (`suitability`);
+
+ALTER TABLE `videos`
+  DROP INDEX `ft_videos_name_category`,
+  ADD FULLTEXT KEY `ft_videos_search` (`video_name`, `category`, `topics`) WITH PARSER ngram;
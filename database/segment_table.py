@@ -0,0 +1,72 @@
+from database.connection import Connection
+import mysql.connector
+from logger_app import setup_logger
+# ------------------------------------------------------------
+# Class: SegmentTableService
+# Description:
+#   Handles all operations for the 'video_segments' table, the
+#   per-video timeline index of fixed-window summaries.
+#   Features include:
+#     - Replace the timeline of a video in one transaction
+#     - Fetch segments overlapping a (start, end) time range
+# ------------------------------------------------------------
+
+
+class SegmentTableService:
+    # ------------------------------------------------------------
+    # Method: __init__
+    # Description:
+    #   Initializes the Connection helper; connections are
+    #   borrowed from the process-wide pool per operation.
+    # ------------------------------------------------------------
+    def __init__(self):
+        self.__connection = Connection()
+        self.__logger = setup_logger(__name__)
+
+    # ------------------------------------------------------------
+    # Method: replace_segments
+    # Description:
+    #   Deletes the existing timeline of a video and inserts the
+    #   new segments ({start, end, summary}) in one transaction.
+    #   Raises LookupError in case of MySQL query failure.
+    # ------------------------------------------------------------
+    def replace_segments(self, video_name: str, segments: list):
+        with self.__connection.connection() as db:
+            try:
+                db.start_transaction()
+                with db.cursor() as cursor:
+                    cursor.execute(
+                        "DELETE FROM `video_segments` WHERE `video_name` = %s", (video_name,)
+                    )
+                    cursor.executemany(
+                        "INSERT INTO `video_segments` (`video_name`, `start_time`, `end_time`, `summary`)"
+                        " VALUES (%s, %s, %s, %s)",
+                        [(video_name, s["start"], s["end"], s["summary"]) for s in segments]
+                    )
+                db.commit()
+            except mysql.connector.Error as e:
+                db.rollback()
+                raise LookupError(f"MySQL Query Failed: {e}")
+
+    # ------------------------------------------------------------
+    # Method: segments_in_range
+    # Description:
+    #   Returns the segments of a video that overlap the given
+    #   time range, ordered by start time.
+    # ------------------------------------------------------------
+    def segments_in_range(self, video_name: str, start: float, end: float) -> list:
+        try:
+            query = (
+                "SELECT `start_time`, `end_time`, `summary` FROM `video_segments`"
+                " WHERE `video_name` = %s AND `start_time` < %s AND `end_time` > %s"
+                " ORDER BY `start_time`"
+            )
+            with self.__connection.connection() as db:
+                with db.cursor(dictionary=True) as cursor:
+                    cursor.execute(query, (video_name, end, start))
+                    return [
+                        {"start": float(r["start_time"]), "end": float(r["end_time"]), "summary": r["summary"]}
+                        for r in cursor.fetchall()
+                    ]
+        except mysql.connector.Error as e:
+            raise LookupError(f"MySQL Query Failed: {e}")
@@ -1,13 +1,41 @@
 from database.connection import Connection
 import mysql.connector
 from logger_app import setup_logger
+from typing import Optional
+from decouple import config
+
+# ------------------------------------------------------------
+# Global: METADATA_COLUMNS
+# Description:
+#   Technical metadata columns filled once at upload time by
+#   VideoMetadataService.
+# ------------------------------------------------------------
+METADATA_COLUMNS = ("duration", "width", "height", "bitrate",
+                    "codec", "file_size", "content_hash")
+
+# ------------------------------------------------------------
+# Global: ANALYSIS_COLUMNS
+# Description:
+#   Searchable columns filled from the structured output of
+#   the summary model call (services.video_analysis).
+# ------------------------------------------------------------
+ANALYSIS_COLUMNS = ("category", "suitability", "language", "topics", "key_moments")
+
+# ------------------------------------------------------------
+# Globals: PAGE_SIZE / NGRAM_TOKEN_SIZE
+# Description:
+#   Default number of videos per list page, and the server's
+#   ngram_token_size (shorter search terms cannot use FULLTEXT).
+# ------------------------------------------------------------
+PAGE_SIZE = int(config("VIDEO_PAGE_SIZE", default=20))
+NGRAM_TOKEN_SIZE = int(config("NGRAM_TOKEN_SIZE", default=2))
 # ------------------------------------------------------------
 # Class: VideoTableService
 # Description:
 #   Handles all CRUD operations for the 'videos' table.
 #   Features include:
 #     - Insert, update, delete, and fetch video records
-#     - Filter and list videos by name, or category
+#     - Filter and list videos by name, category or topic
 #     - Safe MySQL query execution with error handling
 # ------------------------------------------------------------
 
@@ -16,42 +44,66 @@ class VideoTableService:
     # ------------------------------------------------------------
     # Method: __init__
     # Description:
-    #   Initializes a new database connection using the
-    #   Connection class. Establishes a persistent connection
-    #   for all video-related operations.
+    #   Initializes the Connection helper. Connections are
+    #   borrowed from the process-wide pool per operation and
+    #   returned right after, so instances are cheap to create.
     # ------------------------------------------------------------
     def __init__(self):
         self.__connection = Connection()
-        self.__db = None
         self.__logger = setup_logger(__name__)
 
     # ------------------------------------------------------------
-    # Method: _connect
+    # Method: add_video
     # Description:
-    #   Ensures a database connection is established.
-    #   If no connection exists, it creates a new one.
+    #   Inserts a new record into the 'videos' table in a single
+    #   round trip (INSERT ... ON DUPLICATE KEY UPDATE on the
+    #   unique video_name), safe under concurrent uploads. Uses
+    #   VALUES(col) rather than a row alias, which needs MySQL
+    #   8.0.19+ and is not supported by MariaDB.
+    #   - Stores the optional metadata extracted at upload; for an
+    #     existing video the metadata columns are refreshed.
+    #   - Returns True if a new row was inserted, False otherwise.
     # ------------------------------------------------------------
-    def _connect(self):
-        if self.__db is None or not self.__db.is_connected():
-            self.__db = self.__connection.connect_db()
+
+    def add_video(self, video_name: str, video_type: int, metadata: Optional[dict] = None) -> bool:
+        try:
+            columns = ["video_name", "video_type"]
+            values = [video_name, video_type]
+            update = "`id` = `id`"
+            if metadata:
+                columns.extend(METADATA_COLUMNS)
+                values.extend(metadata.get(c) for c in METADATA_COLUMNS)
+                update = ", ".join(f"`{c}` = VALUES(`{c}`)" for c in METADATA_COLUMNS)
+            query = (
+                f"INSERT INTO `videos` ({', '.join(f'`{c}`' for c in columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))}) "
+                f"ON DUPLICATE KEY UPDATE {update}"
+            )
+            with self.__connection.connection() as db:
+                with db.cursor() as cursor:
+                    cursor.execute(query, tuple(values))
+                    # 1 = inserted, 2 = existing row updated, 0 = unchanged
+                    return cursor.rowcount == 1
+        except mysql.connector.Error as e:
+            raise LookupError(f"MySQL Query Failed: {e}")
 
     # ------------------------------------------------------------
-    # Method: add_video
+    # Method: update_analysis
     # Description:
-    #   Inserts a new record into the 'videos' table.
-    #   - Prevents duplicates by checking existing records first.
-    #   - Returns True if insertion is successful, False otherwise.
+    #   Stores the analysis fields of a video in one UPDATE.
+    #   Fields the model did not return (None) keep their value.
+    #   Raises LookupError in case of MySQL query failure.
     # ------------------------------------------------------------
-
-    def add_video(self, video_name: str, video_type: int) -> bool:
-        self._connect()
-        if not self.get_video_by_name(video_name):
-            query = "INSERT INTO `videos` (`video_name`, `video_type`) VALUES (%s, %s)"
-            with self.__db.cursor() as cursor:
-                cursor.execute(query, (video_name, video_type))
-            self.__db.commit()
-            return True
-        return False
+    def update_analysis(self, video_name: str, analysis: dict):
+        try:
+            assignments = ", ".join(f"`{c}` = COALESCE(%s, `{c}`)" for c in ANALYSIS_COLUMNS)
+            query = f"UPDATE `videos` SET {assignments} WHERE `video_name` = %s"
+            values = [analysis.get(c) for c in ANALYSIS_COLUMNS]
+            with self.__connection.connection() as db:
+                with db.cursor() as cursor:
+                    cursor.execute(query, (*values, video_name))
+        except mysql.connector.Error as e:
+            raise LookupError(f"MySQL Query Failed: {e}")
 
     # ------------------------------------------------------------
     # Method: get_video_by_name
@@ -62,35 +114,91 @@ class VideoTableService:
     # ------------------------------------------------------------
     def get_video_by_name(self, name: str):
         try:
-            self._connect()
             query = "SELECT * FROM `videos` WHERE `video_name` = %s"
-            with self.__db.cursor(dictionary=True) as cursor:
-                cursor.execute(query, (name,))
-                return cursor.fetchone()
+            with self.__connection.connection() as db:
+                with db.cursor(dictionary=True) as cursor:
+                    cursor.execute(query, (name,))
+                    return cursor.fetchone()
+        except mysql.connector.Error as e:
+            raise LookupError(f"MySQL Query Failed: {e}")
+
+    # ------------------------------------------------------------
+    # Method: get_video_by_hash
+    # Description:
+    #   Fetches the oldest video whose file has the given SHA-256
+    #   content hash (indexed), or None. Used to detect
+    #   byte-identical uploads under any name.
+    #   Raises LookupError in case of MySQL query failure.
+    # ------------------------------------------------------------
+    def get_video_by_hash(self, content_hash: str):
+        try:
+            query = "SELECT * FROM `videos` WHERE `content_hash` = %s ORDER BY `id` LIMIT 1"
+            with self.__connection.connection() as db:
+                with db.cursor(dictionary=True) as cursor:
+                    cursor.execute(query, (content_hash,))
+                    return cursor.fetchone()
         except mysql.connector.Error as e:
             raise LookupError(f"MySQL Query Failed: {e}")
 
     # ------------------------------------------------------------
     # Method: video_list
     # Description:
-    #   Retrieves a list of videos with optional filtering.
-    #   - Supports keyword search (ID, name, category) and suitability
+    #   Retrieves a list of videos with optional filtering, newest
+    #   first, using keyset pagination (id < after_id).
+    #   - A numeric filter is first tried as an exact ID lookup.
+    #   - Text filters use the ngram FULLTEXT index on
+    #     (video_name, category, topics); filters shorter than
+    #     the ngram size fall back to an indexed name prefix match.
     #   - Returns a list of dictionaries containing video details.
     # ------------------------------------------------------------
-    def video_list(self, filter: str = ""):
+    def video_list(self, filter: str = "", after_id: Optional[int] = None, limit: Optional[int] = None):
         try:
-            self._connect()
+            filter = filter.strip()
+            if filter.isdigit():
+                rows = self._fetch_all("SELECT * FROM `videos` WHERE `id` = %s", (int(filter),))
+                if rows:
+                    return [] if after_id is not None else rows
+
+            conditions = []
+            values: list = []
+            if filter and len(filter) >= NGRAM_TOKEN_SIZE:
+                conditions.append("MATCH(`video_name`, `category`, `topics`) AGAINST (%s IN BOOLEAN MODE)")
+                values.append('"' + filter.replace('"', " ") + '"')
+            elif filter:
+                conditions.append("`video_name` LIKE %s")
+                values.append(filter.replace("%", r"\%").replace("_", r"\_") + "%")
+            if after_id is not None:
+                conditions.append("`id` < %s")
+                values.append(after_id)
+
             query = "SELECT * FROM `videos`"
-            values = []
-            if filter:
-                query += " WHERE "
-                query += "(`id` LIKE %s OR `video_name` LIKE %s OR `category` LIKE %s)"
-                search = f"%{filter}%"
-                values.extend([search, search, search])
-
-            with self.__db.cursor(dictionary=True) as cursor:
-                cursor.execute(query, tuple(values))
-                return cursor.fetchall()
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += " ORDER BY `id` DESC"
+            if limit:
+                query += " LIMIT %s"
+                values.append(limit)
+            return self._fetch_all(query, tuple(values))
 
         except mysql.connector.Error as e:
             raise ProcessLookupError(f"MySQL Query Failed: {e}")
+
+    # ------------------------------------------------------------
+    # Method: video_page
+    # Description:
+    #   Returns one page of videos and the cursor (last id) for
+    #   the next page, or None when this is the last page.
+    # ------------------------------------------------------------
+    def video_page(self, filter: str = "", after_id: Optional[int] = None,
+                   page_size: Optional[int] = None):
+        page_size = page_size or PAGE_SIZE
+        rows = self.video_list(filter, after_id, page_size + 1)
+        if len(rows) > page_size:
+            return rows[:page_size], rows[page_size - 1]["id"]
+        return rows, None
+
+    def _fetch_all(self, query: str, values: tuple) -> list:
+        with self.__connection.connection() as db:
+            with db.cursor(dictionary=True) as cursor:
+                cursor.execute(query, values)
+                return cursor.fetchall()
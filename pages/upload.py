@@ -1,15 +1,15 @@
 import streamlit as st
-import os
-from moviepy.video.io.VideoFileClip import VideoFileClip
 from services.utility import UtilityService
+from services.video_metadata import VideoMetadataService
+from services.ingest_writer import IngestWriterService
 from database.video_table import VideoTableService
-from decouple import config
 
 
 # Initialize required services and configuration
 video_table = VideoTableService()
 utility_service = UtilityService()
-ORG_DIR = str(config("ORG_DIR"))
+metadata_service = VideoMetadataService()
+ingest_writer = IngestWriterService(video_table)
 
 
 # Section: Page Header
@@ -37,40 +37,81 @@ uploaded_file = st.file_uploader(
 )
 
 
+# Section: Job Status
+# ------------------
+# Polls the background job every few seconds and shows its
+# progress. Once the job has finished, its result is kept in
+# the session and the page reruns without the polling fragment.
+def show_job_result(job: dict):
+    if job["status"] == "succeeded":
+        st.write("**Summary:**")
+        st.write(job["result"]["summary"])
+    else:
+        st.error(f"Summary generation failed: {job['error']}")
+
+
+@st.fragment(run_every="2s")
+def show_job_status():
+    job = utility_service.job_status(st.session_state["job_id"])
+    if job is None:
+        return
+    if job["status"] in ("succeeded", "failed"):
+        st.session_state["finished_job"] = job
+        st.rerun()
+    st.progress(job["progress"], text=job["message"] or f"Job {job['status']}...")
+
+
 # Section: Process Uploaded Video
 # -------------------------------
 # When the user uploads and processes a video:
-# - Saves it to the configured ORG_DIR.
+# - Streams it into the configured ORG_DIR in chunks while hashing
+#   it; byte-identical uploads (under any name) reuse the existing
+#   video, its summary and its vectors instead of a new analysis.
+# - Extracts technical metadata (duration, codec, hash...) once.
 # - Adds video metadata to the database if it's a new upload.
 # - Displays the uploaded video and its duration.
-# - Automatically generates and displays an AI-based summary.
+# - Queues the AI-based summary as a background job, which also
+#   builds the poster frame and preview clip for the video list;
+#   the page only polls its state, so closing the tab loses nothing.
 if uploaded_file and st.button("**Process Video**"):
     is_new_video = False
 
-    # Add video entry to the database if not already existing
-    if video_table.add_video(uploaded_file.name, 0):
-        is_new_video = True
-
-    # Save uploaded video to the local directory
-    save_path = os.path.join(ORG_DIR, uploaded_file.name)
-    open(save_path, "wb").write(uploaded_file.getbuffer())
-
-    # Get video duration using MoviePy
-    clip = VideoFileClip(save_path)
-    duration = int(clip.duration)
-    clip.close()
-
-    # Display video preview and duration details
-    if save_path:
-        st.video(save_path)
-        st.write(f"**Duration:** {duration} seconds ({utility_service.format_time(duration)})")
-
-        # Generate AI-based summary for the uploaded video
-        with st.spinner("Generating summary..."):
-            summary = utility_service.generate_summary(save_path, uploaded_file.name, is_new_video)
-            st.session_state["summary"] = summary
-
-        # Display summary if generated
-        if st.session_state.get("summary"):
-            st.write("**Summary:**")
-            st.write(st.session_state["summary"])
+    # Save uploaded video to the local directory (chunked, atomic)
+    saved = ingest_writer.save(uploaded_file, uploaded_file.name)
+    save_path = saved["path"]
+    video_name = saved["video_name"]
+
+    if saved["existing"]:
+        # Same content already registered: reuse it, no new analysis
+        st.info(f"This video was already uploaded as **{video_name}**; reusing its summary.")
+        duration = saved["existing"].get("duration")
+        duration = float(duration) if duration is not None else None
+    else:
+        # Extract metadata once at ingest
+        metadata = metadata_service.extract(save_path)
+        duration = metadata["duration"]
+
+        # Add video entry (or refresh its metadata) in a single round trip
+        if video_table.add_video(video_name, 0, metadata):
+            is_new_video = True
+        if video_name != uploaded_file.name:
+            st.info(f"A different video is already named {uploaded_file.name}; saved as **{video_name}**.")
+
+    # Same (content hash, name, prompt) as an earlier upload returns that job
+    st.session_state["job_id"] = utility_service.enqueue_summary(
+        save_path, video_name, saved["content_hash"], is_new_video, duration=duration
+    )
+    st.session_state["upload_path"] = save_path
+    st.session_state["upload_duration"] = int(duration or 0)
+    st.session_state["finished_job"] = None
+
+# Display video preview, duration details and job progress
+if st.session_state.get("job_id"):
+    duration = st.session_state["upload_duration"]
+    st.video(st.session_state["upload_path"])
+    st.write(f"**Duration:** {duration} seconds ({utility_service.format_time(duration)})")
+    finished_job = st.session_state.get("finished_job")
+    if finished_job and finished_job["id"] == st.session_state["job_id"]:
+        show_job_result(finished_job)
+    else:
+        show_job_status()
@@ -1,13 +1,14 @@
 import streamlit as st
 import os
-from moviepy.video.io.VideoFileClip import VideoFileClip
 from services.utility import UtilityService
 from database.video_table import VideoTableService
+from services.preview import PreviewService
 from decouple import config
 
 # Initialize services and configuration
 video_table = VideoTableService()
 utility_service = UtilityService()
+preview_service = PreviewService()
 ORG_DIR = config("ORG_DIR")
 
 
@@ -25,14 +26,25 @@ st.session_state["summary"] = None
 st.session_state["qa_listing"] = []
 
 
+# Method: reset_pagination
+# -----------------------
+# Returns to the first page whenever the search text changes.
+def reset_pagination():
+    st.session_state["page_cursors"] = [None]
+
+
 # Method: filter_videos
 # -----------------------
-# Retrieves the list of videos from the database.
-# - Uses search and category filters from session state.
-# - Returns a list of filtered video records.
-def filter_videos() -> list:
+# Retrieves the current page of videos from the database.
+# - Uses the search filter and page cursor from session state.
+# - Returns the page records and the cursor of the next page.
+def filter_videos():
     search_val = st.session_state.get("search", "")
-    return video_table.video_list(search_val)
+    return video_table.video_page(search_val, st.session_state["page_cursors"][-1])
+
+
+if "page_cursors" not in st.session_state:
+    reset_pagination()
 
 # Section: Filter Controls
 # ------------------------
@@ -40,38 +52,46 @@ def filter_videos() -> list:
 search = st.text_input(
     "**Search**",
     key="search",
+    on_change=reset_pagination,
 )
+show_previews = st.toggle("Animated previews", help="Play short low-bitrate previews instead of poster frames")
 
 # Section: Video Listing
 # ----------------------
 # Displays all videos retrieved from the database.
-# - Shows each video's ID, name, and duration.
+# - Shows each video's poster frame (or short preview), name, and
+#   duration, all generated at upload; full videos are never embedded.
 # - Provides a button to open and view the video in detail.
-video_files = [f for f in os.listdir(ORG_DIR) if f.endswith('.mp4')]
-results = filter_videos()
+results, next_cursor = filter_videos()
 if len(results) > 0:
     with st.container(height=600):
         if os.path.exists(ORG_DIR):
             for video_file in results:
-                if video_file and video_file["video_name"] in video_files:
+                if video_file:
                     video_path = os.path.join(ORG_DIR, video_file["video_name"])
 
                     col2, col3 = st.columns([1, 3])
-                    # Display video
+                    # Display poster frame or preview clip
                     with col2:
                         with st.container(width=100):
-                            st.video(video_path)
+                            content_hash = video_file.get("content_hash")
+                            preview = preview_service.preview_path(content_hash) if show_previews else None
+                            poster = preview_service.poster_path(content_hash)
+                            if preview:
+                                st.video(preview, autoplay=True, muted=True, loop=True)
+                            elif poster:
+                                st.image(poster)
+                            else:
+                                st.write("No preview")
 
                     # Display video name and duration
                     with col3:
                         st.write(f"**Name:** {video_file['video_name']}")
-                        try:
-                            clip = VideoFileClip(video_path)
-                            duration = int(clip.duration)
-                            clip.close()
+                        if video_file.get("duration") is not None:
+                            duration = int(video_file["duration"])
                             st.write(
                                 f"**Duration:** {utility_service.format_time(duration)}")
-                        except:
+                        else:
                             st.write("**Duration:** N/A")
                             duration = 0
 
@@ -85,5 +105,20 @@ if len(results) > 0:
 
         else:
             st.warning("Video directory not found.")
+
+    # Section: Pagination Controls
+    # ----------------------------
+    # Moves between pages using keyset cursors kept in session state.
+    col_prev, col_page, col_next = st.columns([1, 4, 1])
+    with col_prev:
+        if len(st.session_state["page_cursors"]) > 1 and st.button("Previous"):
+            st.session_state["page_cursors"].pop()
+            st.rerun()
+    with col_page:
+        st.write(f"Page {len(st.session_state['page_cursors'])}")
+    with col_next:
+        if next_cursor is not None and st.button("Next"):
+            st.session_state["page_cursors"].append(next_cursor)
+            st.rerun()
 else:
     st.warning("Videos not available!")
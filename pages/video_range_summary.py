@@ -1,18 +1,10 @@
 import streamlit as st
-import os
-import uuid
-import time
-from moviepy.video.io.VideoFileClip import VideoFileClip
 from services.utility import UtilityService
-from decouple import config
 
 
 # Initialize utility service
 utility_service = UtilityService()
 
-# Load temporary directory configuration
-TEMP_DIR = config("TEMP_DIR")
-
 # Initialize temporary video path in session state
 st.session_state["temp_video_path"] = None
 
@@ -21,7 +13,9 @@ st.session_state["temp_video_path"] = None
 # -----------------------------
 # Generates a summary for a selected time range within a video.
 # - Allows the user to select start and end times via a slider.
-# - Creates a temporary video clip for the chosen segment.
+# - Composes the summary from the stored timeline index when the
+#   video is indexed; otherwise cuts (or reuses a cached) clip with
+#   a keyframe-aligned stream copy, optionally frame-exact.
 # - Generates an AI-based summary for that specific range.
 def video_range_summary(video_path, video_name, prompt):
     summary = None
@@ -37,15 +31,15 @@ def video_range_summary(video_path, video_name, prompt):
         )
 
         st.write(f"**Selected Range:** {utility_service.format_time(start_time)} → {utility_service.format_time(end_time)}")
+        exact_cut = st.checkbox(
+            "**Exact cut**",
+            help="Re-encode the first partial GOP so the clip starts exactly at the selected time"
+        )
 
         # Button to summarize the selected range
-        if st.button("**Generate Summary**"):
-            clip = VideoFileClip(video_path).subclipped(start_time, end_time)
-            new_file = f"{int(time.time())}_{uuid.uuid4().hex}.mp4"
-            temp_path = os.path.join(TEMP_DIR, new_file)  # type: ignore
-            clip.write_videofile(temp_path, codec="libx264", audio_codec="aac", logger=None)
-            clip.close()
-
+        if st.button("**Generate Summary**") and end_time > start_time:
             with st.spinner("Generating summary..."):
-                summary = utility_service.generate_summary(temp_path, video_name, False, prompt)
+                summary = utility_service.generate_range_summary(
+                    video_path, video_name, start_time, end_time, prompt, exact_cut
+                )
     return summary
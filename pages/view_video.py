@@ -12,8 +12,6 @@ utility_service = UtilityService()
 # Ensures required session variables are available and initialized.
 if "qa_listing" not in st.session_state:
     st.session_state["qa_listing"] = []
-if "question_input" not in st.session_state:
-    st.session_state["question_input"] = ""
 
 
 # Button: Back Navigation
@@ -23,26 +21,6 @@ if st.button("Back", key="back"):
     st.switch_page("pages/video_list.py")
 
 
-# Method: handle_question_submit
-# --------------------------------
-# Handles the user's question input and generates an AI-based answer.
-# - Uses the UtilityService to generate an answer related to the selected video.
-# - Appends question-answer pairs to the session state for display.
-# - Clears the input field after submission.
-def handle_question_submit():
-    question = st.session_state.question_input.strip()
-    if question:
-        answer = utility_service.generate_answer(
-            st.session_state["view_video"],
-            st.session_state.get("video_name", "video.mp4"),
-            question,
-        )
-        st.session_state.qa_listing.append(
-            {"question": question, "answer": answer}
-        )
-        st.session_state.question_input = ""
-
-
 # Section: Video Display and Summary Controls
 # -------------------------------------------
 # Displays the selected video, shows details, and allows summary generation.
@@ -67,6 +45,7 @@ if st.session_state.get("view_video"):
         prompt = utility_service.custom_prompt()
 
     summary = None
+    stream_summary = False
 
     # Columns for Summary and Time Range Summary options
     col0, col1 = st.columns([1, 1])
@@ -74,13 +53,7 @@ if st.session_state.get("view_video"):
     # Button: Generate Full Summary
     with col0:
         if st.button("**Summary**"):
-            with st.spinner("Generating summary..."):
-                summary = utility_service.generate_summary(
-                    st.session_state["view_video"],
-                    st.session_state["video_name"],
-                    False,
-                    prompt,
-                )
+            stream_summary = True
 
     # Checkbox: Generate Summary for Custom Time Range
     with col1:
@@ -92,8 +65,20 @@ if st.session_state.get("view_video"):
                 prompt,
             )
 
+    # Stream the full summary token by token below the controls
+    if stream_summary:
+        st.write("**Summary:**")
+        st.write_stream(
+            utility_service.stream_summary(
+                st.session_state["view_video"],
+                st.session_state["video_name"],
+                False,
+                prompt,
+            )
+        )
+
     # Display generated summary if available
-    if summary:
+    elif summary:
         st.write("**Summary:**")
         st.write(summary)
 
@@ -113,11 +98,26 @@ if st.session_state.get("view_video"):
                     st.write(qa["answer"])
 
     # Text Input: User Question Field
-    st.chat_input(
+    # The answer is streamed into a new assistant message and then
+    # appended to the session's question-answer pairs.
+    question = st.chat_input(
         placeholder="e.g. What is the main topic discussed in the video?",
         key="question_input",
-        on_submit=handle_question_submit,
     )
+    if question and question.strip():
+        with st.chat_message("user"):
+            st.write(question)
+        with st.chat_message("assistant"):
+            answer = st.write_stream(
+                utility_service.stream_answer(
+                    st.session_state["view_video"],
+                    st.session_state.get("video_name", "video.mp4"),
+                    question.strip(),
+                )
+            )
+        st.session_state.qa_listing.append(
+            {"question": question.strip(), "answer": answer}
+        )
 
 # Section: Empty State Warning
 # ----------------------------
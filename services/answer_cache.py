@@ -0,0 +1,153 @@
+import time
+import hashlib
+import threading
+from typing import Optional
+from decouple import config
+from langchain_chroma import Chroma
+from services.llm import LLMService
+from services.registry import RESOURCES
+from services.vector_store import VectorStoreService
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Global: _STATS
+# Description:
+#   Process-wide lookup counters for the answer cache.
+# ------------------------------------------------------------
+_STATS = {"hits": 0, "misses": 0, "writes": 0, "invalidations": 0}
+_STATS_LOCK = threading.Lock()
+
+
+# ------------------------------------------------------------
+# Class: AnswerCacheService
+# Description:
+#   Semantic cache of Q&A answers, stored in its own Chroma
+#   collection ("answer_cache", cosine distance).
+#   - A question is embedded once; if a past question about the
+#     same video, asked with the same conversation context, is at
+#     least ANSWER_CACHE_THRESHOLD similar, its answer is returned
+#     without retrieval or an LLM call.
+#   - Entries of a video are invalidated whenever its summaries
+#     are re-indexed, so answers never outlive their context.
+# ------------------------------------------------------------
+class AnswerCacheService:
+    def __init__(self):
+        self.__llm_service = LLMService()
+        self.__threshold = float(config("ANSWER_CACHE_THRESHOLD", default=0.92))
+        self.__enabled = str(config("ANSWER_CACHE_ENABLED", default="true")).lower() == "true"
+        self.__logger = setup_logger(__name__)
+
+    # ------------------------------------------------------------
+    # Method: cache_db
+    # Description:
+    #   Returns the shared Chroma handle of the cache collection.
+    # ------------------------------------------------------------
+    def cache_db(self):
+        return RESOURCES.get(
+            "vector_db:answer_cache",
+            lambda: Chroma(
+                collection_name="answer_cache",
+                embedding_function=self.__llm_service.get_embedding_model(),
+                persist_directory="./database/vector_db/chroma_db",
+                collection_metadata={"hnsw:space": "cosine"},
+            ),
+            health_check=VectorStoreService.health_check
+        )
+
+    # ------------------------------------------------------------
+    # Method: context_key
+    # Description:
+    #   Digest of the conversation history sent with a question.
+    #   The answer prompt includes the history, so an answer is
+    #   only reused for the same history; a fresh conversation
+    #   has the empty key and shares answers across sessions.
+    # ------------------------------------------------------------
+    @staticmethod
+    def context_key(history: list) -> str:
+        if not history:
+            return ""
+        digest = hashlib.sha256()
+        for message in history:
+            digest.update(f"{message.type}\x1f{message.content}\x1e".encode("utf-8"))
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------
+    # Method: lookup
+    # Description:
+    #   Returns (answer, embedding). `answer` is None on a miss;
+    #   the question embedding is returned so `put` can reuse it.
+    #   Only entries stored with the same `context` (see
+    #   context_key) are considered.
+    # ------------------------------------------------------------
+    def lookup(self, video_name: str, question: str, context: str = ""):
+        if not self.__enabled:
+            return None, None
+        embedding = self.__llm_service.get_embedding_model().embed_query(question)
+        try:
+            results = self.cache_db().similarity_search_by_vector_with_relevance_scores(
+                embedding, k=1, filter={"$and": [{"source": video_name}, {"context": context}]}
+            )
+        except Exception as e:
+            self.__logger.warning(f"Answer cache lookup failed: {e}")
+            results = []
+
+        if results:
+            document, distance = results[0]
+            if 1 - distance >= self.__threshold:
+                self._count("hits")
+                return document.metadata["answer"], embedding
+        self._count("misses")
+        return None, embedding
+
+    # ------------------------------------------------------------
+    # Method: put
+    # Description:
+    #   Stores an answer under the question embedding and the
+    #   conversation context it was answered in.
+    # ------------------------------------------------------------
+    def put(self, video_name: str, question: str, answer: str, embedding: Optional[list],
+            context: str = ""):
+        if not self.__enabled or not answer or embedding is None:
+            return
+        key = hashlib.sha256(f"{video_name}\x1f{context}\x1f{question}".encode("utf-8")).hexdigest()
+        try:
+            VectorStoreService.upsert_vectors(
+                self.cache_db(),
+                ids=[key],
+                embeddings=[embedding],
+                documents=[question],
+                metadatas=[{"source": video_name, "context": context, "answer": answer,
+                            "created_at": time.time()}]
+            )
+            self._count("writes")
+        except Exception as e:
+            self.__logger.warning(f"Answer cache write failed: {e}")
+
+    # ------------------------------------------------------------
+    # Method: invalidate
+    # Description:
+    #   Drops every cached answer of a video.
+    # ------------------------------------------------------------
+    def invalidate(self, video_name: str):
+        try:
+            self.cache_db().delete(where={"source": video_name})
+            self._count("invalidations")
+        except Exception as e:
+            self.__logger.warning(f"Answer cache invalidation failed: {e}")
+
+    # ------------------------------------------------------------
+    # Method: stats
+    # Description:
+    #   Returns hit/miss counters and the hit rate.
+    # ------------------------------------------------------------
+    def stats(self) -> dict:
+        with _STATS_LOCK:
+            stats = dict(_STATS)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    @staticmethod
+    def _count(name: str):
+        with _STATS_LOCK:
+            _STATS[name] += 1
@@ -0,0 +1,571 @@
+import time
+import queue
+import random
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Optional
+from decouple import config
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatResult
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Global: _DEADLINE
+# Description:
+#   Absolute time.monotonic() deadline of the current request.
+#   Set with `call_deadline(seconds)`; every governed model call
+#   made inside that scope (also from graph nodes and worker
+#   threads started with a copied context) shares it.
+# ------------------------------------------------------------
+_DEADLINE: contextvars.ContextVar = contextvars.ContextVar("llm_call_deadline", default=None)
+
+# ------------------------------------------------------------
+# Global: RETRYABLE_STATUS / RETRYABLE_NAMES
+# Description:
+#   Provider errors worth retrying: throttling, timeouts and
+#   transient server failures. Matched on the exception's
+#   status code or class name so no provider SDK is imported.
+# ------------------------------------------------------------
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = (
+    "RateLimit", "ResourceExhausted", "ServiceUnavailable", "Timeout",
+    "DeadlineExceeded", "InternalServerError", "APIConnectionError",
+)
+
+
+# ------------------------------------------------------------
+# Class: CircuitOpenError / DeadlineExceededError
+# Description:
+#   Raised instead of calling the provider when its circuit is
+#   open, or when the request deadline has passed.
+# ------------------------------------------------------------
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class DeadlineExceededError(TimeoutError):
+    pass
+
+
+# ------------------------------------------------------------
+# Method: call_deadline
+# Description:
+#   Context manager bounding every model call inside it to
+#   `seconds` from now. Nested scopes can only tighten it.
+# ------------------------------------------------------------
+@contextmanager
+def call_deadline(seconds: float):
+    deadline = time.monotonic() + seconds
+    current = _DEADLINE.get()
+    token = _DEADLINE.set(min(deadline, current) if current else deadline)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+# ------------------------------------------------------------
+# Class: TokenBucket
+# Description:
+#   Thread-safe token bucket refilled at `per_minute` units per
+#   minute, holding at most `capacity`. `acquire` blocks until
+#   the units are available or the deadline passes. `charge`
+#   books units after the fact (e.g. output tokens) and may
+#   leave the bucket in debt, delaying the next callers.
+# ------------------------------------------------------------
+class TokenBucket:
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.__rate = per_minute / 60.0
+        self.__capacity = capacity or per_minute
+        self.__tokens = self.__capacity
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def _reserve(self, amount: float) -> float:
+        # Returns how long to wait before `amount` is available
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated) * self.__rate)
+            self.__updated = now
+            amount = min(amount, self.__capacity)
+            if self.__tokens >= amount:
+                self.__tokens -= amount
+                return 0.0
+            return (amount - self.__tokens) / self.__rate
+
+    def acquire(self, amount: float = 1, deadline: Optional[float] = None):
+        while True:
+            wait_for = self._reserve(amount)
+            if wait_for == 0:
+                return
+            if deadline is not None and time.monotonic() + wait_for > deadline:
+                raise DeadlineExceededError("Rate limit wait exceeds the request deadline")
+            time.sleep(min(wait_for, 1.0))
+
+    async def aacquire(self, amount: float = 1, deadline: Optional[float] = None):
+        while True:
+            wait_for = self._reserve(amount)
+            if wait_for == 0:
+                return
+            if deadline is not None and time.monotonic() + wait_for > deadline:
+                raise DeadlineExceededError("Rate limit wait exceeds the request deadline")
+            await asyncio.sleep(min(wait_for, 1.0))
+
+    def charge(self, amount: float):
+        with self.__lock:
+            self.__tokens -= amount
+
+
+# ------------------------------------------------------------
+# Class: CircuitBreaker
+# Description:
+#   Opens after `threshold` consecutive retryable failures and
+#   rejects calls for `reset_after` seconds. Then one trial call
+#   is let through (half-open); its outcome closes or re-opens
+#   the circuit.
+# ------------------------------------------------------------
+class CircuitBreaker:
+    def __init__(self, threshold: int, reset_after: float):
+        self.__threshold = threshold
+        self.__reset_after = reset_after
+        self.__failures = 0
+        self.__opened_at = None
+        self.__trial = False
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.__lock:
+            if self.__opened_at is None:
+                return "closed"
+            if time.monotonic() - self.__opened_at >= self.__reset_after:
+                return "half-open"
+            return "open"
+
+    # Returns True when the caller holds the half-open trial and
+    # must end it with record_success / record_failure / release
+    def allow(self) -> bool:
+        with self.__lock:
+            if self.__opened_at is None:
+                return False
+            if time.monotonic() - self.__opened_at < self.__reset_after or self.__trial:
+                raise CircuitOpenError("Circuit open: provider is failing, try again later")
+            self.__trial = True
+            return True
+
+    def release(self):
+        with self.__lock:
+            self.__trial = False
+
+    def record_success(self):
+        with self.__lock:
+            self.__failures = 0
+            self.__opened_at = None
+            self.__trial = False
+
+    def record_failure(self):
+        with self.__lock:
+            self.__failures += 1
+            if self.__trial or self.__failures >= self.__threshold:
+                self.__opened_at = time.monotonic()
+            self.__trial = False
+
+
+# ------------------------------------------------------------
+# Class: CallGovernor
+# Description:
+#   Shared policy for every call to one provider/model:
+#     - request and token buckets (LLM_REQUESTS_PER_MINUTE,
+#       LLM_TOKENS_PER_MINUTE, shared per provider);
+#     - a deadline per call (LLM_CALL_DEADLINE, tightened by an
+#       enclosing `call_deadline`), each attempt bounded by
+#       LLM_ATTEMPT_TIMEOUT and the time left;
+#     - LLM_MAX_RETRIES retries of throttling / transient errors
+#       with full-jitter exponential backoff (LLM_BACKOFF_BASE,
+#       LLM_BACKOFF_MAX);
+#     - a circuit breaker per provider/model;
+#     - optional hedging: if no answer after LLM_HEDGE_AFTER
+#       seconds, a duplicate request is sent and the first
+#       result wins (0 disables it).
+# ------------------------------------------------------------
+class CallGovernor:
+    def __init__(self, name: str, requests: Optional[TokenBucket], tokens: Optional[TokenBucket]):
+        self.__name = name
+        self.__requests = requests
+        self.__tokens = tokens
+        self.__deadline = float(config("LLM_CALL_DEADLINE", default=300))
+        self.__attempt_timeout = float(config("LLM_ATTEMPT_TIMEOUT", default=120))
+        self.__max_retries = int(config("LLM_MAX_RETRIES", default=3))
+        self.__backoff_base = float(config("LLM_BACKOFF_BASE", default=1))
+        self.__backoff_max = float(config("LLM_BACKOFF_MAX", default=30))
+        self.__hedge_after = float(config("LLM_HEDGE_AFTER", default=0))
+        self.__breaker = CircuitBreaker(
+            int(config("LLM_BREAKER_THRESHOLD", default=5)),
+            float(config("LLM_BREAKER_RESET", default=30))
+        )
+        self.__executor = ThreadPoolExecutor(
+            max_workers=int(config("LLM_GOVERNOR_WORKERS", default=16)),
+            thread_name_prefix="llm-call"
+        )
+        self.__logger = setup_logger(__name__)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self.__breaker
+
+    # ------------------------------------------------------------
+    # Method: is_retryable
+    # Description:
+    #   True for throttling, timeouts and transient server errors.
+    # ------------------------------------------------------------
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        if isinstance(error, (CircuitOpenError, DeadlineExceededError)):
+            return False
+        if isinstance(error, (TimeoutError, FutureTimeoutError, ConnectionError)):
+            return True
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        if isinstance(status, int) and status in RETRYABLE_STATUS:
+            return True
+        return any(name in type(error).__name__ for name in RETRYABLE_NAMES)
+
+    # ------------------------------------------------------------
+    # Method: call
+    # Description:
+    #   Runs `fn()` under the policy and returns its result.
+    #   `fn` runs on the governor's thread pool so attempts can
+    #   time out and be hedged; a timed-out attempt is abandoned
+    #   (its HTTP client timeout eventually ends it).
+    # ------------------------------------------------------------
+    def call(self, fn, estimated_tokens: int = 0):
+        deadline = self._deadline()
+        for attempt in range(self.__max_retries + 1):
+            trial = self.__breaker.allow()
+            try:
+                self._admit(deadline, estimated_tokens)
+                result = self._attempt(fn, deadline)
+                self.__breaker.record_success()
+                return result
+            except Exception as e:
+                if not self._should_retry(e, attempt, deadline):
+                    raise
+            finally:
+                if trial:
+                    self.__breaker.release()
+            time.sleep(self._backoff(attempt, deadline))
+
+    # ------------------------------------------------------------
+    # Method: acall
+    # Description:
+    #   Async counterpart of `call`; `afn()` returns a coroutine.
+    #   Losing hedged attempts are cancelled.
+    # ------------------------------------------------------------
+    async def acall(self, afn, estimated_tokens: int = 0):
+        deadline = self._deadline()
+        for attempt in range(self.__max_retries + 1):
+            trial = self.__breaker.allow()
+            try:
+                await self._aadmit(deadline, estimated_tokens)
+                result = await self._aattempt(afn, deadline)
+                self.__breaker.record_success()
+                return result
+            except Exception as e:
+                if not self._should_retry(e, attempt, deadline):
+                    raise
+            finally:
+                if trial:
+                    self.__breaker.release()
+            await asyncio.sleep(self._backoff(attempt, deadline))
+
+    # ------------------------------------------------------------
+    # Method: stream / astream
+    # Description:
+    #   Governs a streamed call. Attempts are retried only until
+    #   the first chunk arrives; after that an error is final.
+    #   Every chunk must arrive within the attempt timeout and
+    #   before the deadline, so a stalled or overlong stream ends
+    #   with TimeoutError / DeadlineExceededError. Streams are
+    #   never hedged.
+    # ------------------------------------------------------------
+    def stream(self, fn, estimated_tokens: int = 0):
+        deadline = self._deadline()
+        for attempt in range(self.__max_retries + 1):
+            trial = self.__breaker.allow()
+            started = False
+            try:
+                self._admit(deadline, estimated_tokens)
+                for chunk in self._chunks(fn, deadline):
+                    started = True
+                    yield chunk
+                self.__breaker.record_success()
+                return
+            except Exception as e:
+                if started:
+                    if self.is_retryable(e):
+                        self.__breaker.record_failure()
+                    raise
+                if not self._should_retry(e, attempt, deadline):
+                    raise
+            finally:
+                if trial:
+                    self.__breaker.release()
+            time.sleep(self._backoff(attempt, deadline))
+
+    async def astream(self, afn, estimated_tokens: int = 0):
+        deadline = self._deadline()
+        for attempt in range(self.__max_retries + 1):
+            trial = self.__breaker.allow()
+            started = False
+            try:
+                await self._aadmit(deadline, estimated_tokens)
+                async for chunk in self._achunks(afn, deadline):
+                    started = True
+                    yield chunk
+                self.__breaker.record_success()
+                return
+            except Exception as e:
+                if started:
+                    if self.is_retryable(e):
+                        self.__breaker.record_failure()
+                    raise
+                if not self._should_retry(e, attempt, deadline):
+                    raise
+            finally:
+                if trial:
+                    self.__breaker.release()
+            await asyncio.sleep(self._backoff(attempt, deadline))
+
+    # ------------------------------------------------------------
+    # Method: charge_tokens
+    # Description:
+    #   Books tokens reported by the provider after a call (e.g.
+    #   output tokens) against the token bucket.
+    # ------------------------------------------------------------
+    def charge_tokens(self, tokens: int):
+        if self.__tokens is not None and tokens > 0:
+            self.__tokens.charge(tokens)
+
+    def _deadline(self) -> float:
+        deadline = time.monotonic() + self.__deadline
+        outer = _DEADLINE.get()
+        return min(deadline, outer) if outer else deadline
+
+    def _remaining(self, deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"{self.__name}: request deadline exceeded")
+        return remaining
+
+    def _admit(self, deadline: float, estimated_tokens: int):
+        if self.__requests is not None:
+            self.__requests.acquire(1, deadline)
+        if self.__tokens is not None and estimated_tokens:
+            self.__tokens.acquire(estimated_tokens, deadline)
+
+    async def _aadmit(self, deadline: float, estimated_tokens: int):
+        if self.__requests is not None:
+            await self.__requests.aacquire(1, deadline)
+        if self.__tokens is not None and estimated_tokens:
+            await self.__tokens.aacquire(estimated_tokens, deadline)
+
+    def _attempt(self, fn, deadline: float):
+        timeout = min(self.__attempt_timeout, self._remaining(deadline))
+        context = contextvars.copy_context()
+        futures = [self.__executor.submit(context.run, fn)]
+        if 0 < self.__hedge_after < timeout:
+            done, _ = wait(futures, timeout=self.__hedge_after)
+            if not done:
+                self.__logger.info(f"{self.__name}: hedging slow request")
+                futures.append(self.__executor.submit(contextvars.copy_context().run, fn))
+
+        pending = futures
+        end = time.monotonic() + timeout
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, end - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(f"{self.__name}: attempt timed out after {timeout:.1f}s")
+
+    async def _aattempt(self, afn, deadline: float):
+        timeout = min(self.__attempt_timeout, self._remaining(deadline))
+        tasks = [asyncio.ensure_future(afn())]
+        try:
+            if 0 < self.__hedge_after < timeout:
+                done, _ = await asyncio.wait(tasks, timeout=self.__hedge_after)
+                if not done:
+                    self.__logger.info(f"{self.__name}: hedging slow request")
+                    tasks.append(asyncio.ensure_future(afn()))
+
+            pending = set(tasks)
+            end = time.monotonic() + timeout
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, end - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            if error is not None and not pending:
+                raise error
+            raise TimeoutError(f"{self.__name}: attempt timed out after {timeout:.1f}s")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # ------------------------------------------------------------
+    # Method: _chunks / _achunks
+    # Description:
+    #   Yield the chunks of one streamed attempt, waiting at most
+    #   the attempt timeout (bounded by the deadline) for each.
+    #   The sync stream is pulled on the governor's pool so the
+    #   wait can time out; an abandoned stream stops at its next
+    #   chunk.
+    # ------------------------------------------------------------
+    def _chunks(self, fn, deadline: float):
+        chunks = queue.Queue()
+        finished = object()
+        stop = threading.Event()
+
+        def pump():
+            try:
+                for chunk in fn():
+                    if stop.is_set():
+                        return
+                    chunks.put((chunk, None))
+                chunks.put((finished, None))
+            except Exception as e:
+                chunks.put((finished, e))
+
+        self.__executor.submit(contextvars.copy_context().run, pump)
+        try:
+            while True:
+                timeout = min(self.__attempt_timeout, self._remaining(deadline))
+                try:
+                    chunk, error = chunks.get(timeout=timeout)
+                except queue.Empty:
+                    self._remaining(deadline)
+                    raise TimeoutError(f"{self.__name}: stream stalled for {timeout:.1f}s")
+                if chunk is finished:
+                    if error is not None:
+                        raise error
+                    return
+                yield chunk
+        finally:
+            stop.set()
+
+    async def _achunks(self, afn, deadline: float):
+        iterator = afn().__aiter__()
+        try:
+            while True:
+                timeout = min(self.__attempt_timeout, self._remaining(deadline))
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    self._remaining(deadline)
+                    raise TimeoutError(f"{self.__name}: stream stalled for {timeout:.1f}s")
+                yield chunk
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:
+                    pass
+
+    def _should_retry(self, error: Exception, attempt: int, deadline: float) -> bool:
+        if not self.is_retryable(error):
+            return False
+        self.__breaker.record_failure()
+        if attempt >= self.__max_retries or deadline - time.monotonic() <= 0:
+            return False
+        self.__logger.warning(f"{self.__name}: attempt {attempt + 1} failed, retrying: {error}")
+        return True
+
+    def _backoff(self, attempt: int, deadline: float) -> float:
+        delay = random.uniform(0, min(self.__backoff_max, self.__backoff_base * 2 ** attempt))
+        return max(0.0, min(delay, deadline - time.monotonic()))
+
+
+# ------------------------------------------------------------
+# Class: GovernedChatModel
+# Description:
+#   Chat model wrapper that routes every generate / stream call
+#   of `inner` through a CallGovernor. Behaves like any other
+#   LangChain chat model (invoke, ainvoke, stream, chains), so
+#   callers do not change.
+# ------------------------------------------------------------
+class GovernedChatModel(BaseChatModel):
+    inner: BaseChatModel
+    governor: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return f"governed-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return self.inner._identifying_params
+
+    @staticmethod
+    def _estimate_tokens(messages: list) -> int:
+        # Text parts only (~4 characters per token); media is
+        # billed by the provider but not known up front.
+        chars = 0
+        for message in messages:
+            if isinstance(message.content, str):
+                chars += len(message.content)
+            else:
+                chars += sum(len(p.get("text", "")) for p in message.content if isinstance(p, dict))
+        return chars // 4 + 1
+
+    def _charge_output(self, result: ChatResult):
+        for generation in result.generations:
+            usage = getattr(generation.message, "usage_metadata", None)
+            if usage:
+                self.governor.charge_tokens(usage.get("output_tokens", 0))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        result = self.governor.call(
+            lambda: self.inner._generate(messages, stop=stop, **kwargs),
+            self._estimate_tokens(messages)
+        )
+        self._charge_output(result)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        result = await self.governor.acall(
+            lambda: self.inner._agenerate(messages, stop=stop, **kwargs),
+            self._estimate_tokens(messages)
+        )
+        self._charge_output(result)
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield from self.governor.stream(
+            lambda: self.inner._stream(messages, stop=stop, **kwargs),
+            self._estimate_tokens(messages)
+        )
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async for chunk in self.governor.astream(
+            lambda: self.inner._astream(messages, stop=stop, **kwargs),
+            self._estimate_tokens(messages)
+        ):
+            yield chunk
@@ -0,0 +1,71 @@
+from typing import Optional
+from decouple import config
+from langgraph.constants import TAG_NOSTREAM
+from langchain_core.messages import HumanMessage, AnyMessage, get_buffer_string
+
+
+# ------------------------------------------------------------
+# Class: ChatHistoryService
+# Description:
+#   Keeps the Q&A history inside a token budget:
+#     - The most recent turns (up to HISTORY_RECENT_TOKENS) are
+#       kept verbatim.
+#     - Once the history exceeds HISTORY_TOKEN_BUDGET, older turns
+#       are folded into a rolling summary with one text-only call
+#       and removed from the message list.
+#   Token counts are estimated (~4 characters per token) so no
+#   tokenizer dependency is needed.
+# ------------------------------------------------------------
+class ChatHistoryService:
+    def __init__(self, chat_model_factory):
+        self.__chat_model_factory = chat_model_factory
+        self.__budget = int(config("HISTORY_TOKEN_BUDGET", default=2000))
+        self.__recent = int(config("HISTORY_RECENT_TOKENS", default=1000))
+
+    # ------------------------------------------------------------
+    # Method: estimate_tokens
+    # Description:
+    #   Rough token estimate of a list of messages.
+    # ------------------------------------------------------------
+    @staticmethod
+    def estimate_tokens(messages: list) -> int:
+        return sum(len(str(m.content)) // 4 + 4 for m in messages)
+
+    # ------------------------------------------------------------
+    # Method: compact
+    # Description:
+    #   Returns (summary, kept_messages, removed_messages).
+    #   When the history fits the budget nothing changes;
+    #   otherwise older messages are summarized into `summary`.
+    #   Turns are split on human messages so a question is never
+    #   separated from its answer.
+    # ------------------------------------------------------------
+    def compact(self, messages: list[AnyMessage], summary: Optional[str]):
+        if self.estimate_tokens(messages) <= self.__budget:
+            return summary, messages, []
+
+        split = len(messages)
+        kept_tokens = 0
+        for index in range(len(messages) - 1, -1, -1):
+            kept_tokens += self.estimate_tokens([messages[index]])
+            if kept_tokens > self.__recent:
+                break
+            if isinstance(messages[index], HumanMessage):
+                split = index
+
+        older, recent = messages[:split], messages[split:]
+        if not older:
+            return summary, messages, []
+        return self._summarize(older, summary), recent, older
+
+    def _summarize(self, messages: list, summary: Optional[str]) -> str:
+        previous = f"Current summary:\n{summary}\n\n" if summary else ""
+        prompt = (
+            "Condense the following conversation between a user and an assistant about a "
+            "video into a short summary that keeps facts, names, numbers and open questions. "
+            "Reply with the summary only.\n\n"
+            f"{previous}New messages:\n{get_buffer_string(messages)}"
+        )
+        return self.__chat_model_factory().invoke(
+            [HumanMessage(content=prompt)], config={"tags": [TAG_NOSTREAM]}
+        ).text
@@ -0,0 +1,224 @@
+import os
+import time
+import asyncio
+import sqlite3
+from decouple import config
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from services.registry import RESOURCES
+from logger_app import setup_logger
+
+
+# ------------------------------------------------------------
+# Class: BoundedSqliteSaver
+# Description:
+#   SQLite-backed LangGraph checkpointer with bounded growth:
+#     - Drops bulky channels (e.g. uploaded_file) before saving.
+#     - Keeps at most `max_checkpoints` checkpoints per thread.
+#     - Evicts whole threads idle for longer than `ttl` seconds
+#       and least recently used threads beyond `max_threads`.
+#   Async methods run the sync implementation in a thread so the
+#   saver also works with graph.ainvoke().
+# ------------------------------------------------------------
+class BoundedSqliteSaver(SqliteSaver):
+    def __init__(self, conn: sqlite3.Connection, excluded_channels: set,
+                 max_checkpoints: int, max_threads: int, ttl: int):
+        super().__init__(conn)
+        self.excluded_channels = excluded_channels
+        self.max_checkpoints = max_checkpoints
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self.__logger = setup_logger(__name__)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS thread_access (
+                thread_id TEXT PRIMARY KEY,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_thread_access ON thread_access (last_access);
+            """
+        )
+
+    # ------------------------------------------------------------
+    # Method: put
+    # Description:
+    #   Saves the checkpoint without excluded channels, then
+    #   applies the per-thread and global retention limits.
+    # ------------------------------------------------------------
+    def put(self, config, checkpoint, metadata, new_versions):
+        checkpoint = {
+            **checkpoint,
+            "channel_values": {
+                k: v for k, v in checkpoint["channel_values"].items()
+                if k not in self.excluded_channels
+            },
+        }
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        self._enforce_limits(str(config["configurable"]["thread_id"]))
+        return saved
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        writes = [(c, v) for c, v in writes if c not in self.excluded_channels]
+        if writes:
+            super().put_writes(config, writes, task_id, task_path)
+
+    def get_tuple(self, config):
+        result = super().get_tuple(config)
+        if result is not None:
+            self._touch(str(config["configurable"]["thread_id"]))
+        return result
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_access WHERE thread_id = ?", (str(thread_id),))
+
+    # ------------------------------------------------------------
+    # Method: usage
+    # Description:
+    #   Reports retained threads, checkpoints, writes and the
+    #   on-disk size of the database (including the WAL file).
+    # ------------------------------------------------------------
+    def usage(self) -> dict:
+        with self.cursor(transaction=False) as cur:
+            threads = cur.execute("SELECT COUNT(*) FROM thread_access").fetchone()[0]
+            checkpoints, checkpoint_bytes = cur.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint)), 0) FROM checkpoints"
+            ).fetchone()
+            writes = cur.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+            path = cur.execute("PRAGMA database_list").fetchone()[2]
+        disk = sum(os.path.getsize(p) for p in (path, f"{path}-wal") if path and os.path.exists(p))
+        return {
+            "backend": "sqlite",
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "checkpoint_bytes": checkpoint_bytes,
+            "disk_bytes": disk,
+        }
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def _touch(self, thread_id: str):
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO thread_access (thread_id, last_access) VALUES (?, ?)",
+                (thread_id, time.time())
+            )
+
+    def _enforce_limits(self, thread_id: str):
+        now = time.time()
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO thread_access (thread_id, last_access) VALUES (?, ?)",
+                (thread_id, now)
+            )
+            # Keep only the newest checkpoints of this thread
+            cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id NOT IN ("
+                " SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?"
+                " ORDER BY checkpoint_id DESC LIMIT ?)",
+                (thread_id, thread_id, self.max_checkpoints)
+            )
+            cur.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_id NOT IN ("
+                " SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?)",
+                (thread_id, thread_id)
+            )
+            # Evict idle threads and least recently used ones
+            expired = [r[0] for r in cur.execute(
+                "SELECT thread_id FROM thread_access WHERE last_access < ?"
+                " UNION SELECT thread_id FROM thread_access"
+                " WHERE thread_id NOT IN ("
+                "  SELECT thread_id FROM thread_access ORDER BY last_access DESC LIMIT ?)",
+                (now - self.ttl, self.max_threads)
+            ).fetchall()]
+            for expired_id in expired:
+                cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (expired_id,))
+                cur.execute("DELETE FROM writes WHERE thread_id = ?", (expired_id,))
+                cur.execute("DELETE FROM thread_access WHERE thread_id = ?", (expired_id,))
+        if expired:
+            self.__logger.info(f"Evicted {len(expired)} checkpoint threads")
+
+
+# ------------------------------------------------------------
+# Class: CheckpointerService
+# Description:
+#   Selects the LangGraph checkpointer backend from env:
+#     - CHECKPOINT_BACKEND=sqlite (default): BoundedSqliteSaver
+#       on local disk, shared process-wide.
+#     - CHECKPOINT_BACKEND=memory: in-process MemorySaver, for
+#       development only (unbounded, lost on restart).
+# ------------------------------------------------------------
+class CheckpointerService:
+    def __init__(self):
+        self.__backend = str(config("CHECKPOINT_BACKEND", default="sqlite"))
+        self.__path = str(config("CHECKPOINT_PATH", default="./database/checkpoints/checkpoints.sqlite3"))
+        self.__excluded = {
+            c.strip() for c in
+            str(config("CHECKPOINT_EXCLUDED_CHANNELS", default="uploaded_file,segments")).split(",")
+            if c.strip()
+        }
+        self.__max_checkpoints = int(config("CHECKPOINT_MAX_PER_THREAD", default=5))
+        self.__max_threads = int(config("CHECKPOINT_MAX_THREADS", default=1000))
+        self.__ttl = int(config("CHECKPOINT_TTL", default=7 * 24 * 3600))
+
+    # ------------------------------------------------------------
+    # Method: get_checkpointer
+    # Description:
+    #   Returns the shared checkpointer for the configured backend.
+    # ------------------------------------------------------------
+    def get_checkpointer(self):
+        if self.__backend == "memory":
+            return RESOURCES.get("checkpointer:memory", MemorySaver)
+        return RESOURCES.get(
+            f"checkpointer:sqlite:{self.__path}",
+            self._build_sqlite,
+            health_check=lambda saver: saver.conn.execute("SELECT 1"),
+            close=lambda saver: saver.conn.close()
+        )
+
+    # ------------------------------------------------------------
+    # Method: usage
+    # Description:
+    #   Reports memory/disk usage of the active checkpointer.
+    # ------------------------------------------------------------
+    def usage(self) -> dict:
+        saver = self.get_checkpointer()
+        if isinstance(saver, BoundedSqliteSaver):
+            return saver.usage()
+        return {
+            "backend": "memory",
+            "threads": len(saver.storage),
+            "checkpoints": sum(len(ns) for t in saver.storage.values() for ns in t.values()),
+            "writes": sum(len(w) for w in saver.writes.values()),
+        }
+
+    def _build_sqlite(self):
+        os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.__path, check_same_thread=False)
+        return BoundedSqliteSaver(
+            conn, self.__excluded, self.__max_checkpoints, self.__max_threads, self.__ttl
+        )
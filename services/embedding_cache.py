@@ -0,0 +1,97 @@
+import os
+import sqlite3
+from typing import Iterator, Optional, Sequence
+from decouple import config
+from langchain_core.stores import ByteStore
+from langchain_classic.embeddings import CacheBackedEmbeddings
+from services.llm import LLMService
+from services.registry import RESOURCES
+
+
+# ------------------------------------------------------------
+# Class: SqliteByteStore
+# Description:
+#   Minimal key/value byte store on a local SQLite file, used as
+#   the persistent backend of CacheBackedEmbeddings. Keys are
+#   already namespaced and hashed by the caller.
+# ------------------------------------------------------------
+class SqliteByteStore(ByteStore):
+    def __init__(self, path: str):
+        self.__path = path
+        os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.__path, timeout=30)
+
+    def mget(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        rows = {}
+        with self._connect() as db:
+            for start in range(0, len(keys), 500):
+                batch = list(keys[start:start + 500])
+                rows.update(db.execute(
+                    f"SELECT key, value FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall())
+        return [rows.get(key) for key in keys]
+
+    def mset(self, key_value_pairs: Sequence[tuple[str, bytes]]) -> None:
+        with self._connect() as db:
+            db.executemany("INSERT OR REPLACE INTO embeddings (key, value) VALUES (?, ?)", key_value_pairs)
+
+    def mdelete(self, keys: Sequence[str]) -> None:
+        with self._connect() as db:
+            db.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key in keys])
+
+    def yield_keys(self, *, prefix: Optional[str] = None) -> Iterator[str]:
+        with self._connect() as db:
+            if prefix:
+                rows = db.execute("SELECT key FROM embeddings WHERE key LIKE ?", (prefix + "%",)).fetchall()
+            else:
+                rows = db.execute("SELECT key FROM embeddings").fetchall()
+        for (key,) in rows:
+            yield key
+
+
+# ------------------------------------------------------------
+# Class: EmbeddingCacheService
+# Description:
+#   Wraps the configured embedding model with a persistent
+#   cache keyed by (embedding model, SHA-256 of the text), so
+#   unchanged chunks are never embedded twice. Misses are
+#   embedded in batches of EMBEDDING_BATCH_SIZE texts.
+# ------------------------------------------------------------
+class EmbeddingCacheService:
+    def __init__(self):
+        self.__llm_service = LLMService()
+        self.__path = str(config("EMBEDDING_CACHE_PATH", default="./database/cache/embedding_cache.sqlite3"))
+        self.__batch_size = int(config("EMBEDDING_BATCH_SIZE", default=64))
+
+    # ------------------------------------------------------------
+    # Method: embeddings
+    # Description:
+    #   Returns the process-wide cache-backed embedding model.
+    # ------------------------------------------------------------
+    def embeddings(self) -> CacheBackedEmbeddings:
+        namespace = self.__llm_service.get_embedding_name()
+        return RESOURCES.get(
+            f"cached_embeddings:{namespace}",
+            lambda: CacheBackedEmbeddings.from_bytes_store(
+                self.__llm_service.get_embedding_model(),
+                SqliteByteStore(self.__path),
+                namespace=namespace,
+                batch_size=self.__batch_size,
+                key_encoder="sha256"
+            )
+        )
+
+    # ------------------------------------------------------------
+    # Method: batch_size
+    # Description:
+    #   Number of texts embedded / upserted per call.
+    # ------------------------------------------------------------
+    @property
+    def batch_size(self) -> int:
+        return self.__batch_size
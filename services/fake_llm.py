@@ -0,0 +1,118 @@
+import time
+import json
+import random
+import asyncio
+import threading
+from typing import Any, Optional
+from pydantic import PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from services.video_analysis import ANALYSIS_DELIMITER
+
+
+# ------------------------------------------------------------
+# Class: FakeProviderError
+# Description:
+#   Error raised by FakeChatModel to simulate provider failures
+#   (429 throttling by default, 503 for server errors).
+# ------------------------------------------------------------
+class FakeProviderError(RuntimeError):
+    def __init__(self, message: str, status_code: int = 429):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# ------------------------------------------------------------
+# Class: FakeChatModel
+# Description:
+#   Offline chat model used with PROVIDER=fake for local runs,
+#   benchmarks and resilience testing. Replies are deterministic
+#   (derived from the prompt text) and every call can inject:
+#     - latency: `latency` seconds +/- `jitter`;
+#     - errors: with probability `error_rate`, a FakeProviderError
+#       with `error_status`;
+#     - stalls: with probability `stall_rate`, `stall_seconds`
+#       of extra latency (a hung request).
+#   Streams the reply word by word. Prompts asking for the
+#   video metadata block get a fixed one appended.
+# ------------------------------------------------------------
+class FakeChatModel(BaseChatModel):
+    model: str = "fake-chat"
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 429
+    stall_rate: float = 0.0
+    stall_seconds: float = 30.0
+    seed: Optional[int] = None
+    calls: int = 0
+
+    _random: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context):
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": self.model}
+
+    # ------------------------------------------------------------
+    # Method: reply
+    # Description:
+    #   Deterministic answer built from the text parts of the
+    #   last message (media parts are ignored).
+    # ------------------------------------------------------------
+    def reply(self, messages: list) -> str:
+        content = messages[-1].content if messages else ""
+        if not isinstance(content, str):
+            content = " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+        words = content.split()
+        text = f"Fake response ({len(words)} prompt words): " + " ".join(words[-40:])
+        if ANALYSIS_DELIMITER in content:
+            text = text.replace(ANALYSIS_DELIMITER, "") + f"\n{ANALYSIS_DELIMITER}\n" + json.dumps({
+                "category": "synthetic", "suitability": "all_ages", "language": "en",
+                "topics": ["test pattern", "benchmark"],
+                "timestamps": [{"time": "0:00", "description": "Start of the video"}],
+            })
+        return text
+
+    def _plan(self) -> float:
+        # Draws the delay of one call and raises injected errors
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            if self._random.random() < self.stall_rate:
+                delay += self.stall_seconds
+            failed = self._random.random() < self.error_rate
+        if failed:
+            raise FakeProviderError(f"Injected provider error ({self.error_status})", self.error_status)
+        return delay
+
+    def _result(self, messages: list) -> ChatResult:
+        text = self.reply(messages)
+        usage = {"input_tokens": 0, "output_tokens": len(text) // 4 + 1, "total_tokens": len(text) // 4 + 1}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self._plan())
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._plan())
+        return self._result(messages)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self._plan())
+        for index, word in enumerate(self.reply(messages).split(" ")):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if index == 0 else " " + word))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self._plan())
+        for index, word in enumerate(self.reply(messages).split(" ")):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if index == 0 else " " + word))
@@ -0,0 +1,73 @@
+import json
+import shutil
+import subprocess
+from decouple import config
+
+# ------------------------------------------------------------
+# Class: FFmpegService
+# Description:
+#   Thin wrapper around the ffmpeg / ffprobe command line tools.
+#   - Locates the binaries (env override, PATH, or the binary
+#     bundled with imageio-ffmpeg, which moviepy installs).
+#   - Runs commands and raises RuntimeError on failure.
+# ------------------------------------------------------------
+class FFmpegService:
+    def __init__(self):
+        self.__ffmpeg = str(config("FFMPEG_BINARY", default=""))
+        self.__ffprobe = str(config("FFPROBE_BINARY", default=""))
+
+    # ------------------------------------------------------------
+    # Method: ffmpeg
+    # Description:
+    #   Returns the path to the ffmpeg executable.
+    # ------------------------------------------------------------
+    def ffmpeg(self) -> str:
+        if not self.__ffmpeg:
+            self.__ffmpeg = shutil.which("ffmpeg") or ""
+        if not self.__ffmpeg:
+            import imageio_ffmpeg
+            self.__ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+        return self.__ffmpeg
+
+    # ------------------------------------------------------------
+    # Method: ffprobe
+    # Description:
+    #   Returns the path to the ffprobe executable, or an empty
+    #   string when it is not installed.
+    # ------------------------------------------------------------
+    def ffprobe(self) -> str:
+        if not self.__ffprobe:
+            self.__ffprobe = shutil.which("ffprobe") or ""
+        return self.__ffprobe
+
+    # ------------------------------------------------------------
+    # Method: run
+    # Description:
+    #   Runs an ffmpeg command (binary prepended) and returns its
+    #   stdout bytes. Raises RuntimeError with stderr on failure.
+    # ------------------------------------------------------------
+    def run(self, args: list) -> bytes:
+        return self._run([self.ffmpeg(), "-hide_banner", "-loglevel", "error", *args])
+
+    # ------------------------------------------------------------
+    # Method: probe
+    # Description:
+    #   Runs ffprobe once and returns its JSON format/stream info.
+    #   Raises RuntimeError if ffprobe is unavailable.
+    # ------------------------------------------------------------
+    def probe(self, path: str, *extra_args: str) -> dict:
+        if not self.ffprobe():
+            raise RuntimeError("ffprobe is not available")
+        output = self._run([
+            self.ffprobe(), "-v", "error", "-print_format", "json",
+            *extra_args, path
+        ])
+        return json.loads(output or b"{}")
+
+    def _run(self, command: list) -> bytes:
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"{command[0]} failed: {result.stderr.decode('utf-8', 'replace').strip()}"
+            )
+        return result.stdout
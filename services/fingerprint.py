@@ -0,0 +1,305 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+import numpy as np
+from decouple import config
+from services.ffmpeg import FFmpegService
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Global: _POPCOUNT
+# Description:
+#   Number of set bits of every byte value, used to count the
+#   differing bits of XOR-ed hashes (Hamming distance).
+# ------------------------------------------------------------
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+# ------------------------------------------------------------
+# Global: _INDEX
+# Description:
+#   Process-wide in-memory copy of the fingerprint index. The
+#   frame hashes of every video are concatenated into one array
+#   (with the owning entry of each frame), so a lookup is a few
+#   vectorized XOR / popcount passes instead of a Python loop.
+#   Loaded from SQLite on first use and refreshed whenever the
+#   table changed (other processes register fingerprints too).
+#   `stamp` is the (row count, max rowid, max created_at) seen
+#   at the last refresh.
+# ------------------------------------------------------------
+_INDEX = {"stamp": None, "entries": [], "hashes": None, "owners": None}
+_INDEX_LOCK = threading.Lock()
+# Hash columns compared per vectorized block (bounds memory)
+_BLOCK = 8192
+
+
+# ------------------------------------------------------------
+# Class: FingerprintService
+# Description:
+#   Perceptual video fingerprints for near-duplicate detection
+#   (re-encoded, resized or trimmed copies of the same clip):
+#     - keyframes are sampled every FINGERPRINT_INTERVAL seconds
+#       (at most FINGERPRINT_MAX_FRAMES per video), decoded by
+#       ffmpeg as 9x8 grayscale and reduced to 64-bit difference
+#       hashes (dHash) with NumPy; flat frames (black / fades)
+#       carry no information and are dropped;
+#     - fingerprints (hashes, sample times, duration) are kept
+#       in a local SQLite index keyed by content hash;
+#     - find_near_duplicate compares a fingerprint with every
+#       indexed video of similar duration by Hamming distance and
+#       returns the best match above FINGERPRINT_THRESHOLD, with
+#       the time offset of the copy inside the original.
+# ------------------------------------------------------------
+class FingerprintService:
+    def __init__(self):
+        self.__path = str(config("FINGERPRINT_INDEX_PATH", default="./database/cache/fingerprints.sqlite3"))
+        self.__interval = float(config("FINGERPRINT_INTERVAL", default=2))
+        self.__max_frames = int(config("FINGERPRINT_MAX_FRAMES", default=120))
+        self.__max_distance = int(config("FINGERPRINT_MAX_DISTANCE", default=10))
+        self.__threshold = float(config("FINGERPRINT_THRESHOLD", default=0.85))
+        self.__min_duration_ratio = float(config("FINGERPRINT_MIN_DURATION_RATIO", default=0.8))
+        self.__ffmpeg = FFmpegService()
+        self.__logger = setup_logger(__name__)
+        self._init_db()
+
+    # ------------------------------------------------------------
+    # Method: _connect
+    # Description:
+    #   Opens a short-lived SQLite connection to the index file.
+    # ------------------------------------------------------------
+    def _connect(self):
+        return sqlite3.connect(self.__path, timeout=30)
+
+    # ------------------------------------------------------------
+    # Method: _init_db
+    # Description:
+    #   Creates the index directory and table if missing.
+    # ------------------------------------------------------------
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                " video_hash TEXT PRIMARY KEY,"
+                " video_name TEXT NOT NULL,"
+                " duration REAL NOT NULL,"
+                " hashes BLOB NOT NULL,"
+                " times BLOB NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+
+    # ------------------------------------------------------------
+    # Method: fingerprint
+    # Description:
+    #   Returns the indexed fingerprint of a video, computing and
+    #   registering it first if needed. Returns None when the
+    #   video cannot be decoded or has no informative frame.
+    # ------------------------------------------------------------
+    def fingerprint(self, path: str, video_hash: str, video_name: str,
+                    duration: Optional[float]) -> Optional[dict]:
+        entry = self.get(video_hash)
+        if entry is not None:
+            return entry
+        try:
+            hashes, times = self.compute(path, duration)
+        except Exception as e:
+            self.__logger.error(f"Error fingerprinting {video_name}: {e}")
+            return None
+        if not len(hashes):
+            return None
+        return self.register(video_hash, video_name, float(duration or 0), hashes, times)
+
+    # ------------------------------------------------------------
+    # Method: compute
+    # Description:
+    #   Samples keyframes with one ffmpeg run (only keyframes are
+    #   decoded, so the cost stays low for long videos) and
+    #   returns (uint64 dHashes, sample times in seconds).
+    # ------------------------------------------------------------
+    def compute(self, path: str, duration: Optional[float]):
+        interval = max(self.__interval, float(duration or 0) / self.__max_frames)
+        raw = self.__ffmpeg.run([
+            "-skip_frame", "nokey", "-i", path, "-an", "-sn",
+            "-vf", f"fps=1/{interval:.3f},scale=9:8:flags=area,format=gray",
+            "-frames:v", str(self.__max_frames), "-f", "rawvideo", "-"
+        ])
+        frames = np.frombuffer(raw, dtype=np.uint8)
+        frames = frames[: len(frames) // 72 * 72].reshape(-1, 8, 9).astype(np.int16)
+        times = np.arange(len(frames), dtype=np.float32) * interval
+
+        # With keyframes sparser than the interval the fps filter
+        # repeats the last keyframe; keep the first sample of a run
+        distinct = np.r_[True, np.any(frames[1:] != frames[:-1], axis=(1, 2))]
+        frames, times = frames[distinct], times[distinct]
+        informative = (frames.max(axis=(1, 2)) - frames.min(axis=(1, 2))) > 8
+        frames, times = frames[informative], times[informative]
+        return self.dhash(frames), times
+
+    # ------------------------------------------------------------
+    # Method: dhash
+    # Description:
+    #   Difference hash of (N, 8, 9) grayscale frames: one bit per
+    #   horizontally adjacent pixel pair (left brighter than
+    #   right), packed into N uint64 values.
+    # ------------------------------------------------------------
+    @staticmethod
+    def dhash(frames: np.ndarray) -> np.ndarray:
+        bits = (frames[:, :, :-1] > frames[:, :, 1:]).reshape(len(frames), 64)
+        return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+    # ------------------------------------------------------------
+    # Method: hamming
+    # Description:
+    #   Pairwise Hamming distances between two uint64 hash arrays,
+    #   returned as a (len(a), len(b)) uint8 matrix.
+    # ------------------------------------------------------------
+    @staticmethod
+    def hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        xor = np.bitwise_xor(a[:, None], b[None, :])
+        return _POPCOUNT[xor.view(np.uint8)].reshape(*xor.shape, 8).sum(axis=2, dtype=np.uint8)
+
+    # ------------------------------------------------------------
+    # Method: get
+    # Description:
+    #   Returns the indexed fingerprint of a content hash or None.
+    # ------------------------------------------------------------
+    def get(self, video_hash: str) -> Optional[dict]:
+        self._load()
+        with _INDEX_LOCK:
+            for entry in _INDEX["entries"]:
+                if entry["video_hash"] == video_hash:
+                    return entry
+        return None
+
+    # ------------------------------------------------------------
+    # Method: register
+    # Description:
+    #   Stores a fingerprint in SQLite (replacing an older
+    #   fingerprint of the same content) and refreshes the
+    #   in-memory index.
+    # ------------------------------------------------------------
+    def register(self, video_hash: str, video_name: str, duration: float,
+                 hashes: np.ndarray, times: np.ndarray) -> dict:
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        times = np.asarray(times, dtype=np.float32)
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO fingerprints"
+                " (video_hash, video_name, duration, hashes, times, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (video_hash, video_name, duration, hashes.tobytes(), times.tobytes(), time.time())
+            )
+        self._load()
+        return {"video_hash": video_hash, "video_name": video_name, "duration": duration,
+                "hashes": hashes, "times": times}
+
+    # ------------------------------------------------------------
+    # Method: find_near_duplicate
+    # Description:
+    #   Returns the indexed video most similar to `entry`, or
+    #   None below FINGERPRINT_THRESHOLD. Similarity is the share
+    #   of the query frames that have a frame within
+    #   FINGERPRINT_MAX_DISTANCE bits in the candidate; only
+    #   candidates whose duration is within
+    #   FINGERPRINT_MIN_DURATION_RATIO are compared. The result
+    #   is {"video_hash", "video_name", "duration", "similarity",
+    #   "offset"}, where `offset` is the median time shift of the
+    #   query inside the candidate (0 for a re-encode, the cut
+    #   start for a trimmed copy).
+    # ------------------------------------------------------------
+    def find_near_duplicate(self, entry: dict) -> Optional[dict]:
+        query, query_times = entry["hashes"], entry["times"]
+        if not len(query):
+            return None
+        self._load()
+        with _INDEX_LOCK:
+            entries, hashes, owners = _INDEX["entries"], _INDEX["hashes"], _INDEX["owners"]
+        if not entries:
+            return None
+
+        candidates = np.array([
+            e["video_hash"] != entry["video_hash"] and self._similar_duration(e["duration"], entry["duration"])
+            for e in entries
+        ])
+        columns = np.flatnonzero(candidates[owners])
+        if not len(columns):
+            return None
+
+        # Best distance of every query frame per candidate. Frames of
+        # one video are contiguous, so each block reduces per owner
+        best = np.full((len(query), len(entries)), 64, dtype=np.uint8)
+        for start in range(0, len(columns), _BLOCK):
+            block = columns[start:start + _BLOCK]
+            block_owners = owners[block]
+            groups = np.flatnonzero(np.r_[True, block_owners[1:] != block_owners[:-1]])
+            minimum = np.minimum.reduceat(self.hamming(query, hashes[block]), groups, axis=1)
+            group_owners = block_owners[groups]
+            best[:, group_owners] = np.minimum(best[:, group_owners], minimum)
+
+        matched = best <= self.__max_distance
+        similarity = matched.mean(axis=0)
+        owner = int(similarity.argmax())
+        if similarity[owner] < self.__threshold:
+            return None
+
+        match = entries[owner]
+        rows = matched[:, owner]
+        nearest = self.hamming(query[rows], match["hashes"]).argmin(axis=1)
+        offset = float(np.median(match["times"][nearest] - query_times[rows]))
+        return {
+            "video_hash": match["video_hash"],
+            "video_name": match["video_name"],
+            "duration": match["duration"],
+            "similarity": round(float(similarity[owner]), 3),
+            "offset": round(max(offset, 0.0), 3),
+        }
+
+    def _similar_duration(self, a: float, b: float) -> bool:
+        if not a or not b:
+            return True
+        return min(a, b) / max(a, b) >= self.__min_duration_ratio
+
+    # ------------------------------------------------------------
+    # Method: _load
+    # Description:
+    #   Brings the in-memory index up to date with SQLite. One
+    #   cheap aggregate query per call; when the table changed,
+    #   only rows added or replaced since the last refresh are
+    #   read (a full reload when rows were removed).
+    # ------------------------------------------------------------
+    def _load(self):
+        with _INDEX_LOCK:
+            with self._connect() as db:
+                stamp = db.execute(
+                    "SELECT count(*), coalesce(max(rowid), 0), coalesce(max(created_at), 0) FROM fingerprints"
+                ).fetchone()
+                known = _INDEX["stamp"]
+                if stamp == known:
+                    return
+                query = "SELECT video_hash, video_name, duration, hashes, times FROM fingerprints"
+                full = known is None or stamp[0] < known[0]
+                rows = db.execute(query).fetchall() if full else db.execute(
+                    f"{query} WHERE rowid > ? OR created_at > ?", (known[1], known[2])
+                ).fetchall()
+            fresh = [
+                {"video_hash": r[0], "video_name": r[1], "duration": r[2],
+                 "hashes": np.frombuffer(r[3], dtype=np.uint64),
+                 "times": np.frombuffer(r[4], dtype=np.float32)}
+                for r in rows
+            ]
+            if not full:
+                replaced = {e["video_hash"] for e in fresh}
+                fresh = [e for e in _INDEX["entries"] if e["video_hash"] not in replaced] + fresh
+            self._rebuild(fresh)
+            _INDEX["stamp"] = tuple(stamp)
+
+    # Caller holds _INDEX_LOCK
+    @staticmethod
+    def _rebuild(entries: list):
+        _INDEX["entries"] = entries
+        _INDEX["hashes"] = np.concatenate([e["hashes"] for e in entries]) if entries \
+            else np.zeros(0, dtype=np.uint64)
+        _INDEX["owners"] = np.repeat(np.arange(len(entries)), [len(e["hashes"]) for e in entries]) \
+            if entries else np.zeros(0, dtype=np.int64)
@@ -0,0 +1,50 @@
+import os
+import hashlib
+import threading
+from services.media_upload import read_chunks
+
+# ------------------------------------------------------------
+# Global: _HASH_CACHE
+# Description:
+#   In-process memo of file hashes keyed by (path, size, mtime)
+#   so repeated requests for the same unchanged file do not
+#   re-read it from disk.
+# ------------------------------------------------------------
+_HASH_CACHE: dict = {}
+_HASH_LOCK = threading.Lock()
+
+
+# ------------------------------------------------------------
+# Method: file_sha256
+# Description:
+#   Returns the hex SHA-256 digest of a file, reading it in
+#   chunks. Results are memoized while the file is unchanged.
+# ------------------------------------------------------------
+def file_sha256(path: str) -> str:
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _HASH_LOCK:
+        if key in _HASH_CACHE:
+            return _HASH_CACHE[key]
+
+    digest = hashlib.sha256()
+    for chunk in read_chunks(path):
+        digest.update(chunk)
+    value = digest.hexdigest()
+
+    with _HASH_LOCK:
+        _HASH_CACHE[key] = value
+    return value
+
+
+# ------------------------------------------------------------
+# Method: remember_sha256
+# Description:
+#   Records a digest computed elsewhere (e.g. while the upload
+#   was being written) so file_sha256 does not read the file
+#   again.
+# ------------------------------------------------------------
+def remember_sha256(path: str, value: str):
+    stat = os.stat(path)
+    with _HASH_LOCK:
+        _HASH_CACHE[(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)] = value
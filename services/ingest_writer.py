@@ -0,0 +1,122 @@
+import os
+import hashlib
+from uuid import uuid4
+from decouple import config
+from database.video_table import VideoTableService
+from services.media_upload import CHUNK_SIZE
+from services.hashing import file_sha256, remember_sha256
+from logger_app import setup_logger
+
+
+# ------------------------------------------------------------
+# Class: IngestWriterService
+# Description:
+#   Writes uploaded videos into ORG_DIR without holding them in
+#   memory and deduplicates them by content:
+#     - the upload stream is copied in CHUNK_SIZE pieces to a
+#       temp file inside ORG_DIR while its SHA-256 is computed;
+#     - if a registered video already has that hash, the temp
+#       file is dropped and the existing video is returned, so
+#       its summary and vectors are reused;
+#     - otherwise the file is hard-linked into place, which
+#       claims the name atomically: a name already used by
+#       different content (registered, on disk, or written by a
+#       concurrent upload) gets a hash suffix instead of
+#       overwriting the other video.
+# ------------------------------------------------------------
+class IngestWriterService:
+    def __init__(self, video_table=None):
+        self.__org_dir = str(config("ORG_DIR"))
+        self.__video_table = video_table or VideoTableService()
+        self.__logger = setup_logger(__name__)
+
+    # ------------------------------------------------------------
+    # Method: save
+    # Description:
+    #   Streams `source` (a binary file-like object) to disk and
+    #   returns {"path", "video_name", "content_hash", "size",
+    #   "existing"}; `existing` is the already registered video
+    #   row for byte-identical content, else None.
+    # ------------------------------------------------------------
+    def save(self, source, file_name: str) -> dict:
+        os.makedirs(self.__org_dir, exist_ok=True)
+        partial = os.path.join(self.__org_dir, f".{uuid4().hex}.part")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            if hasattr(source, "seek"):
+                source.seek(0)
+            with open(partial, "wb") as f:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            content_hash = digest.hexdigest()
+
+            existing = self.__video_table.get_video_by_hash(content_hash)
+            existing_path = existing and os.path.join(self.__org_dir, existing["video_name"])
+            if existing and os.path.exists(existing_path):
+                self.__logger.info(f"{file_name} is identical to {existing['video_name']}, reusing it")
+                return {"path": existing_path, "video_name": existing["video_name"],
+                        "content_hash": content_hash, "size": size, "existing": existing}
+
+            video_name = self._claim(partial, os.path.basename(file_name), content_hash)
+            target = os.path.join(self.__org_dir, video_name)
+            remember_sha256(target, content_hash)
+            return {"path": target, "video_name": video_name,
+                    "content_hash": content_hash, "size": size, "existing": None}
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    # ------------------------------------------------------------
+    # Method: _claim
+    # Description:
+    #   Moves `partial` to a free name in ORG_DIR and returns the
+    #   name. The uploaded name is kept unless a different video
+    #   (other content) is registered under it or already owns
+    #   the file; then the first, and as a last resort all, hash
+    #   characters are appended: "clip.mp4" -> "clip_1a2b3c4d.mp4".
+    #   Names are claimed with os.link, which fails instead of
+    #   overwriting when another upload took the name first; a
+    #   name taken by identical content is reused.
+    # ------------------------------------------------------------
+    def _claim(self, partial: str, file_name: str, content_hash: str) -> str:
+        stem, ext = os.path.splitext(file_name)
+        candidates = [f"{stem}_{content_hash[:8]}{ext}", f"{stem}_{content_hash}{ext}"]
+        registered = self.__video_table.get_video_by_name(file_name)
+        if registered is None or registered.get("content_hash") in (None, content_hash):
+            candidates.insert(0, file_name)
+
+        for video_name in candidates:
+            target = os.path.join(self.__org_dir, video_name)
+            try:
+                self._link(partial, target)
+                return video_name
+            except FileExistsError:
+                if file_sha256(target) == content_hash:
+                    return video_name
+        raise FileExistsError(f"No free name for {file_name} in {self.__org_dir}")
+
+    # ------------------------------------------------------------
+    # Method: _link
+    # Description:
+    #   Atomically creates `target` with the content of `partial`,
+    #   raising FileExistsError if it exists. Filesystems without
+    #   hard links claim the name with an exclusive create first.
+    # ------------------------------------------------------------
+    @staticmethod
+    def _link(partial: str, target: str):
+        try:
+            os.link(partial, target)
+        except FileExistsError:
+            raise
+        except OSError:
+            with open(target, "xb"):
+                pass
+            os.replace(partial, target)
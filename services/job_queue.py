@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import sqlite3
+from typing import Optional
+from decouple import config
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Global: JOB_STATUSES
+# Description:
+#   Lifecycle of a job: queued -> running -> succeeded | failed.
+#   Failed attempts below max_attempts go back to queued.
+# ------------------------------------------------------------
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+# ------------------------------------------------------------
+# Class: LeaseLostError
+# Description:
+#   Raised when a worker no longer owns the job it is running
+#   (its lease expired and another worker claimed the job).
+# ------------------------------------------------------------
+class LeaseLostError(RuntimeError):
+    pass
+
+
+# ------------------------------------------------------------
+# Class: JobQueueService
+# Description:
+#   Persistent job queue backed by a local SQLite file, shared by
+#   the Streamlit app (producer) and worker processes (consumers).
+#   Features include:
+#     - Idempotency keys: enqueueing the same work twice returns
+#       the existing job instead of running it again
+#     - Atomic claiming with a lease, so jobs of a crashed worker
+#       are picked up again; every write of a running job is
+#       guarded by the owning worker id, so a worker that lost its
+#       lease cannot overwrite the new owner's state
+#     - Status, progress, retries with backoff and results
+# ------------------------------------------------------------
+class JobQueueService:
+    def __init__(self):
+        self.__path = str(config("JOB_QUEUE_PATH", default="./database/jobs/jobs.sqlite3"))
+        self.__lease = int(config("JOB_LEASE_SECONDS", default=600))
+        self.__max_attempts = int(config("JOB_MAX_ATTEMPTS", default=3))
+        self.__logger = setup_logger(__name__)
+        self._init_db()
+
+    @property
+    def lease_seconds(self) -> int:
+        return self.__lease
+
+    def _connect(self):
+        db = sqlite3.connect(self.__path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    # ------------------------------------------------------------
+    # Method: _init_db
+    # Description:
+    #   Creates the jobs table and indexes if missing.
+    # ------------------------------------------------------------
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+        db = self._connect()
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " idempotency_key TEXT UNIQUE,"
+                " status TEXT NOT NULL DEFAULT 'queued',"
+                " progress REAL NOT NULL DEFAULT 0,"
+                " message TEXT,"
+                " result TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " max_attempts INTEGER NOT NULL,"
+                " run_after REAL NOT NULL,"
+                " locked_by TEXT,"
+                " locked_at REAL,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, run_after)")
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------
+    # Method: enqueue
+    # Description:
+    #   Adds a job and returns its id. If a job with the same
+    #   idempotency key exists it is returned as-is, unless it
+    #   failed permanently, in which case it is queued again.
+    # ------------------------------------------------------------
+    def enqueue(self, kind: str, payload: dict, idempotency_key: Optional[str] = None) -> int:
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            if idempotency_key:
+                row = db.execute(
+                    "SELECT id, status FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                if row:
+                    if row["status"] == "failed":
+                        db.execute(
+                            "UPDATE jobs SET status = 'queued', attempts = 0, error = NULL,"
+                            " progress = 0, payload = ?, run_after = ?, updated_at = ? WHERE id = ?",
+                            (json.dumps(payload), now, now, row["id"])
+                        )
+                    db.execute("COMMIT")
+                    return row["id"]
+
+            cursor = db.execute(
+                "INSERT INTO jobs (kind, payload, idempotency_key, max_attempts,"
+                " run_after, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload), idempotency_key, self.__max_attempts, now, now, now)
+            )
+            db.execute("COMMIT")
+            return cursor.lastrowid
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------
+    # Method: claim
+    # Description:
+    #   Atomically takes the oldest runnable job for a worker.
+    #   Running jobs whose lease expired are also eligible, unless
+    #   they used up max_attempts: those are marked failed.
+    #   Returns the job dictionary or None.
+    # ------------------------------------------------------------
+    def claim(self, worker_id: str) -> Optional[dict]:
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            # Expired leases of jobs out of attempts (the worker
+            # crashed every time) fail instead of running again
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, locked_by = NULL, updated_at = ?"
+                " WHERE status = 'running' AND locked_at < ? AND attempts >= max_attempts",
+                ("Lease expired: the worker stopped without finishing the job", now, now - self.__lease)
+            )
+            row = db.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND run_after <= ?)"
+                " OR (status = 'running' AND locked_at < ?) ORDER BY id LIMIT 1",
+                (now, now - self.__lease)
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1,"
+                " locked_by = ?, locked_at = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now, now, row["id"])
+            )
+            db.execute("COMMIT")
+            job = self._to_dict(row)
+            job["status"] = "running"
+            job["attempts"] += 1
+            job["locked_by"] = worker_id
+            return job
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------
+    # Method: heartbeat
+    # Description:
+    #   Renews the worker's lease of a running job. Returns False
+    #   when the worker no longer owns the job.
+    # ------------------------------------------------------------
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        now = time.time()
+        return self._execute(
+            "UPDATE jobs SET locked_at = ?, updated_at = ?"
+            " WHERE id = ? AND status = 'running' AND locked_by = ?",
+            (now, now, job_id, worker_id)
+        ) > 0
+
+    # ------------------------------------------------------------
+    # Method: update_progress
+    # Description:
+    #   Records progress (0..1) and renews the worker's lease.
+    #   Returns False when the worker no longer owns the job.
+    # ------------------------------------------------------------
+    def update_progress(self, job_id: int, worker_id: str, progress: float, message: str = "") -> bool:
+        now = time.time()
+        return self._execute(
+            "UPDATE jobs SET progress = ?, message = ?, locked_at = ?, updated_at = ?"
+            " WHERE id = ? AND status = 'running' AND locked_by = ?",
+            (progress, message, now, now, job_id, worker_id)
+        ) > 0
+
+    # ------------------------------------------------------------
+    # Method: complete
+    # Description:
+    #   Marks a job as succeeded and stores its JSON result.
+    #   Returns False (and changes nothing) when the worker no
+    #   longer owns the job.
+    # ------------------------------------------------------------
+    def complete(self, job_id: int, worker_id: str, result: dict) -> bool:
+        return self._execute(
+            "UPDATE jobs SET status = 'succeeded', progress = 1, result = ?, error = NULL,"
+            " locked_by = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND locked_by = ?",
+            (json.dumps(result), time.time(), job_id, worker_id)
+        ) > 0
+
+    # ------------------------------------------------------------
+    # Method: fail
+    # Description:
+    #   Records an error. The job is retried with exponential
+    #   backoff until max_attempts, then marked as failed.
+    #   Returns False (and changes nothing) when the worker no
+    #   longer owns the job.
+    # ------------------------------------------------------------
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        job = self.get(job_id)
+        if job is None:
+            return False
+        now = time.time()
+        if job["attempts"] < job["max_attempts"]:
+            updated = self._execute(
+                "UPDATE jobs SET status = 'queued', error = ?, locked_by = NULL,"
+                " run_after = ?, updated_at = ? WHERE id = ? AND status = 'running' AND locked_by = ?",
+                (error, now + 2 ** job["attempts"] * 5, now, job_id, worker_id)
+            )
+        else:
+            updated = self._execute(
+                "UPDATE jobs SET status = 'failed', error = ?, locked_by = NULL,"
+                " updated_at = ? WHERE id = ? AND status = 'running' AND locked_by = ?",
+                (error, now, job_id, worker_id)
+            )
+        if not updated:
+            return False
+        self.__logger.warning(f"Job {job_id} attempt {job['attempts']} failed: {error}")
+        return True
+
+    # ------------------------------------------------------------
+    # Method: get
+    # Description:
+    #   Returns the current state of a job, or None.
+    # ------------------------------------------------------------
+    def get(self, job_id: int) -> Optional[dict]:
+        db = self._connect()
+        try:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._to_dict(row) if row else None
+        finally:
+            db.close()
+
+    def _execute(self, query: str, values: tuple) -> int:
+        db = self._connect()
+        try:
+            return db.execute(query, values).rowcount
+        finally:
+            db.close()
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
@@ -1,44 +1,55 @@
-from langgraph.checkpoint.memory import MemorySaver
 from typing import TypedDict, Optional, Annotated
 from langgraph.graph import StateGraph, START, END
+from langgraph.constants import TAG_NOSTREAM
 import os
-import mimetypes
-import base64
+import time
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from decouple import config
 from langgraph.graph.message import add_messages
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
-from langchain_core.messages import HumanMessage, AIMessage, AnyMessage
-from langchain_classic.chains.combine_documents import create_stuff_documents_chain
-from langchain_classic.chains.retrieval import create_retrieval_chain
+from langchain_core.runnables import RunnableLambda
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, AnyMessage, RemoveMessage
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from services.vector_store import VectorStoreService
 from services.llm import LLMService
-from uuid import uuid4
-import mimetypes
-import base64
+from services.media_upload import UploadedFile, guess_mime_type
+from services.summary_cache import SummaryCacheService
+from services.hashing import file_sha256
+from services.range_extractor import RangeExtractorService
+from services.video_metadata import VideoMetadataService
+from database.segment_table import SegmentTableService
+from database.video_table import VideoTableService
+from services.checkpointer import CheckpointerService
+from services.chat_history import ChatHistoryService
+from services.answer_cache import AnswerCacheService
+from services.qa_chain import QAChainService
+from services.fingerprint import FingerprintService
+from services.media_proxy import MediaProxyService
+from services.scene_detector import SceneDetectorService
+from services.video_analysis import ANALYSIS_INSTRUCTIONS, split_analysis
 from logger_app import setup_logger
 
 # ------------------------------------------------------------
-# Global: MEMORY_SAVER
+# Global: _WHOLE_VIDEO
 # Description:
-#   Creates a single persistent in-memory checkpoint to store
-#   all conversation threads. Prevents resetting memory between
-#   multiple .invoke() calls during a Streamlit session.
+#   End time (seconds) past any video, used to query the whole
+#   timeline of a video.
 # ------------------------------------------------------------
-MEMORY_SAVER = MemorySaver()
+_WHOLE_VIDEO = 10 ** 9
 
 
 # ------------------------------------------------------------
-# TypedDict: UploadedFile
+# TypedDict: SegmentSummary
 # Description:
-#   Represents an uploaded video file, including its MIME type
-#   and raw binary data for model input.
+#   Summary of one time window of a video, produced by the map
+#   step of segmented summarization.
 # ------------------------------------------------------------
-
-
-class UploadedFile(TypedDict):
-    mime_type: str
-    data: bytes
+class SegmentSummary(TypedDict):
+    start: float
+    end: float
+    summary: Optional[str]
 
 
 # ------------------------------------------------------------
@@ -51,12 +62,23 @@ class UploadedFile(TypedDict):
 class MainState(TypedDict):
     video_path: Optional[str]
     video_name: str
+    video_hash: Optional[str]
+    cache_hit: bool
+    duplicate_of: Optional[dict]
+    media_path: Optional[str]
     uploaded_file: Optional[UploadedFile]
     summary: Optional[str]
+    analysis: Optional[dict]
+    segmented: bool
+    segments: Optional[list[SegmentSummary]]
+    start_time: Optional[float]
+    end_time: Optional[float]
+    exact_cut: bool
     is_new_video: bool
     prompt: Optional[str]
     question: Optional[str]
     answer: Optional[str]
+    history_summary: Optional[str]
     messages: Annotated[list[AnyMessage], add_messages]
 
 
@@ -79,29 +101,152 @@ class LanggraphService:
         # ------------------------------------------------------------
         self.__vector_service = VectorStoreService()
         self.__llm_service = LLMService()
+        self.__media_uploader = self.__llm_service.get_media_uploader()
+        self.__summary_cache = SummaryCacheService()
+        self.__range_extractor = RangeExtractorService()
+        self.__metadata_service = VideoMetadataService()
+        self.__segment_table = SegmentTableService()
+        self.__video_table = VideoTableService()
+        self.__history = ChatHistoryService(self.__llm_service.get_chat_model)
+        self.__answer_cache = AnswerCacheService()
+        self.__qa_chain = QAChainService()
+        self.__fingerprints = FingerprintService()
+        self.__media_proxy = MediaProxyService()
+        self.__scene_detector = SceneDetectorService()
         self.__logger = setup_logger(__name__)
         self.__graph = None
 
+        # Segmented (map-reduce) summarization settings
+        self.__segment_window = float(config("SEGMENT_WINDOW", default=300))
+        self.__segment_threshold = float(config("SEGMENT_THRESHOLD", default=900))
+        self.__segment_workers = int(config("SEGMENT_WORKERS", default=4))
+        self.__segment_retries = int(config("SEGMENT_RETRIES", default=2))
+        self.__timeline_window = float(config("TIMELINE_WINDOW", default=30))
+        self.__timeline_mode = str(config("TIMELINE_MODE", default="lazy")).lower()
+
 
     # ------------------------------------------------------------
-    # Node: upload_video
+    # Node: check_summary_cache
     # Description:
-    #   Loads and processes the uploaded video file into memory
-    #   for downstream nodes.
+    #   Hashes the video and looks up a previously generated
+    #   summary for the same (content, prompt, model). A hit
+    #   skips the upload and model call entirely.
+    #   New videos are also fingerprinted; a near-duplicate of an
+    #   indexed video (re-encoded, resized or trimmed copy) reuses
+    #   its summary, or for a trimmed copy a summary composed from
+    #   the original's timeline, instead of analysing the video.
     # ------------------------------------------------------------
-
-    def upload_video(self, state: MainState):
+    def check_summary_cache(self, state: MainState):
         path = state.get("video_path")
         if not path or not os.path.exists(path):
             raise FileNotFoundError("Video path not provided or invalid")
 
-        mime_type, _ = mimetypes.guess_type(path)
-        mime_type = mime_type or "video/mp4"
+        video_hash = file_sha256(path)
+        prompt, model = state.get("prompt"), self.__llm_service.get_model_name()
+        fingerprint = None
+        if state.get("is_new_video"):
+            duration = self.__metadata_service.probe(path)["duration"]
+            fingerprint = self.__fingerprints.fingerprint(path, video_hash, state["video_name"], duration)
+
+        summary = self.__summary_cache.get(video_hash, prompt, model)
+        if summary is not None:
+            self.__logger.info(f"Summary cache hit for {state.get('video_name')}")
+            summary, analysis = split_analysis(summary)
+            return {"video_hash": video_hash, "summary": summary, "analysis": analysis,
+                    "cache_hit": True, "duplicate_of": None}
+
+        duplicate = fingerprint and self.__fingerprints.find_near_duplicate(fingerprint)
+        if duplicate:
+            summary = self._duplicate_summary(duplicate, fingerprint["duration"], prompt, model)
+            if summary is not None:
+                self.__logger.info(
+                    f"{state.get('video_name')} is a near-duplicate of {duplicate['video_name']}"
+                    f" (similarity {duplicate['similarity']}, offset {duplicate['offset']}s), reusing its analysis"
+                )
+                self.__summary_cache.put(video_hash, prompt, model, summary)
+                summary, analysis = split_analysis(summary)
+                return {"video_hash": video_hash, "summary": summary, "analysis": analysis,
+                        "cache_hit": True, "duplicate_of": duplicate}
+        return {"video_hash": video_hash, "analysis": None, "cache_hit": False, "duplicate_of": None}
+
+    # ------------------------------------------------------------
+    # Method: _duplicate_summary
+    # Description:
+    #   Summary of a near-duplicate derived from the original:
+    #   the cached summary as-is when the copy spans the whole
+    #   original, otherwise the original's timeline segments of
+    #   the covered range composed with one text-only call (the
+    #   cached summary is the fallback). None if nothing is cached.
+    # ------------------------------------------------------------
+    def _duplicate_summary(self, duplicate: dict, duration: float, prompt, model: str) -> Optional[str]:
+        original = self.__summary_cache.get(duplicate["video_hash"], prompt, model)
+        if self._same_extent(duplicate, duration):
+            return original
+
+        segments = self._duplicate_segments(duplicate, duration)
+        if segments and self._covers(segments, 0, duration):
+            try:
+                return self._compose_range(segments, 0, duration, prompt)
+            except Exception as e:
+                self.__logger.warning(f"Composing near-duplicate summary failed: {e}")
+        return original
+
+    # ------------------------------------------------------------
+    # Method: _duplicate_segments
+    # Description:
+    #   Timeline segments of the original that fall inside the
+    #   copy, shifted by the detected offset and clipped to the
+    #   copy's duration.
+    # ------------------------------------------------------------
+    def _duplicate_segments(self, duplicate: dict, duration: float) -> list:
+        offset = duplicate["offset"]
+        try:
+            segments = self.__segment_table.segments_in_range(
+                duplicate["video_name"], offset, offset + duration
+            )
+        except (LookupError, ConnectionError) as e:
+            self.__logger.warning(f"Timeline lookup failed: {e}")
+            return []
+        shifted = [
+            {"start": round(max(s["start"] - offset, 0.0), 3),
+             "end": round(min(s["end"] - offset, duration), 3),
+             "summary": s["summary"]}
+            for s in segments
+        ]
+        return [s for s in shifted if s["end"] - s["start"] >= 1.0]
+
+    @staticmethod
+    def _same_extent(duplicate: dict, duration: float, tolerance: float = 2.0) -> bool:
+        return duplicate["offset"] <= tolerance and abs(duplicate["duration"] - duration) <= tolerance
+
+    # ------------------------------------------------------------
+    # Node: reduce_media
+    # Description:
+    #   Replaces the original with its reduced proxy (downscaled,
+    #   low frame rate, mono audio) for the upload, transcoding it
+    #   once per content hash.
+    # ------------------------------------------------------------
+    def reduce_media(self, state: MainState):
+        path = state["video_path"]
+        video_hash = state.get("video_hash") or file_sha256(path)
+        return {"media_path": self.__media_proxy.proxy(path, video_hash)}
 
-        with open(path, "rb") as f:
-            video_bytes = f.read()
+    # ------------------------------------------------------------
+    # Node: upload_video
+    # Description:
+    #   Streams the video file (its proxy when one was built) to
+    #   the provider upload step and keeps only a file reference
+    #   in the state for downstream nodes. Raw bytes never enter
+    #   the checkpointed state.
+    # ------------------------------------------------------------
+
+    def upload_video(self, state: MainState):
+        path = state.get("media_path") or state.get("video_path")
+        if not path or not os.path.exists(path):
+            raise FileNotFoundError("Video path not provided or invalid")
 
-        return {"uploaded_file": {"mime_type": mime_type, "data": video_bytes}}
+        uploaded_file = self.__media_uploader.upload(path, guess_mime_type(path))
+        return {"uploaded_file": uploaded_file}
 
     # ------------------------------------------------------------
     # Node: summarize_video
@@ -109,48 +254,421 @@ class LanggraphService:
     #   Sends the uploaded video to the Gemini model for analysis
     #   and generates a natural, human-readable summary describing
     #   scenes, actions, and emotions without introductory phrases.
+    #   For a whole video the same call also returns the metadata
+    #   block (category, suitability, language, topics, key
+    #   moments); the cache keeps the raw response and the state
+    #   gets the summary and the parsed analysis separately.
+    #   asummarize_video is the native async variant used when the
+    #   graph runs with ainvoke().
     # ------------------------------------------------------------
 
     def summarize_video(self, state: MainState):
-        uploaded_file = state["uploaded_file"]
-        prompt = """
-            You are a video analysis expert.
-            Provide a detailed and comprehensive description of this video. 
-            Your response must be in a natural human-readable format describing 
-            what happens in the video, including scenes, actions, objects, and emotions. 
-            Do not include any meta phrases like 'Here is the summary' — start directly.
-        """
+        response = self._invoke_with_media(
+            state["uploaded_file"], self._summary_prompt(state.get("prompt"), self._whole_video(state))
+        )
+
+        if state.get("video_hash"):
+            self.__summary_cache.put(
+                state["video_hash"], state.get("prompt"),
+                self.__llm_service.get_model_name(), response.text
+            )
+        summary, analysis = split_analysis(response.text)
+        return {"summary": summary, "analysis": analysis}
+
+    async def asummarize_video(self, state: MainState):
+        response = await self._ainvoke_with_media(
+            state["uploaded_file"], self._summary_prompt(state.get("prompt"), self._whole_video(state))
+        )
+
+        if state.get("video_hash"):
+            await asyncio.to_thread(
+                self.__summary_cache.put,
+                state["video_hash"], state.get("prompt"),
+                self.__llm_service.get_model_name(), response.text
+            )
+        summary, analysis = split_analysis(response.text)
+        return {"summary": summary, "analysis": analysis}
+
+    # ------------------------------------------------------------
+    # Node: summarize_segments
+    # Description:
+    #   Map-reduce summarization for long videos:
+    #     - Splits the video into SEGMENT_WINDOW second windows.
+    #     - Summarizes windows concurrently (SEGMENT_WORKERS),
+    #       each retried independently and cached on success.
+    #     - Reduces the partial summaries with one text-only call.
+    # ------------------------------------------------------------
+    def summarize_segments(self, state: MainState):
+        path = state["video_path"]
+        video_hash = state.get("video_hash") or file_sha256(path)
+        prompt = state.get("prompt")
+        segments = self._map_windows(path, video_hash, prompt, self.__segment_window)
+
+        completed = [s for s in segments if s["summary"]]
+        if not completed:
+            raise RuntimeError(f"All {len(segments)} segments failed to summarize")
+
+        summary = self._reduce_summaries(completed, prompt, self._whole_video(state))
+        if len(completed) == len(segments):
+            self.__summary_cache.put(
+                video_hash, prompt, self.__llm_service.get_model_name(), summary
+            )
+        summary, analysis = split_analysis(summary)
+        return {"summary": summary, "analysis": analysis, "segments": segments}
+
+    # ------------------------------------------------------------
+    # Node: summarize_range
+    # Description:
+    #   Answers a (start_time, end_time) summary from the stored
+    #   timeline index: the overlapping segments are returned as-is
+    #   (single segment, no custom prompt) or composed with one
+    #   text-only call. With TIMELINE_MODE=lazy, the first range
+    #   request of a video builds its timeline. If the range is
+    #   still not fully indexed, a clip
+    #   is cut (from the proxy when one exists; fast cuts snap to
+    #   scene cuts) and the regular summarization path is used.
+    # ------------------------------------------------------------
+    def summarize_range(self, state: MainState):
+        start, end = state["start_time"], state["end_time"]
+        prompt = state.get("prompt")
+        try:
+            segments = self.__segment_table.segments_in_range(state["video_name"], start, end)
+            indexed = bool(segments) or bool(
+                self.__segment_table.segments_in_range(state["video_name"], 0, _WHOLE_VIDEO)
+            )
+        except (LookupError, ConnectionError) as e:
+            self.__logger.warning(f"Timeline lookup failed: {e}")
+            segments, indexed = [], True
+
+        if not indexed and self.__timeline_mode == "lazy":
+            # First range request of a video without a timeline
+            timeline = self._build_timeline(state["video_path"], state["video_name"], map_windows=True)
+            segments = [s for s in timeline if s["start"] < end and s["end"] > start]
+
+        if self._covers(segments, start, end):
+            if len(segments) == 1 and not prompt:
+                return {"summary": segments[0]["summary"], "cache_hit": True}
+            return {"summary": self._compose_range(segments, start, end, prompt), "cache_hit": True}
+
+        # Cut from the proxy when the video already has one; fast
+        # cuts snap their edges to nearby scene cuts
+        video_hash = file_sha256(state["video_path"])
+        proxy = self.__media_proxy.existing(video_hash)
+        if not state.get("exact_cut"):
+            start, end = self.__scene_detector.snap(video_hash, start, end)
+        clip = self.__range_extractor.extract(
+            proxy or state["video_path"], start, end, exact=bool(state.get("exact_cut")),
+            video_hash=self.__media_proxy.clip_key(video_hash) if proxy else video_hash
+        )
+        return {"video_path": clip, "summary": None, "cache_hit": False}
+
+    # ------------------------------------------------------------
+    # Node: index_timeline
+    # Description:
+    #   Stores the per-video timeline index of a new video when it
+    #   costs no extra model calls: near-duplicates copy the
+    #   (shifted) timeline of the original, and videos summarized
+    #   in segments without a custom prompt reuse those segments.
+    #   Only with TIMELINE_MODE=ingest are TIMELINE_WINDOW windows
+    #   summarized here; by default (lazy) the timeline is built
+    #   on the first range request, and "off" never builds it.
+    # ------------------------------------------------------------
+    def index_timeline(self, state: MainState):
+        if self.__timeline_mode == "off":
+            return {}
+        segments = None
+        if state.get("segments") and not state.get("prompt"):
+            segments = [s for s in state["segments"] if s["summary"]]
+        self._build_timeline(
+            state["video_path"], state["video_name"], state.get("video_hash"), state.get("duplicate_of"),
+            segments, map_windows=self.__timeline_mode == "ingest"
+        )
+        return {}
+
+    # ------------------------------------------------------------
+    # Method: _build_timeline
+    # Description:
+    #   Builds and stores the timeline of a video in MySQL and as
+    #   Chroma documents with start/end metadata, and returns its
+    #   segments. Uses the given segments, else the shifted
+    #   timeline of `duplicate_of`, else (when `map_windows`)
+    #   summarizes TIMELINE_WINDOW windows.
+    # ------------------------------------------------------------
+    def _build_timeline(self, path: str, video_name: str, video_hash: Optional[str] = None,
+                        duplicate_of: Optional[dict] = None, segments: Optional[list] = None,
+                        map_windows: bool = False) -> list:
+        video_hash = video_hash or file_sha256(path)
+        if not segments and duplicate_of:
+            duration = self.__metadata_service.probe(path)["duration"] or 0
+            segments = self._duplicate_segments(duplicate_of, duration)
+            if not self._covers(segments, 0, duration):
+                segments = []
+        if not segments and map_windows:
+            segments = [
+                s for s in self._map_windows(path, video_hash, None, self.__timeline_window)
+                if s["summary"]
+            ]
+        if not segments:
+            return []
+
+        try:
+            self.__segment_table.replace_segments(video_name, segments)
+            ids = [
+                self._chunk_id(
+                    video_hash, video_name, "segment", f"{s['start']:.3f}", f"{s['end']:.3f}", s["summary"]
+                )
+                for s in segments
+            ]
+            written = self.__vector_service.upsert_documents(
+                [
+                    Document(
+                        page_content=s["summary"],
+                        metadata={
+                            "source": video_name,
+                            "kind": "segment",
+                            "start_time": s["start"],
+                            "end_time": s["end"],
+                        }
+                    )
+                    for s in segments
+                ],
+                ids
+            )
+            removed = self.__vector_service.delete_stale(
+                {"$and": [{"source": video_name}, {"kind": "segment"}]}, ids
+            )
+            if written or removed:
+                self.__answer_cache.invalidate(video_name)
+        except Exception as e:
+            self.__logger.error(f"Error saving timeline: {e}")
+        return segments
+
+    # ------------------------------------------------------------
+    # Method: _map_windows
+    # Description:
+    #   Summarizes every window of about `size` seconds
+    #   concurrently on a bounded worker pool and returns them in
+    #   time order. Windows follow the scene cuts of the video
+    #   (fixed windows if detection is unavailable) and are cut
+    #   from its proxy.
+    # ------------------------------------------------------------
+    def _map_windows(self, path: str, video_hash: str, prompt, size: float) -> list:
+        duration = self.__metadata_service.probe(path)["duration"] or 0
+        source = self.__media_proxy.proxy(path, video_hash)
+        windows = self.__scene_detector.windows(source, video_hash, duration, size) \
+            or self._windows(duration, size)
+        clip_key = self.__media_proxy.clip_key(video_hash) if source != path else video_hash
+        with ThreadPoolExecutor(max_workers=self.__segment_workers) as pool:
+            return list(pool.map(
+                lambda window: self._summarize_window(source, clip_key, video_hash, window, prompt),
+                windows
+            ))
+
+    # ------------------------------------------------------------
+    # Method: _compose_range
+    # Description:
+    #   Builds a range summary from stored segment summaries with
+    #   a single text-only model call.
+    # ------------------------------------------------------------
+    def _compose_range(self, segments: list, start: float, end: float, prompt) -> str:
+        partials = "\n\n".join(
+            f"[{self._format_time(s['start'])} - {self._format_time(s['end'])}]\n{s['summary']}"
+            for s in segments
+        )
+        instruction = prompt or "Provide a detailed description of what happens in this part of the video."
+        message = HumanMessage(content=(
+            "You are a video analysis expert. Below are time-stamped summaries of a video. "
+            f"Using only the parts between {self._format_time(start)} and {self._format_time(end)}, "
+            f"answer the following. {instruction} Do not include meta phrases like "
+            "'Here is the summary' — start directly.\n\n"
+            f"{partials}"
+        ))
+        return self.__llm_service.get_chat_model().invoke([message]).text
+
+    @staticmethod
+    def _covers(segments: list, start: float, end: float, tolerance: float = 1.0) -> bool:
+        if not segments or segments[0]["start"] > start + tolerance:
+            return False
+        reached = segments[0]["end"]
+        for segment in segments[1:]:
+            if segment["start"] > reached + tolerance:
+                return False
+            reached = max(reached, segment["end"])
+        return reached >= end - tolerance
+
+    # ------------------------------------------------------------
+    # Method: _summarize_window
+    # Description:
+    #   Summarizes one time window: cache lookup, keyframe-aligned
+    #   clip extraction (retried with exponential backoff), upload
+    #   and model call. Returns summary None on failure.
+    #   `clip_key` identifies the file clips are cut from, the
+    #   summary cache stays keyed by the video content hash.
+    # ------------------------------------------------------------
+    def _summarize_window(self, path: str, clip_key: str, video_hash: str,
+                          window: tuple, prompt) -> SegmentSummary:
+        start, end = window
+        model = self.__llm_service.get_model_name()
+        segment_key = f"{video_hash}@{start:.3f}-{end:.3f}"
+        cached = self.__summary_cache.get(segment_key, prompt, model)
+        if cached is not None:
+            return {"start": start, "end": end, "summary": cached}
+
+        text = (
+            f"This clip covers {self._format_time(start)} to {self._format_time(end)} "
+            f"of a longer video. {self._summary_prompt(prompt)}"
+        )
+        clip = None
+        for attempt in range(self.__segment_retries + 1):
+            try:
+                clip = self.__range_extractor.extract(path, start, end, video_hash=clip_key)
+                break
+            except Exception as e:
+                self.__logger.warning(
+                    f"Cutting segment {start:.0f}-{end:.0f}s failed (attempt {attempt + 1}): {e}"
+                )
+                if attempt < self.__segment_retries:
+                    time.sleep(2 ** attempt)
+        if clip is None:
+            return {"start": start, "end": end, "summary": None}
+
+        # The model call is retried by the call governor; retrying it
+        # here as well would multiply attempts against an open circuit
+        try:
+            uploaded_file = self.__media_uploader.upload(clip, guess_mime_type(clip))
+            summary = self._invoke_with_media(uploaded_file, text, stream=False).text
+        except Exception as e:
+            self.__logger.warning(f"Segment {start:.0f}-{end:.0f}s failed: {e}")
+            return {"start": start, "end": end, "summary": None}
+        self.__summary_cache.put(segment_key, prompt, model, summary)
+        return {"start": start, "end": end, "summary": summary}
 
-        if 'prompt' in state and state['prompt'] != '':
-            prompt = f"You are a video analysis expert. {state['prompt']} Avoid adding introductory phrases like 'Here is the summary' or 'Okay, here’s the explanation'. Start directly with the summary content."
+    # ------------------------------------------------------------
+    # Method: _reduce_summaries
+    # Description:
+    #   Merges time-ordered partial summaries into one final
+    #   summary with a single text-only model call (which also
+    #   returns the metadata block when `structured`).
+    # ------------------------------------------------------------
+    def _reduce_summaries(self, segments: list, prompt, structured: bool = False) -> str:
+        if len(segments) == 1:
+            return segments[0]["summary"]
 
-        encoded_video = base64.b64encode(uploaded_file["data"]).decode("utf-8")
-        message = HumanMessage(
+        partials = "\n\n".join(
+            f"[{self._format_time(s['start'])} - {self._format_time(s['end'])}]\n{s['summary']}"
+            for s in segments
+        )
+        instruction = prompt or (
+            "Provide a detailed and comprehensive description of the whole video, "
+            "including scenes, actions, objects, and emotions."
+        )
+        message = HumanMessage(content=(
+            "You are a video analysis expert. Below are time-ordered summaries of "
+            "consecutive parts of one video. Combine them into a single coherent answer. "
+            f"{instruction} Do not mention that the input was split into parts and do "
+            "not include meta phrases like 'Here is the summary' — start directly."
+            f"{ANALYSIS_INSTRUCTIONS if structured else ''}\n\n"
+            f"{partials}"
+        ))
+        return self.__llm_service.get_chat_model().invoke([message]).text
+
+    # ------------------------------------------------------------
+    # Method: _invoke_with_media
+    # Description:
+    #   Sends a prompt plus an uploaded video reference to the
+    #   chat model and releases the provider file afterwards.
+    #   stream=False hides the tokens from graph.stream(), e.g.
+    #   for the per-window map calls of segmented summaries.
+    # ------------------------------------------------------------
+    def _invoke_with_media(self, uploaded_file: UploadedFile, text: str, stream: bool = True):
+        try:
+            return self.__llm_service.get_chat_model().invoke(
+                [self._media_message(uploaded_file, text)],
+                config=None if stream else {"tags": [TAG_NOSTREAM]}
+            )
+        finally:
+            self.__media_uploader.delete(uploaded_file)
+
+    async def _ainvoke_with_media(self, uploaded_file: UploadedFile, text: str):
+        try:
+            return await self.__llm_service.get_chat_model().ainvoke(
+                [await asyncio.to_thread(self._media_message, uploaded_file, text)]
+            )
+        finally:
+            await asyncio.to_thread(self.__media_uploader.delete, uploaded_file)
+
+    def _media_message(self, uploaded_file: UploadedFile, text: str) -> HumanMessage:
+        return HumanMessage(
             content=[
                 {
                     "type": "text",
-                    "text": prompt
-                },
-                {
-                    "type": "media",
-                    "data": encoded_video,
-                    "mime_type": uploaded_file["mime_type"]
+                    "text": text
                 },
+                self.__media_uploader.content_block(uploaded_file),
             ]
         )
 
-        response = self.__llm_service.get_chat_model().invoke([message])
-        return {"summary": response.content}
+    # ------------------------------------------------------------
+    # Method: _summary_prompt
+    # Description:
+    #   Returns the default analysis prompt, or wraps the user's
+    #   custom prompt with the same style instructions. With
+    #   structured=True the metadata block instructions are added.
+    # ------------------------------------------------------------
+    def _summary_prompt(self, custom_prompt, structured: bool = False) -> str:
+        extra = ANALYSIS_INSTRUCTIONS if structured else ""
+        if custom_prompt:
+            return f"You are a video analysis expert. {custom_prompt} Avoid adding introductory phrases like 'Here is the summary' or 'Okay, here’s the explanation'. Start directly with the summary content.{extra}"
+        return """
+            You are a video analysis expert.
+            Provide a detailed and comprehensive description of this video. 
+            Your response must be in a natural human-readable format describing 
+            what happens in the video, including scenes, actions, objects, and emotions. 
+            Do not include any meta phrases like 'Here is the summary' — start directly.
+        """ + extra
+
+    # ------------------------------------------------------------
+    # Method: _whole_video
+    # Description:
+    #   True unless the run summarizes a (start, end) range clip,
+    #   whose analysis must not overwrite the video's own.
+    # ------------------------------------------------------------
+    @staticmethod
+    def _whole_video(state: MainState) -> bool:
+        return state.get("start_time") is None and state.get("end_time") is None
+
+    def _windows(self, duration: float, size: Optional[float] = None) -> list:
+        size = size or self.__segment_window
+        windows = []
+        start = 0.0
+        while start < duration:
+            end = min(start + size, duration)
+            # Fold a very short tail into the previous window
+            if windows and end - start < size * 0.25:
+                windows[-1] = (windows[-1][0], end)
+            else:
+                windows.append((start, end))
+            start = end
+        return windows or [(0.0, duration)]
+
+    @staticmethod
+    def _format_time(seconds: float) -> str:
+        return f"{int(seconds) // 60}:{int(seconds) % 60:02d}"
 
     # ------------------------------------------------------------
     # Node: store_summary_in_db
     # Description:
     #   Persists the generated video summary into the Chroma vector
     #   database for future semantic retrieval and question-answering.
-    #   Skips storage if not marked as a new video.
+    #   Chunk ids are derived from (video hash, name, chunk), so unchanged
+    #   chunks are skipped, changed ones upserted and chunks of an
+    #   older summary of the video removed.
+    #   Skips storage if not marked as a new video. The parsed
+    #   analysis of a whole-video summary is written to the
+    #   'videos' row in any case.
     # ------------------------------------------------------------
     def store_summary_in_db(self, state: MainState):
-        vector_db = self.__vector_service.vector_db()
+        self._store_analysis(state)
         if state.get("is_new_video") and state["is_new_video"] is True:
             try:
                 text_splitter = RecursiveCharacterTextSplitter(
@@ -160,66 +678,145 @@ class LanggraphService:
                     separators=["\n\n", "\n", " ", ""]
                 )
 
-                chunks = text_splitter.split_text(state["summary"])
-                documents = []
-                if chunks and len(chunks) > 0:
-                    for chunk in chunks:
-                        documents.append(
-                            Document(
-                                page_content=chunk,
-                                metadata={"source": state["video_name"]}
-                            )
-                        )
-                if len(documents) > 0:
-                    uuids = [str(uuid4()) for _ in range(len(documents))]
-                    vector_db.add_documents(documents=documents, ids=uuids)
+                video_name = state["video_name"]
+                video_hash = state.get("video_hash") or (
+                    file_sha256(state["video_path"]) if state.get("video_path") else video_name
+                )
+                documents = {}
+                for chunk in text_splitter.split_text(state["summary"] or ""):
+                    documents.setdefault(
+                        self._chunk_id(video_hash, video_name, "summary", chunk),
+                        Document(page_content=chunk, metadata={"source": video_name, "kind": "summary"})
+                    )
+
+                ids = list(documents)
+                written = self.__vector_service.upsert_documents(list(documents.values()), ids)
+                removed = self.__vector_service.delete_stale(
+                    {"$and": [{"source": video_name}, {"kind": "summary"}]}, ids
+                )
+                if written or removed:
+                    self.__answer_cache.invalidate(video_name)
+                self.__logger.info(
+                    f"Indexed {video_name}: {written} new, {len(ids) - written} unchanged, {removed} stale chunks"
+                )
                 return {}
             except Exception as e:
                 self.__logger.error(f"Error saving summary: {e}")
         return {}
 
+    # ------------------------------------------------------------
+    # Method: _store_analysis
+    # Description:
+    #   Persists category, suitability, language, topics and key
+    #   moments in one UPDATE. Failures are logged only; the
+    #   summary itself is already stored.
+    # ------------------------------------------------------------
+    def _store_analysis(self, state: MainState):
+        analysis = state.get("analysis")
+        if not analysis or not self._whole_video(state):
+            return
+        try:
+            self.__video_table.update_analysis(state["video_name"], analysis)
+        except (LookupError, ConnectionError) as e:
+            self.__logger.error(f"Error saving analysis of {state['video_name']}: {e}")
+
+    # ------------------------------------------------------------
+    # Method: _chunk_id
+    # Description:
+    #   Deterministic document id derived from the video content
+    #   hash, the video name and the chunk itself, so re-indexing
+    #   an unchanged chunk overwrites (or skips) it instead of
+    #   duplicating it, while two rows holding the same file keep
+    #   separate chunks (each tagged with its own source).
+    # ------------------------------------------------------------
+    @staticmethod
+    def _chunk_id(video_hash: str, *parts) -> str:
+        raw = "\x1f".join([video_hash, *(str(p) for p in parts)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
     # ------------------------------------------------------------
     # Node: ask_question
     # Description:
     #   Retrieves stored summaries from the vector DB and uses a
     #   retrieval-augmented generation (RAG) chain to answer user
     #   questions based on the video content. Includes persistent
-    #   conversation memory between multiple .invoke() calls.
+    #   conversation memory between multiple .invoke() calls,
+    #   bounded by ChatHistoryService: recent turns verbatim plus a
+    #   rolling summary of older ones. Near-identical questions
+    #   about the same video with the same history are served
+    #   from the answer cache.
+    #   The retrieval chain is built once per video (QAChainService)
+    #   and the history is passed as a prompt variable.
+    #   aask_question is the native async variant.
     # ------------------------------------------------------------
 
     def ask_question(self, state: MainState):
+        (question, video_name, history_summary, history, removed,
+         cached_answer, question_embedding, context) = (
+            self._prepare_question(state)
+        )
+        if cached_answer is not None:
+            return self._answer_update(question, cached_answer, history_summary, removed)
+
+        result = self.__qa_chain.chain(video_name).invoke({
+            "input": question,
+            "history": history,
+            "embedding": question_embedding
+        })
+        self.__answer_cache.put(video_name, question, result["answer"], question_embedding, context)
+
+        return self._answer_update(question, result["answer"], history_summary, removed)
+
+    async def aask_question(self, state: MainState):
+        (question, video_name, history_summary, history, removed,
+         cached_answer, question_embedding, context) = (
+            await asyncio.to_thread(self._prepare_question, state)
+        )
+        if cached_answer is not None:
+            return self._answer_update(question, cached_answer, history_summary, removed)
+
+        chain = await asyncio.to_thread(self.__qa_chain.chain, video_name)
+        result = await chain.ainvoke({
+            "input": question,
+            "history": history,
+            "embedding": question_embedding
+        })
+        await asyncio.to_thread(
+            self.__answer_cache.put, video_name, question, result["answer"], question_embedding, context
+        )
+
+        return self._answer_update(question, result["answer"], history_summary, removed)
+
+    # ------------------------------------------------------------
+    # Method: _prepare_question
+    # Description:
+    #   Blocking part of ask_question shared by the sync and async
+    #   nodes: history compaction and the answer cache lookup,
+    #   keyed by the history the question is answered with.
+    # ------------------------------------------------------------
+    def _prepare_question(self, state: MainState):
         question = state.get("question")
         video_name = state.get("video_name")
-        messages = state.get("messages", [])
-
-        vector_db = self.__vector_service.vector_db()
-        search_kwargs = {'filter': {"source": video_name}}
-        retriever = vector_db.as_retriever(search_kwargs=search_kwargs)
-
-        prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                "You are a helpful assistant. Answer only using conversation history and provided video context. "
-                "If the question is about previous conversation, use the chat history. "
-                "If the question is about the video, use the context below.\n\n"
-                "Video Context:\n{context}"
-            ),
-            *messages,
-            (
-                "human", "{input}"
-            )
-        ])
+        history_summary, messages, removed = self.__history.compact(
+            state.get("messages", []), state.get("history_summary")
+        )
 
-        combine_docs_chain = create_stuff_documents_chain(self.__llm_service.get_chat_model(), prompt)
-        retrieval_chain = create_retrieval_chain(retriever, combine_docs_chain)
+        history = list(messages)
+        if history_summary:
+            history.insert(0, SystemMessage(content=f"Summary of the earlier conversation:\n{history_summary}"))
 
-        result = retrieval_chain.invoke({"input": question})
+        context = self.__answer_cache.context_key(history)
+        cached_answer, question_embedding = self.__answer_cache.lookup(video_name, question, context)
+        return question, video_name, history_summary, history, removed, cached_answer, question_embedding, context
 
+    def _answer_update(self, question: str, answer: str, history_summary, removed: list) -> dict:
         return {
-            "answer": result["answer"],
+            "answer": answer,
+            "history_summary": history_summary,
             "messages": [
+                *[RemoveMessage(id=m.id) for m in removed],
                 HumanMessage(content=question),
-                AIMessage(content=result["answer"])
+                AIMessage(content=answer)
             ]
         }
 
@@ -232,25 +829,85 @@ class LanggraphService:
     def conditional_node(self, state: MainState) -> str:
         if state.get("question") and state['question'] != '':
             return "ask_question"
-        return "upload_video"
+        if state.get("start_time") is not None and state.get("end_time") is not None:
+            return "summarize_range"
+        return "check_summary_cache"
+
+    # ------------------------------------------------------------
+    # Node: range_route
+    # Description:
+    #   Ends the run when the range was answered from the timeline,
+    #   otherwise continues with the extracted clip.
+    # ------------------------------------------------------------
+    def range_route(self, state: MainState) -> str:
+        if state.get("summary"):
+            return END
+        return "check_summary_cache"
+
+    # ------------------------------------------------------------
+    # Node: store_route
+    # Description:
+    #   Indexes the timeline after storing a new video.
+    # ------------------------------------------------------------
+    def store_route(self, state: MainState) -> str:
+        if state.get("is_new_video") and self.__timeline_mode != "off":
+            return "index_timeline"
+        return END
+
+    # ------------------------------------------------------------
+    # Node: cache_route
+    # Description:
+    #   Skips the upload and summarization nodes when the summary
+    #   was served from the cache, and sends long videos (or
+    #   explicit requests) to segmented summarization.
+    # ------------------------------------------------------------
+    def cache_route(self, state: MainState) -> str:
+        if state.get("cache_hit"):
+            return "store_summary_in_db"
+        if state.get("segmented"):
+            return "summarize_segments"
+        duration = self.__metadata_service.probe(state["video_path"])["duration"] or 0
+        if duration > self.__segment_threshold:
+            return "summarize_segments"
+        return "reduce_media"
+
+    # ------------------------------------------------------------
+    # Method: _node
+    # Description:
+    #   Wraps a node so the graph can run with both invoke() and
+    #   ainvoke(). Model-bound nodes pass a native coroutine;
+    #   disk / ffmpeg / DB-bound nodes run the sync code in a
+    #   worker thread so they never block the event loop.
+    # ------------------------------------------------------------
+    @staticmethod
+    def _node(func, afunc=None):
+        async def run_in_thread(state: MainState):
+            return await asyncio.to_thread(func, state)
+
+        return RunnableLambda(func, afunc=afunc or run_in_thread, name=func.__name__)
 
     # ------------------------------------------------------------
     # Method: build_pipeline
     # Description:
-    #   Builds and compiles the LangGraph pipeline with a single
-    #   persistent memory checkpoint to preserve chat context.
+    #   Builds and compiles the LangGraph pipeline with the shared,
+    #   bounded checkpointer to preserve chat context.
     # ------------------------------------------------------------
     def build_pipeline(self):
         if self.__graph is not None:
             return self.__graph
 
         pipeline = StateGraph(MainState)
-        checkpointer = MEMORY_SAVER
-        # Add nodes
-        pipeline.add_node("upload_video", self.upload_video)
-        pipeline.add_node("summarize_video", self.summarize_video)
-        pipeline.add_node("store_summary_in_db", self.store_summary_in_db)
-        pipeline.add_node("ask_question", self.ask_question)
+        checkpointer = CheckpointerService().get_checkpointer()
+        # Add nodes (each with a sync and an async implementation)
+        pipeline.add_node("check_summary_cache", self._node(self.check_summary_cache))
+        pipeline.add_node("reduce_media", self._node(self.reduce_media))
+        pipeline.add_node("upload_video", self._node(self.upload_video))
+        pipeline.add_node("summarize_video", self._node(self.summarize_video, self.asummarize_video))
+        pipeline.add_node("summarize_segments", self._node(self.summarize_segments))
+        pipeline.add_node("store_summary_in_db", self._node(self.store_summary_in_db))
+        pipeline.add_node("ask_question", self._node(self.ask_question, self.aask_question))
+        pipeline.add_node("summarize_range", self._node(self.summarize_range))
+        pipeline.add_node("index_timeline", self._node(self.index_timeline))
 
         # Conditional edges
         pipeline.add_conditional_edges(
@@ -258,15 +915,56 @@ class LanggraphService:
             self.conditional_node,
             {
                 "ask_question": "ask_question",
-                "upload_video": "upload_video",
+                "summarize_range": "summarize_range",
+                "check_summary_cache": "check_summary_cache",
+            },
+        )
+        pipeline.add_conditional_edges(
+            "summarize_range",
+            self.range_route,
+            {
+                END: END,
+                "check_summary_cache": "check_summary_cache",
+            },
+        )
+        pipeline.add_conditional_edges(
+            "check_summary_cache",
+            self.cache_route,
+            {
+                "store_summary_in_db": "store_summary_in_db",
+                "summarize_segments": "summarize_segments",
+                "reduce_media": "reduce_media",
             },
         )
 
         # Sequential edges
+        pipeline.add_edge("reduce_media", "upload_video")
         pipeline.add_edge("upload_video", "summarize_video")
         pipeline.add_edge("summarize_video", "store_summary_in_db")
-        pipeline.add_edge("store_summary_in_db", END)
+        pipeline.add_edge("summarize_segments", "store_summary_in_db")
+        pipeline.add_conditional_edges(
+            "store_summary_in_db",
+            self.store_route,
+            {
+                "index_timeline": "index_timeline",
+                END: END,
+            },
+        )
+        pipeline.add_edge("index_timeline", END)
         pipeline.add_edge("ask_question", END)
 
         self.__graph = pipeline.compile(checkpointer=checkpointer)
         return self.__graph
+
+    # ------------------------------------------------------------
+    # Method: check_pipeline
+    # Description:
+    #   Health check of the shared compiled graph (see
+    #   ResourceRegistry.health): the graph is bound to the
+    #   checkpointer it was compiled with, so it is unhealthy once
+    #   that checkpointer has been reset and must be rebuilt.
+    # ------------------------------------------------------------
+    @staticmethod
+    def check_pipeline(graph):
+        if graph.checkpointer is not CheckpointerService().get_checkpointer():
+            raise RuntimeError("Graph is bound to a checkpointer that was reset")
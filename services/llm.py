@@ -1,13 +1,22 @@
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.embeddings import DeterministicFakeEmbedding
 from decouple import config
+from services.call_governor import CallGovernor, GovernedChatModel, TokenBucket
+from services.fake_llm import FakeChatModel
+from services.media_upload import GeminiMediaUploader, LocalMediaUploader
+from services.registry import RESOURCES
 # ------------------------------------------------------------
 # Class: LLMService
 # Description:
 #   Handles initialization of LLMs (chat & embedding) based on
 #   the selected provider ("openai" or "google").
 #   This class provides abstraction to easily switch between
-#   Gemini (Google) and GPT (OpenAI) models.
+#   Gemini (Google) and GPT (OpenAI) models. PROVIDER=fake runs
+#   fully offline with FakeChatModel and fake embeddings.
+#   Every chat model is wrapped in GovernedChatModel, so rate
+#   limits, retries, timeouts and the circuit breaker are
+#   applied in one place for all providers.
 # ------------------------------------------------------------
 
 
@@ -21,6 +30,10 @@ class LLMService:
         self.__provider = str(config("PROVIDER"))
         self.__chat_model = str(config("CHAT_MODEL"))
         self.__embedding_model = str(config("EMBEDDING_MODEL"))
+        self.__media_uploader = str(config("MEDIA_UPLOADER", default=""))
+        self.__requests_per_minute = float(config("LLM_REQUESTS_PER_MINUTE", default=0))
+        self.__tokens_per_minute = float(config("LLM_TOKENS_PER_MINUTE", default=0))
+        self.__attempt_timeout = float(config("LLM_ATTEMPT_TIMEOUT", default=120))
 
     # ------------------------------------------------------------
     # Method: gemini_chat_model
@@ -34,8 +47,8 @@ class LLMService:
             model=self.__chat_model,
             temperature=0,
             max_output_tokens=None,
-            timeout=None,
-            max_retries=2,
+            timeout=self.__attempt_timeout,
+            max_retries=0,
         )
 
     # ------------------------------------------------------------
@@ -56,7 +69,30 @@ class LLMService:
     #   Uses "gpt-4o-mini" for cost-effective responses.
     # ------------------------------------------------------------
     def openai_chat_model(self):
-        return ChatOpenAI(model=self.__chat_model, temperature=0, verbose=True)
+        return ChatOpenAI(
+            model=self.__chat_model, temperature=0, verbose=True,
+            timeout=self.__attempt_timeout, max_retries=0
+        )
+
+    # ------------------------------------------------------------
+    # Method: fake_chat_model / fake_embedding_model
+    # Description:
+    #   Offline models for PROVIDER=fake. Latency and failures are
+    #   injected from FAKE_LLM_* settings.
+    # ------------------------------------------------------------
+    def fake_chat_model(self):
+        return FakeChatModel(
+            model=self.__chat_model,
+            latency=float(config("FAKE_LLM_LATENCY", default=0)),
+            jitter=float(config("FAKE_LLM_JITTER", default=0)),
+            error_rate=float(config("FAKE_LLM_ERROR_RATE", default=0)),
+            error_status=int(config("FAKE_LLM_ERROR_STATUS", default=429)),
+            stall_rate=float(config("FAKE_LLM_STALL_RATE", default=0)),
+            stall_seconds=float(config("FAKE_LLM_STALL_SECONDS", default=30)),
+        )
+
+    def fake_embedding_model(self):
+        return DeterministicFakeEmbedding(size=int(config("FAKE_EMBEDDING_SIZE", default=256)))
 
     # ------------------------------------------------------------
     # Method: openai_embedding_model
@@ -71,20 +107,92 @@ class LLMService:
     # Method: get_chat_model
     # Description:
     #   Automatically returns the appropriate chat model
-    #   depending on the configured provider.
+    #   depending on the configured provider. The instance (and
+    #   its HTTP client) is created once per process.
     # ------------------------------------------------------------
     def get_chat_model(self):
+        return RESOURCES.get(f"chat_model:{self.get_model_name()}", self._build_chat_model)
+
+    def _build_chat_model(self):
         if self.__provider == 'openai':
-            return self.openai_chat_model()
-        return self.gemini_chat_model()
+            inner = self.openai_chat_model()
+        elif self.__provider == 'fake':
+            inner = self.fake_chat_model()
+        else:
+            inner = self.gemini_chat_model()
+        return GovernedChatModel(inner=inner, governor=self.get_governor())
+
+    # ------------------------------------------------------------
+    # Method: get_governor
+    # Description:
+    #   Returns the CallGovernor of the configured chat model.
+    #   Request / token buckets are shared per provider, the
+    #   circuit breaker is per provider and model.
+    # ------------------------------------------------------------
+    def get_governor(self) -> CallGovernor:
+        requests = None
+        if self.__requests_per_minute > 0:
+            requests = RESOURCES.get(
+                f"rate_limit:requests:{self.__provider}",
+                lambda: TokenBucket(self.__requests_per_minute)
+            )
+        tokens = None
+        if self.__tokens_per_minute > 0:
+            tokens = RESOURCES.get(
+                f"rate_limit:tokens:{self.__provider}",
+                lambda: TokenBucket(self.__tokens_per_minute)
+            )
+        return RESOURCES.get(
+            f"governor:{self.get_model_name()}",
+            lambda: CallGovernor(self.get_model_name(), requests, tokens)
+        )
 
     # ------------------------------------------------------------
     # Method: get_embedding_model
     # Description:
     #   Automatically returns the appropriate embedding model
-    #   depending on the configured provider.
+    #   depending on the configured provider, shared process-wide.
     # ------------------------------------------------------------
     def get_embedding_model(self):
+        return RESOURCES.get(
+            f"embedding_model:{self.get_embedding_name()}",
+            self._build_embedding_model
+        )
+
+    def _build_embedding_model(self):
         if self.__provider == 'openai':
             return self.openai_embedding_model()
+        if self.__provider == 'fake':
+            return self.fake_embedding_model()
         return self.gemini_embedding_model()
+
+    # ------------------------------------------------------------
+    # Method: get_model_name
+    # Description:
+    #   Returns a stable "provider:model" identifier of the chat
+    #   model, used to key cached model outputs.
+    # ------------------------------------------------------------
+    def get_model_name(self) -> str:
+        return f"{self.__provider}:{self.__chat_model}"
+
+    # ------------------------------------------------------------
+    # Method: get_embedding_name
+    # Description:
+    #   Returns a stable "provider:model" identifier of the
+    #   embedding model, used to namespace cached embeddings.
+    # ------------------------------------------------------------
+    def get_embedding_name(self) -> str:
+        return f"{self.__provider}:{self.__embedding_model}"
+
+    # ------------------------------------------------------------
+    # Method: get_media_uploader
+    # Description:
+    #   Returns the uploader used to hand videos to the chat model.
+    #   Gemini streams files to its Files API; other providers
+    #   (or MEDIA_UPLOADER=local) use the local stand-in.
+    # ------------------------------------------------------------
+    def get_media_uploader(self):
+        uploader = self.__media_uploader or self.__provider
+        if uploader == 'gemini':
+            return GeminiMediaUploader()
+        return LocalMediaUploader()
@@ -0,0 +1,205 @@
+import os
+import time
+import hashlib
+import threading
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from decouple import config
+from services.ffmpeg import FFmpegService
+from services.video_metadata import VideoMetadataService
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Global: _POOL / _INFLIGHT
+# Description:
+#   Process-wide transcoding pool. Every job is one ffmpeg
+#   process, so PROXY_WORKERS bounds how many transcodes run in
+#   parallel across sessions and batch jobs. _INFLIGHT maps a
+#   proxy path to its running job so concurrent requests for the
+#   same video wait for one transcode instead of starting two.
+# ------------------------------------------------------------
+_POOL: Optional[ThreadPoolExecutor] = None
+_INFLIGHT: dict = {}
+_LOCK = threading.Lock()
+# Serializes PROXY_DIR clean-ups across concurrent sessions
+_JANITOR_LOCK = threading.Lock()
+
+
+# ------------------------------------------------------------
+# Class: MediaProxyService
+# Description:
+#   Produces the reduced copy of a video that is sent to the
+#   model instead of the original: at most PROXY_HEIGHT lines,
+#   PROXY_FPS frames per second (keyframe every 2 seconds so
+#   range cuts stay precise) and mono low-rate audio.
+#     - proxies are cached in PROXY_DIR by content hash and
+#       settings, so summary, range and custom-prompt requests
+#       of the same video transcode it once;
+#     - sources that are already small are used as-is;
+#     - failures fall back to the original file;
+#     - PROXY_DIR is kept under PROXY_DIR_MAX_BYTES and
+#       PROXY_DIR_MAX_AGE (least recently used proxies go first).
+# ------------------------------------------------------------
+class MediaProxyService:
+    def __init__(self):
+        self.__enabled = str(config("PROXY_ENABLED", default="true")).lower() == "true"
+        self.__proxy_dir = str(config("PROXY_DIR", default="./videos/proxies"))
+        self.__height = int(config("PROXY_HEIGHT", default=480))
+        self.__fps = float(config("PROXY_FPS", default=2))
+        self.__crf = int(config("PROXY_CRF", default=30))
+        self.__audio_rate = int(config("PROXY_AUDIO_RATE", default=16000))
+        self.__audio_bitrate = str(config("PROXY_AUDIO_BITRATE", default="32k"))
+        self.__threads = int(config("PROXY_THREADS", default=2))
+        self.__workers = int(config("PROXY_WORKERS", default=max(1, (os.cpu_count() or 2) // 2)))
+        self.__max_source_bitrate = int(config("PROXY_MAX_SOURCE_BITRATE", default=1_000_000))
+        self.__max_bytes = int(config("PROXY_DIR_MAX_BYTES", default=10 * 1024 ** 3))
+        self.__max_age = int(config("PROXY_DIR_MAX_AGE", default=30 * 24 * 3600))
+        self.__ffmpeg = FFmpegService()
+        self.__metadata_service = VideoMetadataService()
+        self.__logger = setup_logger(__name__)
+
+    # ------------------------------------------------------------
+    # Method: proxy
+    # Description:
+    #   Returns the path to send to the model for `path`: the
+    #   cached proxy (transcoded on the pool if missing), or the
+    #   original when reduction is disabled, not worth it or
+    #   failed.
+    # ------------------------------------------------------------
+    def proxy(self, path: str, video_hash: str) -> str:
+        if not self.__enabled or self._small_enough(path):
+            return path
+
+        target = self._path(video_hash)
+        if self._touch(target):
+            return target
+
+        with _LOCK:
+            future = _INFLIGHT.get(target)
+            if future is None:
+                future = self._pool().submit(self._build, path, target)
+                _INFLIGHT[target] = future
+        try:
+            future.result()
+        except Exception as e:
+            self.__logger.error(f"Error building proxy of {path}, sending the original: {e}")
+            return path
+        finally:
+            with _LOCK:
+                if _INFLIGHT.get(target) is future:
+                    del _INFLIGHT[target]
+        self.clean_proxy_dir()
+        return target
+
+    # ------------------------------------------------------------
+    # Method: clean_proxy_dir
+    # Description:
+    #   Janitor for PROXY_DIR: drops proxies older than
+    #   PROXY_DIR_MAX_AGE, then least recently used proxies until
+    #   the directory fits in PROXY_DIR_MAX_BYTES.
+    # ------------------------------------------------------------
+    def clean_proxy_dir(self):
+        if not os.path.isdir(self.__proxy_dir):
+            return
+        with _JANITOR_LOCK:
+            now = time.time()
+            files = []
+            for entry in os.scandir(self.__proxy_dir):
+                if not entry.is_file() or ".part." in entry.name:
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.__max_age:
+                    self._remove(entry.path)
+                else:
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.__max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    # ------------------------------------------------------------
+    # Method: existing
+    # Description:
+    #   Returns the cached proxy of a content hash or None,
+    #   without transcoding.
+    # ------------------------------------------------------------
+    def existing(self, video_hash: Optional[str]) -> Optional[str]:
+        if not self.__enabled or not video_hash:
+            return None
+        path = self._path(video_hash)
+        return path if self._touch(path) else None
+
+    # ------------------------------------------------------------
+    # Method: clip_key
+    # Description:
+    #   Cache key for clips cut from the proxy of a video, so they
+    #   never collide with clips cut from the original.
+    # ------------------------------------------------------------
+    def clip_key(self, video_hash: str) -> str:
+        return hashlib.sha256(f"{video_hash}:{self._tag()}".encode("utf-8")).hexdigest()
+
+    def _build(self, path: str, target: str):
+        os.makedirs(self.__proxy_dir, exist_ok=True)
+        partial = f"{target}.{threading.get_ident()}.part.mp4"
+        try:
+            self.__ffmpeg.run([
+                "-y", "-i", path, "-map", "0:v:0", "-map", "0:a:0?",
+                "-vf", f"fps={self.__fps:g},scale=-2:min(ih\\,{self.__height})",
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", str(self.__crf),
+                "-g", str(max(1, round(self.__fps * 2))), "-pix_fmt", "yuv420p",
+                "-c:a", "aac", "-ac", "1", "-ar", str(self.__audio_rate), "-b:a", self.__audio_bitrate,
+                "-threads", str(self.__threads), "-movflags", "+faststart", partial
+            ])
+            os.replace(partial, target)
+            self.__logger.info(
+                f"Built proxy of {os.path.basename(path)}: "
+                f"{os.path.getsize(path) / 1e6:.1f} MB -> {os.path.getsize(target) / 1e6:.1f} MB"
+            )
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    # ------------------------------------------------------------
+    # Method: _small_enough
+    # Description:
+    #   True when the source is already within PROXY_HEIGHT and
+    #   PROXY_MAX_SOURCE_BITRATE, so a transcode would not pay off.
+    # ------------------------------------------------------------
+    def _small_enough(self, path: str) -> bool:
+        metadata = self.__metadata_service.probe(path)
+        height, bitrate = metadata.get("height"), metadata.get("bitrate")
+        if not bitrate and metadata.get("duration"):
+            bitrate = os.path.getsize(path) * 8 / metadata["duration"]
+        return bool(height and bitrate) and height <= self.__height and bitrate <= self.__max_source_bitrate
+
+    # Marks a cached proxy as recently used; False if missing
+    @staticmethod
+    def _touch(path: str) -> bool:
+        try:
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.__logger.warning(f"Error removing {path}: {e}")
+
+    def _tag(self) -> str:
+        return f"{self.__height}p{self.__fps:g}fps_crf{self.__crf}_{self.__audio_rate}hz"
+
+    def _path(self, video_hash: str) -> str:
+        return os.path.join(self.__proxy_dir, f"{video_hash}_{self._tag()}.mp4")
+
+    def _pool(self) -> ThreadPoolExecutor:
+        global _POOL
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=self.__workers, thread_name_prefix="proxy")
+        return _POOL
@@ -0,0 +1,178 @@
+import os
+import time
+import base64
+import mimetypes
+from pathlib import Path
+from typing import TypedDict
+from decouple import config
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Global: CHUNK_SIZE
+# Description:
+#   Number of bytes read from disk per iteration while a video
+#   is streamed to the provider. Kept a multiple of 3 so that
+#   base64 chunks can be concatenated without padding.
+# ------------------------------------------------------------
+CHUNK_SIZE = int(config("MEDIA_CHUNK_SIZE", default=8 * 1024 * 1024 - 2))
+CHUNK_SIZE -= CHUNK_SIZE % 3
+
+
+# ------------------------------------------------------------
+# TypedDict: UploadedFile
+# Description:
+#   Lightweight reference to a video handed to the model.
+#   Only the local path, MIME type, size, provider URI and
+#   provider file name (used to delete it) are kept, so the
+#   LangGraph state never carries raw bytes.
+# ------------------------------------------------------------
+class UploadedFile(TypedDict):
+    path: str
+    mime_type: str
+    size: int
+    uri: str
+    name: str
+
+
+# ------------------------------------------------------------
+# Method: read_chunks
+# Description:
+#   Yields the file content in CHUNK_SIZE pieces so callers
+#   never hold the whole video in memory at once.
+# ------------------------------------------------------------
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+# ------------------------------------------------------------
+# Method: guess_mime_type
+# Description:
+#   Returns the MIME type of a video path, defaulting to mp4.
+# ------------------------------------------------------------
+def guess_mime_type(path: str) -> str:
+    mime_type, _ = mimetypes.guess_type(path)
+    return mime_type or "video/mp4"
+
+
+# ------------------------------------------------------------
+# Class: GeminiMediaUploader
+# Description:
+#   Streams a video to the Gemini Files API and returns a
+#   file reference that can be passed to the chat model via
+#   `file_uri` instead of inline base64 data.
+# ------------------------------------------------------------
+class GeminiMediaUploader:
+    def __init__(self):
+        self.__logger = setup_logger(__name__)
+        self.__poll_interval = float(config("MEDIA_UPLOAD_POLL_INTERVAL", default=2))
+        self.__timeout = float(config("MEDIA_UPLOAD_TIMEOUT", default=600))
+        self.__client = None
+
+    # ------------------------------------------------------------
+    # Method: _client
+    # Description:
+    #   Lazily creates the google-genai client (reads the
+    #   GOOGLE_API_KEY environment variable).
+    # ------------------------------------------------------------
+    def _client(self):
+        if self.__client is None:
+            from google import genai
+            self.__client = genai.Client()
+        return self.__client
+
+    # ------------------------------------------------------------
+    # Method: upload
+    # Description:
+    #   Uploads the file handle in resumable chunks and waits
+    #   until Gemini has finished processing the video.
+    #   Raises RuntimeError if the file fails or times out.
+    # ------------------------------------------------------------
+    def upload(self, path: str, mime_type: str) -> UploadedFile:
+        client = self._client()
+        with open(path, "rb") as f:
+            file = client.files.upload(
+                file=f,
+                config={"mime_type": mime_type, "display_name": os.path.basename(path)}
+            )
+
+        deadline = time.monotonic() + self.__timeout
+        while file.state and file.state.name == "PROCESSING":
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Timed out waiting for Gemini to process {path}")
+            time.sleep(self.__poll_interval)
+            file = client.files.get(name=file.name)
+
+        if file.state and file.state.name == "FAILED":
+            raise RuntimeError(f"Gemini failed to process {path}")
+
+        self.__logger.info(f"Uploaded {path} as {file.name}")
+        return {
+            "path": path,
+            "mime_type": mime_type,
+            "size": os.path.getsize(path),
+            "uri": str(file.uri),
+            "name": str(file.name),
+        }
+
+    # ------------------------------------------------------------
+    # Method: content_block
+    # Description:
+    #   Builds the message content part that references the
+    #   uploaded file by URI.
+    # ------------------------------------------------------------
+    def content_block(self, uploaded_file: UploadedFile) -> dict:
+        return {
+            "type": "media",
+            "file_uri": uploaded_file["uri"],
+            "mime_type": uploaded_file["mime_type"]
+        }
+
+    # ------------------------------------------------------------
+    # Method: delete
+    # Description:
+    #   Removes the remote file once the model is done with it.
+    #   Failures are logged only; Gemini expires files anyway.
+    # ------------------------------------------------------------
+    def delete(self, uploaded_file: UploadedFile):
+        try:
+            self._client().files.delete(name=uploaded_file["name"])
+        except Exception as e:
+            self.__logger.warning(f"Error deleting uploaded file {uploaded_file['uri']}: {e}")
+
+
+# ------------------------------------------------------------
+# Class: LocalMediaUploader
+# Description:
+#   Local stand-in used for providers without a file API and
+#   for offline tests. The "upload" is a reference to the file
+#   on disk; bytes are only read, chunk by chunk, at the moment
+#   the message is built and never enter the graph state.
+# ------------------------------------------------------------
+class LocalMediaUploader:
+    def upload(self, path: str, mime_type: str) -> UploadedFile:
+        return {
+            "path": path,
+            "mime_type": mime_type,
+            "size": os.path.getsize(path),
+            "uri": Path(path).resolve().as_uri(),
+            "name": os.path.basename(path),
+        }
+
+    def content_block(self, uploaded_file: UploadedFile) -> dict:
+        encoded = "".join(
+            base64.b64encode(chunk).decode("utf-8")
+            for chunk in read_chunks(uploaded_file["path"])
+        )
+        return {
+            "type": "media",
+            "data": encoded,
+            "mime_type": uploaded_file["mime_type"]
+        }
+
+    def delete(self, uploaded_file: UploadedFile):
+        return None
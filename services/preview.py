@@ -0,0 +1,87 @@
+import os
+from typing import Optional
+from decouple import config
+from services.ffmpeg import FFmpegService
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Class: PreviewService
+# Description:
+#   Generates lightweight previews for the video list at ingest:
+#     - a poster frame (JPEG, PREVIEW_WIDTH wide)
+#     - a short, silent, low-bitrate MP4 preview clip
+#   Files are cached in PREVIEW_DIR keyed by the content hash,
+#   so identical uploads share them and they are built once.
+# ------------------------------------------------------------
+class PreviewService:
+    def __init__(self):
+        self.__preview_dir = str(config("PREVIEW_DIR", default="./videos/previews"))
+        self.__width = int(config("PREVIEW_WIDTH", default=320))
+        self.__seconds = float(config("PREVIEW_SECONDS", default=6))
+        self.__ffmpeg = FFmpegService()
+        self.__logger = setup_logger(__name__)
+        os.makedirs(self.__preview_dir, exist_ok=True)
+
+    # ------------------------------------------------------------
+    # Method: poster_path / preview_path
+    # Description:
+    #   Return the cached file path if it exists, else None.
+    # ------------------------------------------------------------
+    def poster_path(self, content_hash: Optional[str]) -> Optional[str]:
+        return self._existing(content_hash, "jpg")
+
+    def preview_path(self, content_hash: Optional[str]) -> Optional[str]:
+        return self._existing(content_hash, "mp4")
+
+    # ------------------------------------------------------------
+    # Method: generate
+    # Description:
+    #   Builds the poster frame and preview clip for a video if
+    #   they are not cached yet. The frame is taken at 10% of the
+    #   duration to skip black intro frames. Errors are logged
+    #   and never block the upload.
+    # ------------------------------------------------------------
+    def generate(self, video_path: str, content_hash: str, duration: Optional[float]) -> dict:
+        offset = min(max(float(duration or 0) * 0.1, 0), 60)
+        scale = f"scale={self.__width}:-2"
+        outputs = {}
+
+        poster = self._path(content_hash, "jpg")
+        if not os.path.exists(poster):
+            self._build(poster, [
+                "-ss", f"{offset:.3f}", "-i", video_path,
+                "-frames:v", "1", "-vf", scale, "-q:v", "4"
+            ])
+        outputs["poster"] = self.poster_path(content_hash)
+
+        preview = self._path(content_hash, "mp4")
+        if not os.path.exists(preview):
+            self._build(preview, [
+                "-ss", f"{offset:.3f}", "-i", video_path, "-t", f"{self.__seconds:.3f}",
+                "-an", "-vf", f"{scale},fps=12", "-c:v", "libx264", "-preset", "veryfast",
+                "-b:v", "150k", "-maxrate", "200k", "-bufsize", "400k",
+                "-pix_fmt", "yuv420p", "-movflags", "+faststart"
+            ])
+        outputs["preview"] = self.preview_path(content_hash)
+        return outputs
+
+    def _build(self, target: str, args: list):
+        base, ext = os.path.splitext(target)
+        partial = f"{base}.part{ext}"
+        try:
+            self.__ffmpeg.run(["-y", *args, partial])
+            os.replace(partial, target)
+        except Exception as e:
+            self.__logger.error(f"Error generating {target}: {e}")
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def _path(self, content_hash: str, ext: str) -> str:
+        return os.path.join(self.__preview_dir, f"{content_hash}.{ext}")
+
+    def _existing(self, content_hash: Optional[str], ext: str) -> Optional[str]:
+        if not content_hash:
+            return None
+        path = self._path(content_hash, ext)
+        return path if os.path.exists(path) else None
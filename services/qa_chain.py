@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from decouple import config
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnablePassthrough
+from langchain_classic.chains.combine_documents import create_stuff_documents_chain
+from services.vector_store import VectorStoreService
+from services.llm import LLMService
+
+# ------------------------------------------------------------
+# Global: QA_PROMPT
+# Description:
+#   Q&A prompt, built once per process. The conversation is
+#   passed at call time through the "history" placeholder
+#   (rolling summary + recent turns) instead of being baked
+#   into a new template on every question.
+# ------------------------------------------------------------
+QA_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "You are a helpful assistant. Answer only using conversation history and provided video context. "
+        "If the question is about previous conversation, use the chat history. "
+        "If the question is about the video, use the context below.\n\n"
+        "Video Context:\n{context}"
+    ),
+    MessagesPlaceholder("history", optional=True),
+    ("human", "{input}")
+])
+
+
+# ------------------------------------------------------------
+# Class: QAChainService
+# Description:
+#   Caches one retrieval chain per video filter.
+#   - The stuff-documents chain is shared by all videos; only
+#     the retrieval step is bound to the video's filter.
+#   - Chains are kept in a bounded LRU (QA_CHAIN_CACHE_SIZE) and
+#     rebuilt when the shared chat model or Chroma handle has
+#     been replaced in RESOURCES.
+#   - When the caller already has the question embedding (from
+#     the answer cache), retrieval searches by vector and the
+#     question is not embedded a second time.
+# ------------------------------------------------------------
+class QAChainService:
+    def __init__(self):
+        self.__vector_service = VectorStoreService()
+        self.__llm_service = LLMService()
+        self.__max_chains = int(config("QA_CHAIN_CACHE_SIZE", default=64))
+        self.__top_k = int(config("QA_RETRIEVAL_K", default=4))
+        self.__chains: OrderedDict = OrderedDict()
+        self.__combine_chain = None
+        self.__lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Method: chain
+    # Description:
+    #   Returns the cached retrieval chain of a video. The chain
+    #   expects {"input", "history", "embedding"} and returns the
+    #   inputs plus "context" and "answer".
+    # ------------------------------------------------------------
+    def chain(self, video_name: str):
+        chat_model = self.__llm_service.get_chat_model()
+        vector_db = self.__vector_service.vector_db()
+        with self.__lock:
+            entry = self.__chains.get(video_name)
+            if entry is not None and entry["chat_model"] is chat_model and entry["vector_db"] is vector_db:
+                self.__chains.move_to_end(video_name)
+                return entry["chain"]
+
+            if self.__combine_chain is None or self.__combine_chain[0] is not chat_model:
+                self.__combine_chain = (chat_model, create_stuff_documents_chain(chat_model, QA_PROMPT))
+
+            chain = RunnablePassthrough.assign(
+                context=self._retriever(vector_db, video_name)
+            ).assign(answer=self.__combine_chain[1])
+
+            self.__chains[video_name] = {"chain": chain, "chat_model": chat_model, "vector_db": vector_db}
+            self.__chains.move_to_end(video_name)
+            while len(self.__chains) > self.__max_chains:
+                self.__chains.popitem(last=False)
+            return chain
+
+    def _retriever(self, vector_db, video_name: str):
+        search_filter = {"source": video_name}
+        top_k = self.__top_k
+
+        def retrieve(inputs: dict) -> list:
+            embedding = inputs.get("embedding")
+            if embedding is not None:
+                return vector_db.similarity_search_by_vector(embedding, k=top_k, filter=search_filter)
+            return vector_db.similarity_search(inputs["input"], k=top_k, filter=search_filter)
+
+        return retrieve
@@ -0,0 +1,248 @@
+import os
+import time
+import threading
+from typing import Optional
+from decouple import config
+from services.ffmpeg import FFmpegService
+from services.hashing import file_sha256
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Global: _JANITOR_LOCK
+# Description:
+#   Serializes TEMP_DIR clean-ups across concurrent sessions.
+# ------------------------------------------------------------
+_JANITOR_LOCK = threading.Lock()
+
+
+# ------------------------------------------------------------
+# Global: _X264_PROFILES
+# Description:
+#   ffprobe H.264 profile names mapped to libx264 -profile:v
+#   values, used to encode a head that matches the source.
+# ------------------------------------------------------------
+_X264_PROFILES = {
+    "constrained baseline": "baseline",
+    "baseline": "baseline",
+    "main": "main",
+    "high": "high",
+    "high 10": "high10",
+    "high 4:2:2": "high422",
+    "high 4:4:4 predictive": "high444",
+}
+
+
+# ------------------------------------------------------------
+# Class: RangeExtractorService
+# Description:
+#   Cuts a time range out of a video without a full re-encode.
+#   - Fast mode stream-copies from the keyframe at/before start.
+#   - Exact mode re-encodes only the leading partial GOP
+#     (start -> next keyframe) with the source's encoding
+#     parameters and stream-copies the rest; sources that cannot
+#     be matched (not H.264/AAC) are re-encoded entirely.
+#   - Clips are cached in TEMP_DIR by (video hash, start, end)
+#     and the directory is kept under TEMP_DIR_MAX_BYTES.
+# ------------------------------------------------------------
+class RangeExtractorService:
+    def __init__(self):
+        self.__temp_dir = str(config("TEMP_DIR"))
+        self.__max_bytes = int(config("TEMP_DIR_MAX_BYTES", default=2 * 1024 ** 3))
+        self.__max_age = int(config("TEMP_DIR_MAX_AGE", default=7 * 24 * 3600))
+        self.__ffmpeg = FFmpegService()
+        self.__logger = setup_logger(__name__)
+        os.makedirs(self.__temp_dir, exist_ok=True)
+
+    # ------------------------------------------------------------
+    # Method: extract
+    # Description:
+    #   Returns the path of a clip covering [start, end] seconds,
+    #   reusing a cached clip when one exists.
+    # ------------------------------------------------------------
+    def extract(self, video_path: str, start: float, end: float,
+                exact: bool = False, video_hash: str = "") -> str:
+        if end <= start:
+            raise ValueError("End time must be greater than start time")
+
+        video_hash = video_hash or file_sha256(video_path)
+        mode = "exact" if exact else "fast"
+        name = f"{video_hash[:32]}_{int(start * 1000)}_{int(end * 1000)}_{mode}.mp4"
+        target = os.path.join(self.__temp_dir, name)
+        if os.path.exists(target):
+            os.utime(target)
+            return target
+
+        partial = f"{target}.{threading.get_ident()}.part.mp4"
+        try:
+            if exact:
+                self._exact_cut(video_path, start, end, partial)
+            else:
+                self._copy_cut(video_path, start, end, partial)
+            os.replace(partial, target)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        self.clean_temp_dir()
+        return target
+
+    # ------------------------------------------------------------
+    # Method: keyframes
+    # Description:
+    #   Returns keyframe timestamps of the first video stream in
+    #   [start, end], read from packet flags (no decoding).
+    # ------------------------------------------------------------
+    def keyframes(self, video_path: str, start: float, end: float) -> list:
+        info = self.__ffmpeg.probe(
+            video_path, "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-read_intervals", f"{start}%{end}"
+        )
+        return sorted(
+            float(p["pts_time"]) for p in info.get("packets", [])
+            if "K" in p.get("flags", "") and p.get("pts_time") not in (None, "N/A")
+        )
+
+    # ------------------------------------------------------------
+    # Method: clean_temp_dir
+    # Description:
+    #   Janitor for TEMP_DIR: drops clips older than
+    #   TEMP_DIR_MAX_AGE, then least recently used clips until
+    #   the directory fits in TEMP_DIR_MAX_BYTES.
+    # ------------------------------------------------------------
+    def clean_temp_dir(self):
+        with _JANITOR_LOCK:
+            now = time.time()
+            files = []
+            for entry in os.scandir(self.__temp_dir):
+                if not entry.is_file() or ".part." in entry.name:
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.__max_age:
+                    self._remove(entry.path)
+                else:
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.__max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def _copy_cut(self, video_path: str, start: float, end: float, output: str):
+        self.__ffmpeg.run([
+            "-y", "-ss", f"{start:.3f}", "-i", video_path, "-t", f"{end - start:.3f}",
+            "-map", "0", "-c", "copy", "-avoid_negative_ts", "make_zero",
+            "-movflags", "+faststart", output
+        ])
+
+    def _encode_cut(self, video_path: str, start: float, end: float, output: str):
+        self.__ffmpeg.run([
+            "-y", "-ss", f"{start:.3f}", "-i", video_path, "-t", f"{end - start:.3f}",
+            "-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac",
+            "-avoid_negative_ts", "make_zero", output
+        ])
+
+    # ------------------------------------------------------------
+    # Method: _exact_cut
+    # Description:
+    #   Re-encodes [start, first keyframe) with the codec
+    #   parameters and stream layout of the source and
+    #   concatenates it with a stream copy of [keyframe, end].
+    #   Falls back to encoding the whole range when keyframes
+    #   cannot be read or the source cannot be matched.
+    # ------------------------------------------------------------
+    def _exact_cut(self, video_path: str, start: float, end: float, output: str):
+        try:
+            keyframe = next((k for k in self.keyframes(video_path, start, end) if k >= start), None)
+            head_args = self._head_args(video_path)
+        except RuntimeError as e:
+            self.__logger.warning(f"Keyframe lookup failed, re-encoding range: {e}")
+            self._encode_cut(video_path, start, end, output)
+            return
+
+        if keyframe is None or keyframe >= end:
+            self._encode_cut(video_path, start, end, output)
+            return
+        if keyframe - start < 0.001:
+            self._copy_cut(video_path, keyframe, end, output)
+            return
+        if head_args is None:
+            self.__logger.info(f"Source encoding of {video_path} cannot be matched, re-encoding range")
+            self._encode_cut(video_path, start, end, output)
+            return
+
+        head = f"{output}.head.mp4"
+        tail = f"{output}.tail.mp4"
+        listing = f"{output}.txt"
+        try:
+            self.__ffmpeg.run([
+                "-y", "-ss", f"{start:.3f}", "-i", video_path, "-t", f"{keyframe - start:.3f}",
+                "-map", "0", *head_args, "-avoid_negative_ts", "make_zero", head
+            ])
+            self._copy_cut(video_path, keyframe, end, tail)
+            with open(listing, "w") as f:
+                f.write(f"file '{os.path.abspath(head)}'\nfile '{os.path.abspath(tail)}'\n")
+            self.__ffmpeg.run([
+                "-y", "-f", "concat", "-safe", "0", "-i", listing,
+                "-map", "0", "-c", "copy", "-movflags", "+faststart", output
+            ])
+        finally:
+            for path in (head, tail, listing):
+                self._remove(path)
+
+    # ------------------------------------------------------------
+    # Method: _head_args
+    # Description:
+    #   Encoder arguments that reproduce the source's streams for
+    #   the re-encoded head: H.264 profile, level, pixel format,
+    #   size, sample aspect ratio and track timescale, and AAC
+    #   sample rate and channels per audio stream, so the head and
+    #   the stream-copied tail concatenate into one valid stream.
+    #   Returns None when the source is not exactly one H.264
+    #   video stream plus AAC audio, or a parameter is unknown.
+    # ------------------------------------------------------------
+    def _head_args(self, video_path: str) -> Optional[list]:
+        streams = self.__ffmpeg.probe(
+            video_path, "-show_entries",
+            "stream=codec_type,codec_name,profile,level,pix_fmt,width,height,"
+            "sample_aspect_ratio,time_base,sample_rate,channels"
+        ).get("streams", [])
+        video = [s for s in streams if s.get("codec_type") == "video"]
+        audio = [s for s in streams if s.get("codec_type") == "audio"]
+        if len(video) != 1 or len(video) + len(audio) != len(streams):
+            return None
+        video = video[0]
+        profile = _X264_PROFILES.get(str(video.get("profile", "")).lower())
+        if video.get("codec_name") != "h264" or profile is None or not video.get("pix_fmt") \
+                or not video.get("width") or not video.get("height"):
+            return None
+        if any(a.get("codec_name") != "aac" or not a.get("sample_rate") or not a.get("channels") for a in audio):
+            return None
+
+        sar = str(video.get("sample_aspect_ratio") or "1:1")
+        if sar in ("N/A", "0:1"):
+            sar = "1:1"
+        args = [
+            "-c:v", "libx264", "-preset", "veryfast", "-profile:v", profile,
+            "-pix_fmt", video["pix_fmt"],
+            "-vf", f"scale={video['width']}:{video['height']},setsar={sar.replace(':', '/')}",
+        ]
+        if int(video.get("level") or 0) > 0:
+            args += ["-level:v", f"{int(video['level']) / 10:g}"]
+        timescale = str(video.get("time_base", "")).partition("/")[2]
+        if timescale.isdigit():
+            args += ["-video_track_timescale", timescale]
+        for index, stream in enumerate(audio):
+            args += [f"-c:a:{index}", "aac", f"-ar:a:{index}", str(stream["sample_rate"]),
+                     f"-ac:a:{index}", str(stream["channels"])]
+        return args
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.__logger.warning(f"Error removing {path}: {e}")
@@ -0,0 +1,134 @@
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Class: ResourceRegistry
+# Description:
+#   Process-wide registry of expensive, shareable resources
+#   (chat / embedding models, Chroma handle, compiled graph).
+#   - Lazily creates each resource once, on first use.
+#   - Thread-safe: concurrent Streamlit sessions never build
+#     the same resource twice.
+#   - Supports optional health checks and explicit close/reset
+#     so a broken resource can be rebuilt on next use; callers
+#     wrap work on shared resources in repair_on_error so the
+#     checks run whenever such work fails.
+# ------------------------------------------------------------
+class ResourceRegistry:
+    def __init__(self):
+        self.__resources: dict = {}
+        self.__hooks: dict = {}
+        self.__locks: dict = {}
+        self.__lock = threading.Lock()
+        self.__logger = setup_logger(__name__)
+
+    # ------------------------------------------------------------
+    # Method: get
+    # Description:
+    #   Returns the resource registered under `name`, creating it
+    #   with `factory` if needed. `health_check` and `close` are
+    #   optional callables receiving the resource.
+    # ------------------------------------------------------------
+    def get(self, name: str, factory, health_check=None, close=None):
+        entry = self.__resources.get(name)
+        if entry is not None:
+            return entry["resource"]
+
+        with self._name_lock(name):
+            entry = self.__resources.get(name)
+            if entry is None:
+                started = time.perf_counter()
+                resource = factory()
+                entry = {"resource": resource, "created_at": time.time()}
+                self.__hooks[name] = {"health_check": health_check, "close": close}
+                self.__resources[name] = entry
+                self.__logger.info(
+                    f"Created resource {name} in {time.perf_counter() - started:.3f}s"
+                )
+        return entry["resource"]
+
+    # ------------------------------------------------------------
+    # Method: health
+    # Description:
+    #   Runs the registered health checks and returns a status
+    #   per resource. With repair=True, failing resources are
+    #   closed and dropped so they are rebuilt on next use.
+    # ------------------------------------------------------------
+    def health(self, repair: bool = False) -> dict:
+        report = {}
+        for name, entry in list(self.__resources.items()):
+            check = self.__hooks.get(name, {}).get("health_check")
+            status = {"ok": True, "created_at": entry["created_at"]}
+            if check is not None:
+                try:
+                    check(entry["resource"])
+                except Exception as e:
+                    status = {"ok": False, "created_at": entry["created_at"], "error": str(e)}
+                    if repair:
+                        self.__logger.warning(f"Resource {name} is unhealthy, rebuilding on next use: {e}")
+                        self.reset(name)
+            report[name] = status
+        return report
+
+    # ------------------------------------------------------------
+    # Method: repair_on_error
+    # Description:
+    #   Context manager for work that uses shared resources. When
+    #   the work raises, the health checks run with repair=True
+    #   (so a broken resource is rebuilt on next use) and the
+    #   error propagates.
+    # ------------------------------------------------------------
+    @contextmanager
+    def repair_on_error(self):
+        try:
+            yield
+        except Exception:
+            try:
+                self.health(repair=True)
+            except Exception as e:
+                self.__logger.error(f"Resource health check failed: {e}")
+            raise
+
+    # ------------------------------------------------------------
+    # Method: reset
+    # Description:
+    #   Closes and forgets one resource (or all when name is None).
+    # ------------------------------------------------------------
+    def reset(self, name=None):
+        names = [name] if name else list(self.__resources)
+        for key in names:
+            with self._name_lock(key):
+                entry = self.__resources.pop(key, None)
+                hooks = self.__hooks.pop(key, {})
+            if entry and hooks.get("close"):
+                try:
+                    hooks["close"](entry["resource"])
+                except Exception as e:
+                    self.__logger.warning(f"Error closing resource {key}: {e}")
+
+    # ------------------------------------------------------------
+    # Method: close
+    # Description:
+    #   Releases every resource; registered to run at exit.
+    # ------------------------------------------------------------
+    def close(self):
+        self.reset()
+
+    def names(self) -> list:
+        return list(self.__resources)
+
+    def _name_lock(self, name: str):
+        with self.__lock:
+            return self.__locks.setdefault(name, threading.RLock())
+
+
+# ------------------------------------------------------------
+# Global: RESOURCES
+# Description:
+#   Single registry shared by all sessions of this process.
+# ------------------------------------------------------------
+RESOURCES = ResourceRegistry()
+atexit.register(RESOURCES.close)
@@ -0,0 +1,255 @@
+import os
+import json
+import math
+import time
+import sqlite3
+from typing import Optional
+import numpy as np
+from decouple import config
+from services.ffmpeg import FFmpegService
+from logger_app import setup_logger
+
+# Low-resolution frame size used for differencing
+_WIDTH, _HEIGHT = 64, 36
+_BINS = 16
+
+
+# ------------------------------------------------------------
+# Class: SceneDetectorService
+# Description:
+#   Scene-aware segmentation of a video for the map step of
+#   summarization and for the timeline index:
+#     - frames are decoded once at SCENE_FPS as 64x36 grayscale
+#       and compared in vectorized NumPy batches: mean absolute
+#       pixel difference and 16-bin histogram distance between
+#       consecutive frames;
+#     - a cut is placed where the combined score exceeds
+#       SCENE_THRESHOLD, at least SCENE_MIN_LENGTH seconds after
+#       the previous cut (flashes and fast motion stay inside a
+#       scene);
+#     - cuts are stored per video (content hash) in a local
+#       SQLite file, so summaries, re-indexing and range answers
+#       of the same video never decode it again;
+#     - windows() merges consecutive scenes into windows of up
+#       to the window size (stretched by SCENE_MAX_STRETCH rather
+#       than splitting a scene, and bounded by SCENE_TOKEN_BUDGET
+#       when set), and splits longer scenes evenly.
+# ------------------------------------------------------------
+class SceneDetectorService:
+    def __init__(self):
+        self.__enabled = str(config("SCENE_DETECTION_ENABLED", default="true")).lower() == "true"
+        self.__path = str(config("SCENE_CACHE_PATH", default="./database/cache/scenes.sqlite3"))
+        self.__fps = float(config("SCENE_FPS", default=4))
+        self.__max_frames = int(config("SCENE_MAX_FRAMES", default=20000))
+        self.__threshold = float(config("SCENE_THRESHOLD", default=0.3))
+        self.__min_length = float(config("SCENE_MIN_LENGTH", default=2))
+        self.__max_stretch = float(config("SCENE_MAX_STRETCH", default=1.5))
+        self.__token_budget = int(config("SCENE_TOKEN_BUDGET", default=0))
+        self.__tokens_per_second = float(config("SCENE_TOKENS_PER_SECOND", default=300))
+        self.__batch = int(config("SCENE_BATCH_FRAMES", default=2048))
+        self.__ffmpeg = FFmpegService()
+        self.__logger = setup_logger(__name__)
+        self._init_db()
+
+    # ------------------------------------------------------------
+    # Method: _connect
+    # Description:
+    #   Opens a short-lived SQLite connection to the scene store.
+    # ------------------------------------------------------------
+    def _connect(self):
+        return sqlite3.connect(self.__path, timeout=30)
+
+    # ------------------------------------------------------------
+    # Method: _init_db
+    # Description:
+    #   Creates the store directory and table if missing.
+    # ------------------------------------------------------------
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS scenes ("
+                " video_hash TEXT NOT NULL,"
+                " settings TEXT NOT NULL,"
+                " cuts TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (video_hash, settings))"
+            )
+
+    # ------------------------------------------------------------
+    # Method: windows
+    # Description:
+    #   Returns (start, end) windows covering [0, duration] whose
+    #   boundaries follow the scene cuts of the video. Returns
+    #   None when detection is disabled or fails, so the caller
+    #   can fall back to fixed windows.
+    # ------------------------------------------------------------
+    def windows(self, path: str, video_hash: str, duration: float, size: float) -> Optional[list]:
+        if not self.__enabled or not duration:
+            return None
+        cuts = self.cuts(path, video_hash, duration)
+        if cuts is None:
+            return None
+        if self.__token_budget:
+            size = min(size, self.__token_budget / self.__tokens_per_second)
+        return self.plan(cuts, duration, size, size * self.__max_stretch)
+
+    # ------------------------------------------------------------
+    # Method: cuts
+    # Description:
+    #   Returns the stored scene cut times of a video, detecting
+    #   and storing them first if needed. None on failure.
+    # ------------------------------------------------------------
+    def cuts(self, path: str, video_hash: str, duration: Optional[float]) -> Optional[list]:
+        stored = self.stored_cuts(video_hash)
+        if stored is not None:
+            return stored
+        try:
+            started = time.perf_counter()
+            cuts = self.detect(path, duration)
+        except Exception as e:
+            self.__logger.error(f"Scene detection failed for {path}: {e}")
+            return None
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO scenes (video_hash, settings, cuts, created_at) VALUES (?, ?, ?, ?)",
+                (video_hash, self._settings(), json.dumps(cuts), time.time())
+            )
+        self.__logger.info(
+            f"Detected {len(cuts) + 1} scenes in {os.path.basename(path)} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return cuts
+
+    # ------------------------------------------------------------
+    # Method: stored_cuts
+    # Description:
+    #   Returns the stored cut times of a video or None, without
+    #   decoding it.
+    # ------------------------------------------------------------
+    def stored_cuts(self, video_hash: Optional[str]) -> Optional[list]:
+        if not self.__enabled or not video_hash:
+            return None
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT cuts FROM scenes WHERE video_hash = ? AND settings = ?",
+                (video_hash, self._settings())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # ------------------------------------------------------------
+    # Method: detect
+    # Description:
+    #   Decodes the video once at low resolution and returns the
+    #   scene cut times in seconds (excluding 0 and the end).
+    # ------------------------------------------------------------
+    def detect(self, path: str, duration: Optional[float]) -> list:
+        fps = self.__fps
+        if duration:
+            fps = min(fps, self.__max_frames / duration)
+        raw = self.__ffmpeg.run([
+            "-i", path, "-an", "-sn",
+            "-vf", f"fps={fps:.4f},scale={_WIDTH}:{_HEIGHT}:flags=area,format=gray",
+            "-f", "rawvideo", "-"
+        ])
+        size = _WIDTH * _HEIGHT
+        frames = np.frombuffer(raw, dtype=np.uint8)
+        frames = frames[: len(frames) // size * size].reshape(-1, _HEIGHT, _WIDTH)
+        scores = self.scores(frames)
+
+        cuts = []
+        last = 0.0
+        for index in np.flatnonzero(scores > self.__threshold):
+            at = float(index + 1) / fps
+            if at - last >= self.__min_length and (not duration or duration - at >= self.__min_length):
+                cuts.append(round(at, 3))
+                last = at
+        return cuts
+
+    # ------------------------------------------------------------
+    # Method: scores
+    # Description:
+    #   Change score in [0, 1] between each pair of consecutive
+    #   frames: the mean of the normalized absolute pixel
+    #   difference and the histogram distance. Computed in
+    #   batches of SCENE_BATCH_FRAMES to bound memory.
+    # ------------------------------------------------------------
+    def scores(self, frames: np.ndarray) -> np.ndarray:
+        if len(frames) < 2:
+            return np.zeros(0, dtype=np.float32)
+        pixels = frames.shape[1] * frames.shape[2]
+        result = np.empty(len(frames) - 1, dtype=np.float32)
+        for start in range(0, len(frames) - 1, self.__batch):
+            # One frame of overlap so every consecutive pair is scored once
+            batch = frames[start:start + self.__batch + 1]
+            count = len(batch)
+
+            difference = np.abs(np.diff(batch.astype(np.int16), axis=0)).mean(axis=(1, 2)) / 255
+
+            bins = (batch >> (8 - int(math.log2(_BINS)))).reshape(count, -1).astype(np.int64)
+            bins += np.arange(count)[:, None] * _BINS
+            histograms = np.bincount(bins.ravel(), minlength=count * _BINS).reshape(count, _BINS) / pixels
+            distance = np.abs(np.diff(histograms, axis=0)).sum(axis=1) / 2
+
+            result[start:start + count - 1] = (difference + distance) / 2
+        return result
+
+    # ------------------------------------------------------------
+    # Method: plan
+    # Description:
+    #   Merges consecutive scenes into windows: a scene joins the
+    #   current window while the window stays within `max_size`;
+    #   scenes longer than that are split evenly into pieces of at
+    #   most `size`. A very short tail is folded into the
+    #   previous window.
+    # ------------------------------------------------------------
+    @staticmethod
+    def plan(cuts: list, duration: float, size: float, max_size: float) -> list:
+        bounds = [0.0, *[c for c in cuts if 0 < c < duration], duration]
+        windows = []
+        start = end = 0.0
+        for scene_start, scene_end in zip(bounds, bounds[1:]):
+            if scene_end - scene_start > max_size:
+                if end > start:
+                    windows.append((start, end))
+                pieces = math.ceil((scene_end - scene_start) / size)
+                step = (scene_end - scene_start) / pieces
+                windows.extend(
+                    (round(scene_start + i * step, 3), round(scene_start + (i + 1) * step, 3))
+                    for i in range(pieces)
+                )
+                start = end = scene_end
+                continue
+            if scene_end - start > max_size and end > start:
+                windows.append((start, end))
+                start = end
+            end = scene_end
+        if end > start:
+            if windows and end - start < size * 0.25 and end - windows[-1][0] <= max_size:
+                windows[-1] = (windows[-1][0], end)
+            else:
+                windows.append((start, end))
+        return windows or [(0.0, duration)]
+
+    # ------------------------------------------------------------
+    # Method: snap
+    # Description:
+    #   Moves a range edge onto a stored scene cut when one lies
+    #   within `tolerance` seconds, so a clip does not start or
+    #   end with a sliver of the neighbouring scene.
+    # ------------------------------------------------------------
+    def snap(self, video_hash: Optional[str], start: float, end: float, tolerance: float = 1.0) -> tuple:
+        cuts = self.stored_cuts(video_hash) or []
+
+        def nearest(value: float) -> float:
+            close = [c for c in cuts if abs(c - value) <= tolerance]
+            return min(close, key=lambda c: abs(c - value)) if close else value
+
+        snapped_start, snapped_end = nearest(start), nearest(end)
+        if snapped_end - snapped_start < 1.0:
+            return start, end
+        return snapped_start, snapped_end
+
+    def _settings(self) -> str:
+        return f"fps{self.__fps:g}_t{self.__threshold:g}_min{self.__min_length:g}"
@@ -0,0 +1,169 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Optional
+from decouple import config
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Global: _STATS
+# Description:
+#   Process-wide hit/miss counters shared by every
+#   SummaryCacheService instance.
+# ------------------------------------------------------------
+_STATS = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_STATS_LOCK = threading.Lock()
+
+
+# ------------------------------------------------------------
+# Class: SummaryCacheService
+# Description:
+#   Persistent, content-addressed cache for generated summaries.
+#   Entries are keyed by (SHA-256 of the video file, normalized
+#   prompt, model name) and stored in a local SQLite file.
+#   Supports TTL expiry and LRU eviction beyond a maximum
+#   number of entries, and exposes hit/miss counters.
+# ------------------------------------------------------------
+class SummaryCacheService:
+    def __init__(self):
+        self.__path = str(config("SUMMARY_CACHE_PATH", default="./database/cache/summary_cache.sqlite3"))
+        self.__ttl = int(config("SUMMARY_CACHE_TTL", default=30 * 24 * 3600))
+        self.__max_entries = int(config("SUMMARY_CACHE_MAX_ENTRIES", default=1000))
+        self.__logger = setup_logger(__name__)
+        self._init_db()
+
+    # ------------------------------------------------------------
+    # Method: _connect
+    # Description:
+    #   Opens a short-lived SQLite connection to the cache file.
+    # ------------------------------------------------------------
+    def _connect(self):
+        return sqlite3.connect(self.__path, timeout=30)
+
+    # ------------------------------------------------------------
+    # Method: _init_db
+    # Description:
+    #   Creates the cache directory and table if missing.
+    # ------------------------------------------------------------
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " cache_key TEXT PRIMARY KEY,"
+                " video_hash TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " summary TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_summaries_access ON summaries (last_access)")
+
+    # ------------------------------------------------------------
+    # Method: normalize_prompt
+    # Description:
+    #   Collapses whitespace and case so trivially different
+    #   prompts share the same cache entry.
+    # ------------------------------------------------------------
+    @staticmethod
+    def normalize_prompt(prompt: Optional[str]) -> str:
+        return re.sub(r"\s+", " ", prompt or "").strip().casefold()
+
+    # ------------------------------------------------------------
+    # Method: make_key
+    # Description:
+    #   Builds the cache key from video hash, prompt and model.
+    # ------------------------------------------------------------
+    def make_key(self, video_hash: str, prompt: Optional[str], model: str) -> str:
+        raw = "\x1f".join([video_hash, self.normalize_prompt(prompt), model])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------
+    # Method: get
+    # Description:
+    #   Returns the cached summary or None. Expired entries are
+    #   treated as misses and removed.
+    # ------------------------------------------------------------
+    def get(self, video_hash: str, prompt: Optional[str], model: str) -> Optional[str]:
+        key = self.make_key(video_hash, prompt, model)
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT summary, created_at FROM summaries WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.__ttl:
+                db.execute("UPDATE summaries SET last_access = ? WHERE cache_key = ?", (now, key))
+                self._count("hits")
+                return row[0]
+            if row:
+                db.execute("DELETE FROM summaries WHERE cache_key = ?", (key,))
+        self._count("misses")
+        return None
+
+    # ------------------------------------------------------------
+    # Method: put
+    # Description:
+    #   Stores a summary and evicts expired or least recently
+    #   used entries beyond SUMMARY_CACHE_MAX_ENTRIES.
+    # ------------------------------------------------------------
+    def put(self, video_hash: str, prompt: Optional[str], model: str, summary: str):
+        if not summary:
+            return
+        key = self.make_key(video_hash, prompt, model)
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO summaries"
+                " (cache_key, video_hash, model, summary, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, video_hash, model, summary, now, now)
+            )
+            self._count("writes")
+            self._evict(db, now)
+
+    # ------------------------------------------------------------
+    # Method: invalidate
+    # Description:
+    #   Removes every cached summary of a video.
+    # ------------------------------------------------------------
+    def invalidate(self, video_hash: str):
+        with self._connect() as db:
+            db.execute("DELETE FROM summaries WHERE video_hash = ?", (video_hash,))
+
+    # ------------------------------------------------------------
+    # Method: stats
+    # Description:
+    #   Returns hit/miss counters and current cache size.
+    # ------------------------------------------------------------
+    def stats(self) -> dict:
+        with _STATS_LOCK:
+            stats = dict(_STATS)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        with self._connect() as db:
+            stats["entries"], stats["bytes"] = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(summary)), 0) FROM summaries"
+            ).fetchone()
+        return stats
+
+    def _evict(self, db, now: float):
+        removed = db.execute(
+            "DELETE FROM summaries WHERE created_at < ?", (now - self.__ttl,)
+        ).rowcount
+        removed += db.execute(
+            "DELETE FROM summaries WHERE cache_key IN ("
+            " SELECT cache_key FROM summaries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.__max_entries,)
+        ).rowcount
+        if removed:
+            self._count("evictions", removed)
+            self.__logger.info(f"Evicted {removed} cached summaries")
+
+    @staticmethod
+    def _count(name: str, value: int = 1):
+        with _STATS_LOCK:
+            _STATS[name] += value
@@ -1,7 +1,27 @@
+import asyncio
 import streamlit as st
+from uuid import uuid4
+from typing import Optional
+from contextlib import nullcontext
+from decouple import config
+from langchain_core.messages import AIMessageChunk
 from services.lang_graph import LanggraphService
+from services.registry import RESOURCES
+from services.job_queue import JobQueueService
+from services.summary_cache import SummaryCacheService
+from services.call_governor import call_deadline
+from services.video_analysis import SummaryStreamFilter
 from logger_app import setup_logger
 
+# ------------------------------------------------------------
+# Global: STREAM_NODES
+# Description:
+#   Graph nodes whose model tokens are forwarded to the UI.
+#   Internal calls (segment map, history compaction) are
+#   tagged "nostream" and never reach the page.
+# ------------------------------------------------------------
+STREAM_NODES = {"summarize_video", "summarize_segments", "summarize_range", "ask_question"}
+
 # ------------------------------------------------------------
 # Class: UtilityService
 # Description:
@@ -19,19 +39,31 @@ class UtilityService:
     # ------------------------------------------------------------
     # Method: __init__
     # Description:
-    #   Initializes a configuration dictionary that stores
-    #   a unique thread_id for each Streamlit session.
+    #   Assigns a random id to the Streamlit session (once) so
+    #   conversation threads are scoped per (session, video).
+    #   The compiled graph is shared process-wide, so creating
+    #   this service on every rerun is cheap.
     #   Logging is configured for visibility and debugging.
     # ------------------------------------------------------------
     def __init__(self) -> None:
-        self.__langgraph_service = LanggraphService()
         self.__logger = setup_logger(__name__)
-        self.__graph = self.__langgraph_service.build_pipeline()
-        self.__config = {
-            "configurable": {
-                "thread_id": st.session_state.get("video_name", "1234")
-            }
-        }
+        self.__graph = RESOURCES.get(
+            "graph", lambda: LanggraphService().build_pipeline(),
+            health_check=LanggraphService.check_pipeline
+        )
+        if "session_id" not in st.session_state:
+            st.session_state["session_id"] = uuid4().hex
+        self.__session_id = st.session_state["session_id"]
+        self.__answer_deadline = float(config("QA_DEADLINE", default=60))
+
+    # ------------------------------------------------------------
+    # Method: _config
+    # Description:
+    #   Returns the graph config whose thread_id isolates one
+    #   session's conversation about one video.
+    # ------------------------------------------------------------
+    def _config(self, video_name: str) -> dict:
+        return {"configurable": {"thread_id": f"{self.__session_id}:{video_name}"}}
 
     # ------------------------------------------------------------
     # Method: generate_answer
@@ -39,27 +71,209 @@ class UtilityService:
     #   Answers user questions about the video content using
     #   previously generated summaries stored in the vector DB.
     #   The response is produced via the LangGraph workflow.
+    #   All model calls of one answer share a QA_DEADLINE budget.
     # ------------------------------------------------------------
     def generate_answer(self, path, video_name, question):
         input = {"video_path": path, "video_name": video_name,
-                 "question": question, "messages": []}
+                 "question": question, "messages": [],
+                 "start_time": None, "end_time": None}
         self.__logger.info(f"===generate_answer===:{input}")
-        state = self.__graph.invoke(input, self.__config)
+        with RESOURCES.repair_on_error(), call_deadline(self.__answer_deadline):
+            state = self.__graph.invoke(input, self._config(video_name))
         return state.get('answer', '')
 
+    # ------------------------------------------------------------
+    # Method: stream_answer
+    # Description:
+    #   Same as generate_answer, but yields the answer text as
+    #   the model produces it (for st.write_stream).
+    # ------------------------------------------------------------
+    def stream_answer(self, path, video_name, question):
+        input = {"video_path": path, "video_name": video_name,
+                 "question": question, "messages": [],
+                 "start_time": None, "end_time": None}
+        self.__logger.info(f"===stream_answer===:{input}")
+        yield from self._stream_text(input, video_name, "answer")
+
     # ------------------------------------------------------------
     # Method: generate_summary
     # Description:
     #   Generates a detailed video summary using LangGraph's
     #   workflow execution. If available, returns the model-
     #   generated summary text from the state dictionary.
+    #   With segmented=True the video is summarized in parallel
+    #   time windows (long videos are segmented automatically).
+    # ------------------------------------------------------------
+    def generate_summary(self, path, video_name: str, is_new_video: bool, prompt='', segmented: bool = False):
+        inputs = {"video_path": path, "video_name": video_name,
+                  "is_new_video": is_new_video, "prompt": prompt,
+                  "segmented": segmented, "question": "",
+                  "start_time": None, "end_time": None}
+        with RESOURCES.repair_on_error():
+            state = self.__graph.invoke(inputs, self._config(video_name))  # type:ignore
+        return state.get('summary', '')
+
+    # ------------------------------------------------------------
+    # Method: stream_summary
+    # Description:
+    #   Same as generate_summary, but yields the summary text as
+    #   the model produces it (for st.write_stream). The graph
+    #   still runs to completion, so the summary is cached and
+    #   indexed once the stream ends.
+    # ------------------------------------------------------------
+    def stream_summary(self, path, video_name: str, is_new_video: bool, prompt='', segmented: bool = False):
+        inputs = {"video_path": path, "video_name": video_name,
+                  "is_new_video": is_new_video, "prompt": prompt,
+                  "segmented": segmented, "question": "",
+                  "start_time": None, "end_time": None}
+        yield from self._stream_text(inputs, video_name, "summary")
+
+    # ------------------------------------------------------------
+    # Method: _stream_text
+    # Description:
+    #   Runs the graph with stream_mode "messages" + "values" and
+    #   yields token chunks of STREAM_NODES. When nothing was
+    #   streamed (summary / answer cache hit, stored timeline),
+    #   the final state value is yielded in one piece. Summary
+    #   streams stop at the metadata block; answers are bounded
+    #   by QA_DEADLINE.
+    # ------------------------------------------------------------
+    def _stream_text(self, inputs: dict, video_name: str, key: str):
+        streamed = False
+        state = {}
+        stream_filter = SummaryStreamFilter() if key == "summary" else None
+        # Answers share the QA_DEADLINE budget, as in generate_answer
+        deadline = call_deadline(self.__answer_deadline) if key == "answer" else nullcontext()
+        with RESOURCES.repair_on_error(), deadline:
+            for mode, chunk in self.__graph.stream(
+                inputs, self._config(video_name), stream_mode=["messages", "values"]
+            ):
+                if mode == "values":
+                    state = chunk
+                    continue
+                message, metadata = chunk
+                if (isinstance(message, AIMessageChunk) and message.text
+                        and metadata.get("langgraph_node") in STREAM_NODES):
+                    streamed = True
+                    text = stream_filter.feed(message.text) if stream_filter else message.text
+                    if text:
+                        yield text
+        if stream_filter and streamed:
+            tail = stream_filter.flush()
+            if tail:
+                yield tail
+        if not streamed and state.get(key):
+            yield state[key]
+
+    # ------------------------------------------------------------
+    # Method: agenerate_summary / agenerate_answer
+    # Description:
+    #   Async counterparts of generate_summary / generate_answer,
+    #   driven by graph.ainvoke so many requests can share one
+    #   process and event loop.
     # ------------------------------------------------------------
-    def generate_summary(self, path, video_name: str, is_new_video: bool, prompt=''):
+    async def agenerate_summary(self, path, video_name: str, is_new_video: bool, prompt='',
+                                segmented: bool = False, graph_config: dict = None):
         inputs = {"video_path": path, "video_name": video_name,
-                  "is_new_video": is_new_video, "prompt": prompt}
-        state = self.__graph.invoke(inputs, self.__config)  # type:ignore
+                  "is_new_video": is_new_video, "prompt": prompt,
+                  "segmented": segmented, "question": "",
+                  "start_time": None, "end_time": None}
+        with RESOURCES.repair_on_error():
+            state = await self.__graph.ainvoke(inputs, graph_config or self._config(video_name))  # type:ignore
         return state.get('summary', '')
 
+    async def agenerate_answer(self, path, video_name, question):
+        input = {"video_path": path, "video_name": video_name,
+                 "question": question, "messages": [],
+                 "start_time": None, "end_time": None}
+        with RESOURCES.repair_on_error(), call_deadline(self.__answer_deadline):
+            state = await self.__graph.ainvoke(input, self._config(video_name))
+        return state.get('answer', '')
+
+    # ------------------------------------------------------------
+    # Method: asummarize_batch
+    # Description:
+    #   Summarizes a batch of videos (or one video with several
+    #   prompts) concurrently. Each item is a dict with "path",
+    #   "video_name" and optional "prompt", "is_new_video" and
+    #   "segmented". At most LLM_MAX_CONCURRENCY items run at once;
+    #   requests are further paced by the provider rate limiter.
+    #   Every item runs on its own thread id, and failures are
+    #   returned per item instead of cancelling the batch.
+    # ------------------------------------------------------------
+    async def asummarize_batch(self, items: list[dict], max_concurrency: int = None) -> list[dict]:
+        semaphore = asyncio.Semaphore(
+            max_concurrency or int(config("LLM_MAX_CONCURRENCY", default=4))
+        )
+
+        async def run(item: dict) -> dict:
+            async with semaphore:
+                try:
+                    summary = await self.agenerate_summary(
+                        item["path"], item["video_name"], item.get("is_new_video", False),
+                        item.get("prompt", ""), item.get("segmented", False),
+                        {"configurable": {"thread_id": f"batch:{uuid4().hex}"}}
+                    )
+                    return {"video_name": item["video_name"], "summary": summary, "error": None}
+                except Exception as e:
+                    self.__logger.error(f"Batch summary failed for {item['video_name']}: {e}")
+                    return {"video_name": item["video_name"], "summary": None, "error": str(e)}
+
+        return await asyncio.gather(*(run(item) for item in items))
+
+    # ------------------------------------------------------------
+    # Method: summarize_batch
+    # Description:
+    #   Blocking entry point of asummarize_batch for sync callers.
+    # ------------------------------------------------------------
+    def summarize_batch(self, items: list[dict], max_concurrency: int = None) -> list[dict]:
+        return asyncio.run(self.asummarize_batch(items, max_concurrency))
+
+    # ------------------------------------------------------------
+    # Method: generate_range_summary
+    # Description:
+    #   Summarizes a (start, end) range of a video. Indexed videos
+    #   are answered from the stored timeline; otherwise a clip is
+    #   cut (exact_cut for frame-accurate start) and summarized.
+    # ------------------------------------------------------------
+    def generate_range_summary(self, path, video_name: str, start_time: float,
+                               end_time: float, prompt='', exact_cut: bool = False):
+        inputs = {"video_path": path, "video_name": video_name,
+                  "is_new_video": False, "prompt": prompt,
+                  "segmented": False, "question": "",
+                  "start_time": start_time, "end_time": end_time,
+                  "exact_cut": exact_cut}
+        with RESOURCES.repair_on_error():
+            state = self.__graph.invoke(inputs, self._config(video_name))  # type:ignore
+        return state.get('summary', '')
+
+    # ------------------------------------------------------------
+    # Method: enqueue_summary
+    # Description:
+    #   Queues the summary pipeline for a background worker and
+    #   returns the job id. The worker also builds the list
+    #   previews, which need the content hash and duration. The
+    #   idempotency key (content hash, name, prompt) makes
+    #   repeated submissions reuse one job.
+    # ------------------------------------------------------------
+    def enqueue_summary(self, path, video_name: str, content_hash: str,
+                        is_new_video: bool, prompt='', duration: Optional[float] = None) -> int:
+        key = "summarize:" + ":".join([
+            content_hash, video_name, SummaryCacheService.normalize_prompt(prompt)
+        ])
+        payload = {"video_path": path, "video_name": video_name,
+                   "is_new_video": is_new_video, "prompt": prompt,
+                   "content_hash": content_hash, "duration": duration}
+        return JobQueueService().enqueue("summarize_video", payload, key)
+
+    # ------------------------------------------------------------
+    # Method: job_status
+    # Description:
+    #   Returns the current state of a background job.
+    # ------------------------------------------------------------
+    def job_status(self, job_id: int):
+        return JobQueueService().get(job_id)
+
     # ------------------------------------------------------------
     # Method: custom_prompt
     # Description:
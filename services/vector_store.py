@@ -2,6 +2,8 @@ from decouple import config
 import os
 from langchain_chroma import Chroma
 from services.llm import LLMService
+from services.registry import RESOURCES
+from services.embedding_cache import EmbeddingCacheService
 # ------------------------------------------------------------
 # Class: VectorStoreService
 # Description:
@@ -16,30 +18,100 @@ class VectorStoreService:
     # ------------------------------------------------------------
     # Method: __init__
     # Description:
-    #   Initializes the vector database directory (if missing)
-    #   and set up the embedding instances via LLMService.
-    #   also setup the logger for traking and debug data
+    #   Keeps a handle on LLMService; the embedding model and the
+    #   Chroma client are shared process-wide via RESOURCES.
     # ------------------------------------------------------------
     def __init__(self):
-        self.__embedding = LLMService().get_embedding_model()
+        self.__llm_service = LLMService()
+        self.__embedding_cache = EmbeddingCacheService()
     # ------------------------------------------------------------
     # Method: vector_db
     # Description:
     #   Returns a Chroma vector store instance configured with:
     #     - Persistent directory from env (VECTOR_DB_DIR)
-    #     - Embedding model for text encoding
+    #     - Cache-backed embedding model for text encoding
     #     - "video_summaries" as the collection name
     #   This provides a persistent storage layer for semantic
     #   search and similarity-based retrieval operations.
+    #   The client is created once per process and reused.
     # ------------------------------------------------------------
 
     def vector_db(self):
+        return RESOURCES.get(
+            "vector_db:video_summaries",
+            self._build_vector_db,
+            health_check=self.health_check
+        )
+
+    def _build_vector_db(self):
         return Chroma(
             collection_name="video_summaries",
-            embedding_function=self.__embedding,
+            embedding_function=self.__embedding_cache.embeddings(),
             persist_directory="./database/vector_db/chroma_db",
         )
 
+    # ------------------------------------------------------------
+    # Method: health_check
+    # Description:
+    #   Cheap round trip to the collection through the public
+    #   Chroma API; used by RESOURCES to detect a dead client.
+    # ------------------------------------------------------------
+    @staticmethod
+    def health_check(db: Chroma):
+        db.get(limit=1, include=[])
+
+    # ------------------------------------------------------------
+    # Method: upsert_vectors
+    # Description:
+    #   Writes entries whose embeddings were computed by the
+    #   caller (e.g. the answer cache reuses the query vector).
+    #   LangChain's Chroma has no public call for this, so it is
+    #   the one place that reaches the underlying collection.
+    # ------------------------------------------------------------
+    @staticmethod
+    def upsert_vectors(db: Chroma, ids: list, embeddings: list, documents: list, metadatas: list):
+        db._collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    # ------------------------------------------------------------
+    # Method: upsert_documents
+    # Description:
+    #   Idempotent, batched indexing with caller-provided ids:
+    #     - ids already present in the collection are skipped;
+    #     - remaining texts are added with add_texts, embedded
+    #       through the persistent embedding cache
+    #       (EMBEDDING_BATCH_SIZE texts per model call).
+    #   Returns the number of documents written.
+    # ------------------------------------------------------------
+    def upsert_documents(self, documents: list, ids: list) -> int:
+        vector_store = self.vector_db()
+        existing = set(vector_store.get(ids=ids, include=[])["ids"]) if ids else set()
+        pending = [(i, d) for i, d in zip(ids, documents) if i not in existing]
+
+        batch_size = self.__embedding_cache.batch_size
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            vector_store.add_texts(
+                [d.page_content for _, d in batch],
+                metadatas=[d.metadata for _, d in batch],
+                ids=[i for i, _ in batch]
+            )
+        return len(pending)
+
+    # ------------------------------------------------------------
+    # Method: delete_stale
+    # Description:
+    #   Deletes documents matching `where` whose id is not in
+    #   `keep_ids`, e.g. chunks of a previous summary version.
+    #   Returns the number of documents removed.
+    # ------------------------------------------------------------
+    def delete_stale(self, where: dict, keep_ids: list) -> int:
+        vector_store = self.vector_db()
+        keep = set(keep_ids)
+        stale = [i for i in vector_store.get(where=where, include=[])["ids"] if i not in keep]
+        if stale:
+            vector_store.delete(ids=stale)
+        return len(stale)
+
     # ------------------------------------------------------------
     # Method: _delete_documents
     # Description:
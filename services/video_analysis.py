@@ -0,0 +1,138 @@
+import re
+import json
+from typing import Optional
+
+# ------------------------------------------------------------
+# Global: ANALYSIS_DELIMITER
+# Description:
+#   Line that separates the human-readable summary from the
+#   JSON metadata block in a structured summary response.
+# ------------------------------------------------------------
+ANALYSIS_DELIMITER = "<<<VIDEO_METADATA>>>"
+
+# ------------------------------------------------------------
+# Global: SUITABILITY_LEVELS
+# Description:
+#   Allowed values of the 'suitability' column (varchar(11)).
+# ------------------------------------------------------------
+SUITABILITY_LEVELS = ("all_ages", "teen", "mature")
+
+# ------------------------------------------------------------
+# Global: ANALYSIS_INSTRUCTIONS
+# Description:
+#   Appended to the summary prompt so the same model call also
+#   returns the searchable metadata of the video.
+# ------------------------------------------------------------
+ANALYSIS_INSTRUCTIONS = f"""
+            After the summary, write a line containing only {ANALYSIS_DELIMITER}
+            followed by one JSON object (no code fence) with these keys:
+            "category": short genre such as movie, song, cartoon, tutorial, news, sports, vlog;
+            "suitability": one of {", ".join(f'"{level}"' for level in SUITABILITY_LEVELS)};
+            "language": main spoken language as an ISO 639-1 code, or null if none;
+            "topics": up to 8 short lowercase topics;
+            "timestamps": up to 10 key moments as {{"time": "m:ss", "description": "..."}}.
+        """
+
+
+# ------------------------------------------------------------
+# Method: split_analysis
+# Description:
+#   Splits a structured summary response into the summary text
+#   and the normalized metadata dict. Responses without (or
+#   with an unparsable) metadata block return (text, None), so
+#   plain summaries pass through unchanged.
+# ------------------------------------------------------------
+def split_analysis(text: Optional[str]) -> tuple:
+    if not text or ANALYSIS_DELIMITER not in text:
+        return text, None
+    summary, _, block = text.partition(ANALYSIS_DELIMITER)
+    start, end = block.find("{"), block.rfind("}")
+    try:
+        data = json.loads(block[start:end + 1]) if start != -1 and end > start else None
+    except json.JSONDecodeError:
+        data = None
+    return summary.strip(), normalize_analysis(data) if isinstance(data, dict) else None
+
+
+# ------------------------------------------------------------
+# Method: normalize_analysis
+# Description:
+#   Maps the model's metadata onto the 'videos' analysis
+#   columns: trimmed strings, a known suitability level, a
+#   comma-separated topic list and the key moments as JSON
+#   ({"time": seconds, "description"}).
+# ------------------------------------------------------------
+def normalize_analysis(data: dict) -> dict:
+    category = str(data.get("category") or "").strip().lower()[:255] or None
+
+    suitability = str(data.get("suitability") or "").strip().lower().replace(" ", "_").replace("-", "_")
+    suitability = suitability if suitability in SUITABILITY_LEVELS else None
+
+    language = str(data.get("language") or "").strip().lower()[:32] or None
+
+    topics = data.get("topics") or []
+    if isinstance(topics, str):
+        topics = topics.split(",")
+    topics = [str(t).strip().lower().replace(",", " ") for t in topics if str(t).strip()]
+    topics = ", ".join(dict.fromkeys(topics))[:512] or None
+
+    moments = []
+    for moment in data.get("timestamps") or []:
+        if not isinstance(moment, dict):
+            continue
+        seconds = parse_time(moment.get("time"))
+        description = str(moment.get("description") or "").strip()
+        if seconds is not None and description:
+            moments.append({"time": seconds, "description": description[:300]})
+    key_moments = json.dumps(moments[:10], ensure_ascii=False) if moments else None
+
+    return {"category": category, "suitability": suitability, "language": language,
+            "topics": topics, "key_moments": key_moments}
+
+
+# ------------------------------------------------------------
+# Method: parse_time
+# Description:
+#   Converts "h:mm:ss", "m:ss" or a number of seconds into
+#   seconds, or None if the value is not a time.
+# ------------------------------------------------------------
+def parse_time(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value) if value >= 0 else None
+    if not isinstance(value, str) or not re.fullmatch(r"\s*\d+(:\d{1,2}){0,2}(\.\d+)?\s*", value):
+        return None
+    seconds = 0.0
+    for part in value.strip().split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+# ------------------------------------------------------------
+# Class: SummaryStreamFilter
+# Description:
+#   Passes streamed summary tokens through until the metadata
+#   delimiter, so the JSON block never reaches the page. Keeps
+#   back a delimiter-sized tail in case the delimiter is split
+#   across chunks.
+# ------------------------------------------------------------
+class SummaryStreamFilter:
+    def __init__(self):
+        self.__pending = ""
+        self.__done = False
+
+    def feed(self, text: str) -> str:
+        if self.__done:
+            return ""
+        self.__pending += text
+        index = self.__pending.find(ANALYSIS_DELIMITER)
+        if index != -1:
+            self.__done = True
+            output, self.__pending = self.__pending[:index].rstrip(), ""
+            return output
+        keep = len(ANALYSIS_DELIMITER) - 1
+        output, self.__pending = self.__pending[:-keep], self.__pending[-keep:]
+        return output
+
+    def flush(self) -> str:
+        output, self.__pending = self.__pending, ""
+        return output
@@ -0,0 +1,172 @@
+import os
+import struct
+from services.ffmpeg import FFmpegService
+from services.hashing import file_sha256
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Class: VideoMetadataService
+# Description:
+#   Extracts technical metadata from a video once, at ingest:
+#     - duration, resolution, bitrate and codec
+#     - byte size and SHA-256 content hash
+#   MP4/MOV headers are parsed directly (no subprocess); other
+#   containers fall back to a single ffprobe run.
+# ------------------------------------------------------------
+class VideoMetadataService:
+    def __init__(self):
+        self.__ffmpeg = FFmpegService()
+        self.__logger = setup_logger(__name__)
+
+    # ------------------------------------------------------------
+    # Method: extract
+    # Description:
+    #   Returns a dictionary matching the metadata columns of
+    #   the 'videos' table. Unknown values are left as None.
+    # ------------------------------------------------------------
+    def extract(self, path: str) -> dict:
+        metadata = self.probe(path)
+        metadata["file_size"] = os.path.getsize(path)
+        metadata["content_hash"] = file_sha256(path)
+        if metadata["duration"] and not metadata["bitrate"]:
+            metadata["bitrate"] = int(metadata["file_size"] * 8 / metadata["duration"])
+        return metadata
+
+    # ------------------------------------------------------------
+    # Method: probe
+    # Description:
+    #   Returns duration, resolution, bitrate and codec only,
+    #   without reading the whole file for the content hash.
+    # ------------------------------------------------------------
+    def probe(self, path: str) -> dict:
+        metadata = {
+            "duration": None,
+            "width": None,
+            "height": None,
+            "bitrate": None,
+            "codec": None,
+        }
+        try:
+            metadata.update(self._parse_mp4(path))
+        except Exception as e:
+            self.__logger.info(f"MP4 header parse failed for {path}: {e}")
+            try:
+                metadata.update(self._ffprobe(path))
+            except Exception as e:
+                self.__logger.error(f"Error probing {path}: {e}")
+        return metadata
+
+    # ------------------------------------------------------------
+    # Method: _parse_mp4
+    # Description:
+    #   Reads only the 'moov' box and walks mvhd / tkhd / hdlr /
+    #   stsd to find duration, video dimensions and codec.
+    # ------------------------------------------------------------
+    def _parse_mp4(self, path: str) -> dict:
+        moov = self._read_moov(path)
+        if moov is None:
+            raise ValueError("moov box not found")
+
+        result = {}
+        for kind, start, end in self._boxes(moov, 0, len(moov)):
+            if kind == "mvhd":
+                version = moov[start]
+                if version == 1:
+                    timescale, duration = struct.unpack_from(">IQ", moov, start + 20)
+                else:
+                    timescale, duration = struct.unpack_from(">II", moov, start + 12)
+                if timescale:
+                    result["duration"] = round(duration / timescale, 3)
+            elif kind == "trak" and "codec" not in result:
+                track = self._parse_track(moov, start, end)
+                if track:
+                    result.update(track)
+
+        if "duration" not in result:
+            raise ValueError("mvhd box not found")
+        return result
+
+    def _parse_track(self, data: bytes, start: int, end: int) -> dict:
+        width = height = None
+        handler = codec = None
+        for kind, s, e in self._boxes(data, start, end):
+            if kind == "tkhd":
+                offset = s + (88 if data[s] == 1 else 76)
+                width, height = (v >> 16 for v in struct.unpack_from(">II", data, offset))
+            elif kind == "mdia":
+                for mkind, ms, me in self._boxes(data, s, e):
+                    if mkind == "hdlr":
+                        handler = data[ms + 8:ms + 12].decode("latin-1")
+                    elif mkind == "minf":
+                        codec = self._find_codec(data, ms, me)
+        if handler != "vide":
+            return {}
+        return {"width": width, "height": height, "codec": codec}
+
+    def _find_codec(self, data: bytes, start: int, end: int):
+        for kind, s, e in self._boxes(data, start, end):
+            if kind == "stbl":
+                for skind, ss, _ in self._boxes(data, s, e):
+                    if skind == "stsd":
+                        return data[ss + 12:ss + 16].decode("latin-1").strip()
+        return None
+
+    @staticmethod
+    def _boxes(data: bytes, offset: int, end: int):
+        while offset + 8 <= end:
+            size, kind = struct.unpack_from(">I4s", data, offset)
+            header = 8
+            if size == 1:
+                size = struct.unpack_from(">Q", data, offset + 8)[0]
+                header = 16
+            elif size == 0:
+                size = end - offset
+            if size < header:
+                return
+            yield kind.decode("latin-1"), offset + header, offset + size
+            offset += size
+
+    @staticmethod
+    def _read_moov(path: str):
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            file_end = f.tell()
+            offset = 0
+            while offset + 8 <= file_end:
+                f.seek(offset)
+                header = f.read(16)
+                size, kind = struct.unpack(">I4s", header[:8])
+                header_size = 8
+                if size == 1:
+                    size = struct.unpack(">Q", header[8:16])[0]
+                    header_size = 16
+                elif size == 0:
+                    size = file_end - offset
+                if size < header_size:
+                    return None
+                if kind == b"moov":
+                    f.seek(offset + header_size)
+                    return f.read(size - header_size)
+                offset += size
+        return None
+
+    # ------------------------------------------------------------
+    # Method: _ffprobe
+    # Description:
+    #   Fallback for non-MP4 containers: one ffprobe call.
+    # ------------------------------------------------------------
+    def _ffprobe(self, path: str) -> dict:
+        info = self.__ffmpeg.probe(path, "-show_format", "-show_streams")
+        fmt = info.get("format", {})
+        video = next(
+            (s for s in info.get("streams", []) if s.get("codec_type") == "video"), {}
+        )
+        duration = fmt.get("duration") or video.get("duration")
+        bitrate = fmt.get("bit_rate")
+        return {
+            "duration": round(float(duration), 3) if duration else None,
+            "width": video.get("width"),
+            "height": video.get("height"),
+            "bitrate": int(bitrate) if bitrate else None,
+            "codec": video.get("codec_name"),
+        }
@@ -0,0 +1,197 @@
+import os
+import time
+import signal
+import socket
+import argparse
+import threading
+import multiprocessing
+from dotenv import load_dotenv
+from decouple import config
+from logger_app import setup_logger
+
+# ------------------------------------------------------------
+# Global: _STOP
+# Description:
+#   Set by SIGTERM / SIGINT so a worker finishes its current job
+#   and exits cleanly.
+# ------------------------------------------------------------
+_STOP = False
+
+# ------------------------------------------------------------
+# Global: EXPECTED_SUMMARY_NODES
+# Description:
+#   Approximate number of graph nodes of an ingest run, used to
+#   turn finished nodes into a progress fraction.
+# ------------------------------------------------------------
+EXPECTED_SUMMARY_NODES = 6
+
+
+# ------------------------------------------------------------
+# Method: run_summary_job
+# Description:
+#   Builds the list previews of the video, then runs the
+#   LangGraph summary pipeline (reduce_media ->
+#   upload_video -> summarize_video -> store_summary_in_db ...)
+#   for one job, reporting progress after every finished node.
+#   Stops with LeaseLostError at the next node boundary once
+#   another worker owns the job.
+# ------------------------------------------------------------
+def run_summary_job(job: dict, queue) -> dict:
+    from services.registry import RESOURCES
+    from services.lang_graph import LanggraphService
+    from services.job_queue import LeaseLostError
+    from services.preview import PreviewService
+
+    payload = job["payload"]
+    graph = RESOURCES.get(
+        "graph", lambda: LanggraphService().build_pipeline(),
+        health_check=LanggraphService.check_pipeline
+    )
+    inputs = {
+        "video_path": payload["video_path"],
+        "video_name": payload["video_name"],
+        "is_new_video": payload.get("is_new_video", False),
+        "prompt": payload.get("prompt", ""),
+        "segmented": payload.get("segmented", False),
+        "question": "",
+        "start_time": None,
+        "end_time": None,
+    }
+    graph_config = {"configurable": {"thread_id": f"job-{job['id']}"}}
+
+    # Poster frame and preview clip for the video list (cached by
+    # content hash, so repeated jobs of the same video skip this)
+    if payload.get("content_hash"):
+        PreviewService().generate(payload["video_path"], payload["content_hash"], payload.get("duration"))
+
+    finished = 0
+    for update in graph.stream(inputs, graph_config, stream_mode="updates"):
+        for node in update:
+            finished += 1
+            if not queue.update_progress(
+                job["id"], job["locked_by"], min(finished / EXPECTED_SUMMARY_NODES, 0.95), f"Finished {node}"
+            ):
+                raise LeaseLostError(f"Job {job['id']} is no longer owned by {job['locked_by']}")
+
+    state = graph.get_state(graph_config).values
+    return {"summary": state.get("summary") or ""}
+
+
+# ------------------------------------------------------------
+# Global: HANDLERS
+# Description:
+#   Maps job kinds to the functions that execute them.
+# ------------------------------------------------------------
+HANDLERS = {
+    "summarize_video": run_summary_job,
+}
+
+
+def _load_environment():
+    load_dotenv()
+    if not os.environ.get("GOOGLE_API_KEY"):
+        os.environ["GOOGLE_API_KEY"] = str(config("GOOGLE_API_KEY", default=""))
+    if not os.environ.get("OPENAI_API_KEY"):
+        os.environ["OPENAI_API_KEY"] = str(config("OPENAI_API_KEY", default=""))
+
+
+def _request_stop(signum, frame):
+    global _STOP
+    _STOP = True
+
+
+# ------------------------------------------------------------
+# Method: _heartbeat
+# Description:
+#   Renews the lease of a running job every third of the lease
+#   period, so long graph nodes (a single model call can take
+#   minutes) do not let the lease expire. Stops when `stop` is
+#   set or the lease is lost.
+# ------------------------------------------------------------
+def _heartbeat(queue, job: dict, stop: threading.Event):
+    logger = setup_logger(__name__)
+    interval = max(1.0, queue.lease_seconds / 3)
+    while not stop.wait(interval):
+        try:
+            if not queue.heartbeat(job["id"], job["locked_by"]):
+                logger.warning(f"Worker {job['locked_by']} lost the lease of job {job['id']}")
+                return
+        except Exception as e:
+            logger.error(f"Heartbeat of job {job['id']} failed: {e}")
+
+
+# ------------------------------------------------------------
+# Method: run_worker
+# Description:
+#   Worker process loop: claims jobs from the queue, runs the
+#   matching handler and records success or failure.
+# ------------------------------------------------------------
+def run_worker(worker_id: str, poll_interval: float):
+    from services.job_queue import JobQueueService, LeaseLostError
+    from services.registry import RESOURCES
+
+    _load_environment()
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+    logger = setup_logger(__name__)
+    queue = JobQueueService()
+    logger.info(f"Worker {worker_id} started")
+
+    while not _STOP:
+        job = queue.claim(worker_id)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(f"Worker {worker_id} running job {job['id']} ({job['kind']})")
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(queue, job, stop), daemon=True)
+        heartbeat.start()
+        try:
+            handler = HANDLERS[job["kind"]]
+            with RESOURCES.repair_on_error():
+                result = handler(job, queue)
+            if not queue.complete(job["id"], worker_id, result):
+                logger.warning(f"Worker {worker_id} lost job {job['id']}, result discarded")
+        except LeaseLostError as e:
+            logger.warning(str(e))
+        except Exception as e:
+            if not queue.fail(job["id"], worker_id, f"{type(e).__name__}: {e}"):
+                logger.warning(f"Worker {worker_id} lost job {job['id']}, error discarded")
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    logger.info(f"Worker {worker_id} stopped")
+
+
+# ------------------------------------------------------------
+# Method: main
+# Description:
+#   Starts a pool of worker processes:
+#     python -m services.worker --processes 2
+# ------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Video analyzer job workers")
+    parser.add_argument("--processes", type=int, default=int(config("JOB_WORKERS", default=2)))
+    parser.add_argument("--poll-interval", type=float, default=float(config("JOB_POLL_INTERVAL", default=1)))
+    args = parser.parse_args()
+
+    host = socket.gethostname()
+    processes = [
+        multiprocessing.Process(
+            target=run_worker, args=(f"{host}:{os.getpid()}:{i}", args.poll_interval)
+        )
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    signal.signal(signal.SIGINT, lambda *_: [p.terminate() for p in processes])
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in processes])
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
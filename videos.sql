@@ -32,14 +32,49 @@ CREATE TABLE `videos` (
   `video_name` varchar(150) DEFAULT NULL,
   `category` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci DEFAULT NULL,
   `suitability` varchar(11) DEFAULT NULL,
-  `video_type` tinyint DEFAULT NULL
+  `language` varchar(32) DEFAULT NULL,
+  `topics` varchar(512) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci DEFAULT NULL,
+  `key_moments` json DEFAULT NULL,
+  `video_type` tinyint DEFAULT NULL,
+  `duration` decimal(10,3) DEFAULT NULL,
+  `width` int DEFAULT NULL,
+  `height` int DEFAULT NULL,
+  `bitrate` int DEFAULT NULL,
+  `codec` varchar(32) DEFAULT NULL,
+  `file_size` bigint DEFAULT NULL,
+  `content_hash` char(64) DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `video_segments`
+--
+
+CREATE TABLE `video_segments` (
+  `id` int NOT NULL,
+  `video_name` varchar(150) NOT NULL,
+  `start_time` decimal(10,3) NOT NULL,
+  `end_time` decimal(10,3) NOT NULL,
+  `summary` text NOT NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
 --
 -- Indexes for table `videos`
 --
 ALTER TABLE `videos`
-  ADD PRIMARY KEY (`id`);
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uniq_videos_video_name` (`video_name`),
+  ADD KEY `idx_videos_content_hash` (`content_hash`),
+  ADD KEY `idx_videos_suitability` (`suitability`),
+  ADD FULLTEXT KEY `ft_videos_search` (`video_name`, `category`, `topics`) WITH PARSER ngram;
+
+--
+-- Indexes for table `video_segments`
+--
+ALTER TABLE `video_segments`
+  ADD PRIMARY KEY (`id`),
+  ADD KEY `idx_segments_video_range` (`video_name`, `start_time`, `end_time`);
 
 --
 -- AUTO_INCREMENT for dumped tables
@@ -50,6 +85,12 @@ ALTER TABLE `videos`
 --
 ALTER TABLE `videos`
   MODIFY `id` int NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=1;
+
+--
+-- AUTO_INCREMENT for table `video_segments`
+--
+ALTER TABLE `video_segments`
+  MODIFY `id` int NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=1;
 COMMIT;
 
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;